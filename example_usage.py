@@ -2,13 +2,15 @@
 
 from pathlib import Path
 
+import numpy as np
+
 from src.extractor.ingest import RepositoryIngestor
 from src.extractor.rule_normalizer import RuleNormalizer
-from src.extractor.enricher import RuleEnricher
+from src.extractor.enricher import get_enricher
 from src.extractor.clusterer import RuleClusterer
 from src.extractor.drd_generator import DRDGenerator
 from src.extractor import DecisionModel, RuleDependency
-from src.utils.io import load_config, save_json, save_text
+from src.utils.io import encode_embeddings, load_config, save_json_stream, save_text
 from src.utils.logging import setup_logging
 
 
@@ -56,15 +58,13 @@ def main():
     # Step 2: Normalize rules
     print("Step 2: Normalizing rules...")
     normalizer = RuleNormalizer()
-    rules = normalizer.normalize_rules(rules)
-    rules = normalizer.deduplicate_rules(rules)
-    rules = normalizer.filter_low_quality_rules(rules, min_confidence=0.6)
+    rules = normalizer.pipeline(rules, min_confidence=0.6)
     print(f"✓ Normalized to {len(rules)} unique rules")
     print()
 
     # Step 3: Enrich rules
     print("Step 3: Enriching rules with embeddings...")
-    enricher = RuleEnricher(config)
+    enricher = get_enricher(config)
     rules = enricher.enrich_rules(rules)
     print(f"✓ Enriched {len(rules)} rules")
     print()
@@ -101,28 +101,36 @@ def main():
     # Step 5: Infer dependencies (simple heuristic)
     print("Step 5: Inferring dependencies...")
     dependencies = []
-    for i, group1 in enumerate(groups):
-        tables1 = set()
-        for rule in group1.rules:
-            tables1.update(rule.tables)
-
-        for j, group2 in enumerate(groups):
-            if i == j:
-                continue
-
-            tables2 = set()
-            for rule in group2.rules:
-                tables2.update(rule.tables)
-
-            shared = tables1 & tables2
-            if shared:
-                strength = min(len(shared) / 3.0, 1.0)
-                dependencies.append(RuleDependency(
-                    source_id=group1.id,
-                    target_id=group2.id,
-                    dependency_type="dataflow",
-                    strength=strength
-                ))
+
+    # Row i of the membership matrix marks the tables used by group i,
+    # so the matrix product gives shared-table counts for every pair
+    tables_by_group = [g.tables for g in groups]
+
+    table_index = {}
+    for tables in tables_by_group:
+        for table in tables:
+            table_index.setdefault(table, len(table_index))
+
+    membership = np.zeros((len(groups), len(table_index)), dtype=np.int32)
+    for row, tables in enumerate(tables_by_group):
+        membership[row, [table_index[t] for t in tables]] = 1
+
+    # Sharing is symmetric, so only the upper triangle is visited and
+    # the reverse edge is emitted as a copy of the forward one
+    shared = np.triu(membership @ membership.T, k=1)
+
+    for i, j in np.argwhere(shared > 0):
+        strength = min(float(shared[i, j]) / 3.0, 1.0)
+        forward = RuleDependency(
+            source_id=groups[i].id,
+            target_id=groups[j].id,
+            dependency_type="dataflow",
+            strength=strength
+        )
+        dependencies.append(forward)
+        dependencies.append(forward.model_copy(
+            update={"source_id": groups[j].id, "target_id": groups[i].id}
+        ))
 
     print(f"✓ Identified {len(dependencies)} dependencies")
     print()
@@ -135,7 +143,7 @@ def main():
         dependencies=dependencies,
         metadata={
             "repository": str(sample_repo),
-            "total_files_processed": len(set(r.source.file_path for r in rules))
+            "total_files_processed": stats["unique_files"]
         }
     )
     print("✓ Decision model built")
@@ -146,8 +154,7 @@ def main():
     generator = DRDGenerator(config)
 
     # Generate DMN XML
-    dmn_xml = generator.generate_drd(decision_model)
-    save_text(dmn_xml, "example_output/drd.xml")
+    generator.write_drd(decision_model, "example_output/drd.xml")
     print("✓ DMN XML: example_output/drd.xml")
 
     # Generate Markdown report
@@ -155,19 +162,26 @@ def main():
     save_text(markdown, "example_output/report.md")
     print("✓ Markdown report: example_output/report.md")
 
-    # Generate JSON
-    json_data = {
+    # Generate JSON (streamed section by section)
+    json_sections = {
         "metadata": decision_model.metadata,
         "summary": {
             "total_rules": len(rules),
             "total_groups": len(groups),
             "total_dependencies": len(dependencies)
         },
-        "rules": [r.model_dump() for r in rules[:10]],  # First 10 for brevity
-        "groups": [g.model_dump() for g in groups],
-        "dependencies": [d.model_dump() for d in dependencies]
+        # First 10 for brevity; embeddings are packed separately below
+        "rules": (r.model_dump(mode="json", exclude={"embedding"}) for r in rules[:10]),
+        "groups": (
+            g.model_dump(mode="json", exclude={"rules": {"__all__": {"embedding"}}})
+            for g in groups
+        ),
+        "dependencies": dependencies,
+        "embeddings": encode_embeddings({
+            r.id: r.embedding for r in rules[:10] if r.embedding is not None
+        })
     }
-    save_json(json_data, "example_output/data.json")
+    save_json_stream(json_sections, "example_output/data.json")
     print("✓ JSON data: example_output/data.json")
     print()
 
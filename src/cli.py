@@ -5,22 +5,12 @@ import logging
 from pathlib import Path
 from typing import Optional
 import click
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from src.extractor.ingest import RepositoryIngestor
-from src.extractor.rule_normalizer import RuleNormalizer
-from src.extractor.enricher import RuleEnricher
-from src.extractor.clusterer import RuleClusterer
-from src.extractor.drd_generator import DRDGenerator
-from src.extractor import DecisionModel, RuleDependency
-from src.utils.io import load_config, save_json, save_text, ensure_dir
-from src.utils.logging import setup_logging
+# The extraction pipeline, numpy/sklearn and rich are imported inside the
+# commands so that --help and --version start without loading them
 
 
 logger = logging.getLogger(__name__)
-console = Console()
 
 
 @click.group()
@@ -61,6 +51,17 @@ def cli():
     is_flag=True,
     help="Dry run - only show statistics, don't write output"
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Ignore and don't update the cache of extracted rules"
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes for parsing files and normalizing rules (defaults to performance.max_workers)"
+)
 @click.option(
     "--verbose",
     is_flag=True,
@@ -72,133 +73,206 @@ def analyze(
     output_format: str,
     config: str,
     dry_run: bool,
+    no_cache: bool,
+    jobs: Optional[int],
     verbose: bool
 ):
     """Analyze repository and extract business rules."""
+    from rich.console import Console
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+    from src.extractor.ingest import RepositoryIngestor
+    from src.extractor.rule_normalizer import RuleNormalizer
+    from src.extractor.enricher import get_enricher
+    from src.extractor.clusterer import RuleClusterer
+    from src.extractor.drd_generator import DRDGenerator
+    from src.extractor import DecisionModel
+    from src.utils.cache import PipelineCache
+    from src.utils.io import load_config, save_json_stream, save_text
+    from src.utils.logging import setup_logging
+
+    console = Console()
+
     # Load configuration
     try:
         if Path(config).exists():
             cfg = load_config(config)
         else:
-            console.print(f"[yellow]Config file not found: {config}, using defaults[/yellow]")
+            console.print(f"Config file not found: {config}, using defaults", style="yellow", markup=False)
             cfg = _get_default_config()
     except Exception as e:
-        console.print(f"[red]Error loading config: {e}[/red]")
+        console.print(f"Error loading config: {e}", style="red", markup=False)
         sys.exit(1)
 
     # Setup logging
     log_level = "DEBUG" if verbose else cfg.get("logging", {}).get("level", "INFO")
     setup_logging(level=log_level)
 
-    console.print(f"[bold blue]SQL Rule Extractor[/bold blue]")
-    console.print(f"Analyzing repository: {repo}")
+    console.print("SQL Rule Extractor", style="bold blue")
+    console.print(f"Analyzing repository: {repo}", markup=False)
 
+    # Each step rewrites its own progress line with its result when done,
+    # rather than printing a separate message. Steps have known totals, so
+    # the display is redrawn explicitly instead of by a refresh thread.
     with Progress(
-        SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
         console=console,
+        auto_refresh=False,
     ) as progress:
-        # Step 1: Ingest repository
-        task = progress.add_task("Ingesting repository...", total=None)
         ingestor = RepositoryIngestor(cfg)
-        rules = ingestor.ingest_repository(repo)
-        progress.update(task, completed=True)
-        console.print(f"✓ Extracted {len(rules)} rules")
-
-        if len(rules) == 0:
-            console.print("[yellow]No rules found. Check repository path and file types.[/yellow]")
-            sys.exit(0)
-
-        # Step 2: Normalize rules
-        task = progress.add_task("Normalizing rules...", total=None)
-        normalizer = RuleNormalizer()
-        rules = normalizer.normalize_rules(rules)
-        rules = normalizer.deduplicate_rules(rules)
-        rules = normalizer.filter_low_quality_rules(rules)
-        progress.update(task, completed=True)
-        console.print(f"✓ Normalized to {len(rules)} unique rules")
-
-        # Step 3: Enrich rules
-        task = progress.add_task("Enriching rules...", total=None)
-        enricher = RuleEnricher(cfg)
-        rules = enricher.enrich_rules(rules)
-        progress.update(task, completed=True)
-        console.print(f"✓ Enriched {len(rules)} rules")
+        source_files = list(ingestor.iter_source_files(repo))
+
+        # Reuse enriched rules from a previous run on unchanged sources
+        cache = None
+        fingerprint = None
+        rules = None
+        performance_cfg = cfg.get("performance", {})
+        if performance_cfg.get("cache_enabled", False) and not no_cache:
+            cache = PipelineCache(performance_cfg.get("cache_dir"))
+            fingerprint = PipelineCache.fingerprint(source_files, cfg)
+            rules = cache.load(repo, "enriched_rules", fingerprint)
+
+        if rules is not None:
+            task = progress.add_task("Loading cached rules...", total=len(rules))
+            progress.update(
+                task, completed=len(rules), refresh=True,
+                description=f"✓ Loaded {len(rules)} enriched rules from cache"
+            )
+        else:
+            # Step 1: Ingest repository
+            task = progress.add_task("Ingesting repository...", total=len(source_files))
+            progress.refresh()
+
+            def on_file_parsed(files_parsed):
+                progress.update(task, completed=files_parsed, refresh=files_parsed % 10 == 0)
+
+            max_workers = performance_cfg.get("max_workers", 1)
+            workers = jobs or (None if max_workers == "auto" else max_workers)
+            rules = ingestor.ingest_files(
+                source_files,
+                jobs=workers,
+                progress_callback=on_file_parsed
+            )
+            progress.update(task, refresh=True, description=f"✓ Extracted {len(rules)} rules")
+
+            if len(rules) == 0:
+                console.print("No rules found. Check repository path and file types.", style="yellow")
+                sys.exit(0)
+
+            # Step 2: Normalize rules
+            task = progress.add_task("Normalizing rules...", total=len(rules))
+            progress.refresh()
+            normalizer = RuleNormalizer()
+            normalized = normalizer.pipeline(rules, jobs=workers)
+            progress.update(
+                task, completed=len(rules), refresh=True,
+                description=f"✓ Normalized to {len(normalized)} unique rules"
+            )
+            rules = normalized
+
+            # Step 3: Enrich rules
+            task = progress.add_task("Enriching rules...", total=len(rules))
+            progress.refresh()
+            enricher = get_enricher(cfg)
+            rules = enricher.enrich_rules(rules)
+            progress.update(
+                task, completed=len(rules), refresh=True,
+                description=f"✓ Enriched {len(rules)} rules"
+            )
+
+            if cache is not None:
+                cache.store(repo, "enriched_rules", fingerprint, rules)
 
         # Step 4: Cluster rules
-        task = progress.add_task("Clustering rules...", total=None)
+        task = progress.add_task("Clustering rules...", total=len(rules))
+        progress.refresh()
         clusterer = RuleClusterer(cfg)
         groups = clusterer.cluster_rules(rules)
-        progress.update(task, completed=True)
-        console.print(f"✓ Created {len(groups)} rule groups")
+        progress.update(
+            task, completed=len(rules), refresh=True,
+            description=f"✓ Created {len(groups)} rule groups"
+        )
 
         # Step 5: Build decision model
-        task = progress.add_task("Building decision model...", total=None)
+        task = progress.add_task("Building decision model...", total=len(groups))
+        progress.refresh()
         dependencies = _infer_dependencies(groups)
         decision_model = DecisionModel(
             rules=rules,
             groups=groups,
             dependencies=dependencies
         )
-        progress.update(task, completed=True)
-        console.print(f"✓ Built decision model with {len(dependencies)} dependencies")
+        progress.update(
+            task, completed=len(groups), refresh=True,
+            description=f"✓ Built decision model with {len(dependencies)} dependencies"
+        )
 
     # Show statistics
-    _show_statistics(rules, groups, ingestor.get_statistics(rules))
+    _show_statistics(console, groups, clusterer.counts)
 
     # Dry run - exit here
     if dry_run:
-        console.print("\n[yellow]Dry run complete. No files written.[/yellow]")
+        console.print("\nDry run complete. No files written.", style="yellow")
         return
 
     # Generate outputs
-    console.print(f"\n[bold]Generating outputs...[/bold]")
+    console.print("\nGenerating outputs...", style="bold")
 
     try:
         generator = DRDGenerator(cfg)
 
         if output_format == "dmn" or output_format == "all":
-            dmn_xml = generator.generate_drd(decision_model)
-            dmn_path = out if out.endswith('.xml') else f"{out}.xml"
-            save_text(dmn_xml, dmn_path)
-            console.print(f"✓ DMN XML: {dmn_path}")
+            dmn_path = _output_path(out, ".xml")
+            generator.write_drd(decision_model, dmn_path)
+            console.print(f"✓ DMN XML: {dmn_path}", markup=False)
 
         if output_format == "markdown" or output_format == "all":
             markdown = generator.generate_markdown_report(decision_model)
-            md_path = out.replace('.xml', '.md') if out.endswith('.xml') else f"{out}.md"
+            md_path = _output_path(out, ".md")
             save_text(markdown, md_path)
-            console.print(f"✓ Markdown report: {md_path}")
+            console.print(f"✓ Markdown report: {md_path}", markup=False)
 
         if output_format == "json" or output_format == "all":
-            # Convert to JSON-serializable format
-            json_data = {
-                "rules": [r.model_dump() for r in rules],
-                "groups": [g.model_dump() for g in groups],
-                "dependencies": [d.model_dump() for d in dependencies]
-            }
-            json_path = out.replace('.xml', '.json') if out.endswith('.xml') else f"{out}.json"
-            save_json(json_data, json_path)
-            console.print(f"✓ JSON data: {json_path}")
-
-        console.print(f"\n[bold green]Analysis complete![/bold green]")
+            json_path = _output_path(out, ".json")
+            save_json_stream(_json_sections(decision_model), json_path)
+            console.print(f"✓ JSON data: {json_path}", markup=False)
+
+        console.print("\nAnalysis complete!", style="bold green")
 
     except Exception as e:
-        console.print(f"[red]Error generating output: {e}[/red]")
-        logger.exception(e)
+        console.print(f"Error generating output: {e}", style="red", markup=False)
+        logger.exception("Error generating output")
         sys.exit(1)
 
 
-def _show_statistics(rules, groups, stats):
+def _output_path(out, suffix):
+    """
+    Get the path for one output format.
+
+    An --out ending in .xml has that extension swapped for the format's
+    suffix; any other --out gets the suffix appended.
+    """
+    out_path = Path(out)
+    if out_path.suffix == ".xml":
+        return str(out_path.with_suffix(suffix))
+    return f"{out}{suffix}"
+
+
+def _show_statistics(console, groups, type_counts):
     """Display statistics table."""
-    console.print("\n[bold]Statistics:[/bold]")
+    from rich.table import Table
+
+    console.print("\nStatistics:", style="bold")
 
     # Rules by type
     table = Table(title="Rules by Type")
     table.add_column("Type", style="cyan")
     table.add_column("Count", justify="right", style="green")
 
-    for rule_type, count in stats["by_type"].items():
-        table.add_row(rule_type, str(count))
+    for rule_type, count in type_counts.items():
+        table.add_row(rule_type.value, str(count))
 
     console.print(table)
 
@@ -221,46 +295,91 @@ def _show_statistics(rules, groups, stats):
         console.print(table)
 
 
+def _json_sections(decision_model):
+    """
+    Build the sections of the JSON export.
+
+    Rule embeddings are left out of the per-rule records and written once
+    as a packed float16 matrix under "embeddings".
+    """
+    from src.utils.io import encode_embeddings
+
+    rule_exclude = {"embedding"}
+    group_exclude = {"rules": {"__all__": rule_exclude}}
+
+    return {
+        "rules": (r.model_dump(mode="json", exclude=rule_exclude) for r in decision_model.rules),
+        "groups": (g.model_dump(mode="json", exclude=group_exclude) for g in decision_model.groups),
+        "dependencies": decision_model.dependencies,
+        "embeddings": encode_embeddings({
+            r.id: r.embedding for r in decision_model.rules if r.embedding is not None
+        }),
+    }
+
+
 def _infer_dependencies(groups):
     """Infer dependencies between rule groups."""
-    dependencies = []
-
-    # Simple heuristic: groups sharing tables/columns are related
-    for i, group1 in enumerate(groups):
-        tables1 = set()
-        columns1 = set()
-        for rule in group1.rules:
-            tables1.update(rule.tables)
-            columns1.update(rule.columns)
-
-        for j, group2 in enumerate(groups):
-            if i == j:
-                continue
-
-            tables2 = set()
-            columns2 = set()
-            for rule in group2.rules:
-                tables2.update(rule.tables)
-                columns2.update(rule.columns)
-
-            # Check for shared elements
-            shared_tables = tables1 & tables2
-            shared_columns = columns1 & columns2
-
-            if shared_tables or shared_columns:
-                strength = (len(shared_tables) + len(shared_columns)) / 10.0
-                strength = min(strength, 1.0)
-
-                dependencies.append(RuleDependency(
-                    source_id=group1.id,
-                    target_id=group2.id,
-                    dependency_type="dataflow",
-                    strength=strength
-                ))
+    import numpy as np
+    from src.extractor import RuleDependency
+
+    if len(groups) < 2:
+        return []
+
+    # Simple heuristic: groups sharing tables/columns are related.
+    # Each group is encoded as a row of a membership matrix, so every
+    # pairwise intersection size comes out of a single matrix product.
+    shared_tables = _shared_counts([g.tables for g in groups])
+    shared_columns = _shared_counts([g.columns for g in groups])
+
+    # Sharing is symmetric: visit each unordered pair once (upper triangle)
+    # and emit the reverse edge as a copy, which skips re-validation
+    shared = np.triu(shared_tables + shared_columns, k=1)
+    pairs = np.argwhere(shared > 0)
+    strengths = np.minimum(shared[pairs[:, 0], pairs[:, 1]] / 10.0, 1.0).tolist()
+    group_ids = [g.id for g in groups]
+
+    # Two edges per pair, so the result size is known up front
+    dependencies = [None] * (2 * len(pairs))
+    for k, (i, j) in enumerate(pairs.tolist()):
+        forward = RuleDependency(
+            source_id=group_ids[i],
+            target_id=group_ids[j],
+            dependency_type="dataflow",
+            strength=strengths[k]
+        )
+        dependencies[2 * k] = forward
+        dependencies[2 * k + 1] = forward.model_copy(
+            update={"source_id": group_ids[j], "target_id": group_ids[i]}
+        )
 
     return dependencies
 
 
+def _shared_counts(names_by_group):
+    """
+    Count shared names between every pair of groups.
+
+    Args:
+        names_by_group: One set of names (tables or columns) per group
+
+    Returns:
+        (G, G) integer matrix where entry [i, j] is the size of the
+        intersection between group i and group j
+    """
+    import numpy as np
+
+    index = {}
+    for names in names_by_group:
+        for name in names:
+            index.setdefault(name, len(index))
+
+    membership = np.zeros((len(names_by_group), len(index)), dtype=np.int32)
+    for row, names in enumerate(names_by_group):
+        membership[row, [index[name] for name in names]] = 1
+
+    return membership @ membership.T
+
+
 def _get_default_config():
     """Get default configuration."""
     return {
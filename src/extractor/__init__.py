@@ -1,12 +1,18 @@
 """Core extraction modules."""
 
+from itertools import chain
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
 
 class RuleType(str, Enum):
-    """Types of business rules."""
+    """
+    Types of business rules.
+
+    Members hash like their string values, so tallies can be keyed on the
+    member itself and only converted with .value for display.
+    """
     CONDITIONAL = "conditional"
     VALIDATION = "validation"
     CALCULATION = "calculation"
@@ -48,6 +54,16 @@ class RuleGroup(BaseModel):
     confidence: float
     centroid_embedding: Optional[List[float]] = None
 
+    @property
+    def tables(self) -> frozenset:
+        """Tables referenced by any rule in the group."""
+        return frozenset(chain.from_iterable(r.tables for r in self.rules))
+
+    @property
+    def columns(self) -> frozenset:
+        """Columns referenced by any rule in the group."""
+        return frozenset(chain.from_iterable(r.columns for r in self.rules))
+
 
 class RuleDependency(BaseModel):
     """Dependency between rules or rule groups."""
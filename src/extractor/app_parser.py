@@ -1,10 +1,136 @@
 """Application code parsing to find embedded SQL and conditional logic."""
 
+import ast
+import functools
+import hashlib
+import logging
+import mmap
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Union
 from pathlib import Path
 
 from . import Rule, RuleType, SourceLocation
+from ..utils.text import BINARY_SNIFF_SIZE, LineIndex, looks_binary
+
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency, fall back to substring search
+    ahocorasick = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# String literals, matched in a single left-to-right pass per file. Each
+# alternative consumes a whole literal, so the scan never restarts inside
+# one. Only the named groups are candidates for SQL; the unnamed
+# alternatives (e.g. Java char literals) are skipped over.
+_TRIPLE_DQ = r'"""(?P<dq3>.*?)"""'
+_TRIPLE_SQ = r"'''(?P<sq3>.*?)'''"
+_DQ = r'"(?P<dq>(?:[^"\\\n]|\\.)*)"'
+_SQ = r"'(?P<sq>(?:[^'\\\n]|\\.)*)'"
+
+_PY_STRING = re.compile("|".join([_TRIPLE_DQ, _TRIPLE_SQ, _DQ, _SQ]), re.DOTALL)
+_JAVA_STRING = re.compile(
+    "|".join([_TRIPLE_DQ, _DQ, r"'(?:[^'\\\n]|\\.)*'"]), re.DOTALL
+)
+_JS_STRING = re.compile(
+    "|".join([r'`(?P<bt>(?:[^`\\]|\\.)*)`', _DQ, _SQ]), re.DOTALL
+)
+
+_SELECT = re.compile(r'SELECT', re.IGNORECASE)
+_IF_PY = re.compile(r'if\s+(.+?):\s*\n')
+_IF_JAVA = re.compile(r'if\s*\((.+?)\)\s*\{')
+_WHERE = re.compile(r'WHERE', re.IGNORECASE)
+
+# Business logic indicators (matched case-insensitively), plus comparisons
+# with numbers
+_BUSINESS_KEYWORDS = (
+    'price', 'amount', 'total', 'discount', 'rate', 'fee',
+    'age', 'date', 'status', 'eligible', 'valid', 'approved',
+    'limit', 'threshold', 'minimum', 'maximum', 'balance',
+)
+_NUMERIC_COMPARISON = re.compile(r'[<>=]+\s*\d+')
+
+# With pyahocorasick installed, all keywords are found in one pass over a
+# condition however long the keyword list grows
+_BUSINESS_AUTOMATON = None
+if ahocorasick is not None:
+    _BUSINESS_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _BUSINESS_KEYWORDS:
+        _BUSINESS_AUTOMATON.add_word(_keyword, _keyword)
+    _BUSINESS_AUTOMATON.make_automaton()
+
+_PY_NAMED_PH = re.compile(r'%\((\w+)\)s')
+_PY_COLON_PH = re.compile(r':(\w+)')
+_PY_IDENT = re.compile(r'\b([a-z_][a-z0-9_]*)\b')
+_JAVA_IDENT = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b')
+_PY_KEYWORDS = frozenset({
+    'if', 'else', 'elif', 'for', 'while', 'in', 'is', 'not', 'and', 'or', 'true', 'false', 'none'
+})
+# Lower-case; Java identifiers are compared case-insensitively
+_JAVA_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'return', 'new', 'this', 'true', 'false', 'null'
+})
+_FROM = re.compile(r'FROM\s+(\w+)', re.IGNORECASE)
+_JOIN = re.compile(r'JOIN\s+(\w+)', re.IGNORECASE)
+
+# Bytes twins of the patterns scanned over whole files, so a memory-mapped
+# file can be searched without decoding it first
+_BYTES_PATTERNS = {
+    pattern: re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE)
+    for pattern in (_SELECT, _PY_STRING, _JAVA_STRING, _JS_STRING, _IF_PY, _IF_JAVA)
+}
+
+# File content: decoded text, or the raw bytes of a memory-mapped file
+Content = Union[str, bytes, mmap.mmap]
+
+
+def _pattern_for(pattern: re.Pattern, content: Content) -> re.Pattern:
+    """Get the str or bytes variant of a file-level pattern for content."""
+    return pattern if isinstance(content, str) else _BYTES_PATTERNS[pattern]
+
+
+def _contains(content: Content, *needles: str) -> bool:
+    """Check content for any needle with a plain substring search."""
+    if isinstance(content, str):
+        return any(content.find(needle) != -1 for needle in needles)
+    return any(content.find(needle.encode()) != -1 for needle in needles)
+
+
+def _decode(text: Union[str, bytes]) -> str:
+    """Decode a matched slice of raw file content, as a text-mode read would."""
+    if isinstance(text, str):
+        return text
+    return text.decode('utf-8', errors='ignore').replace('\r\n', '\n')
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_business_logic_cached(condition: str) -> bool:
+    """Check a condition for business logic, memoized across files."""
+    lowered = condition.lower()
+
+    # Business keywords or comparisons with numbers (often business rules)
+    if _BUSINESS_AUTOMATON is not None:
+        has_keyword = next(_BUSINESS_AUTOMATON.iter(lowered), None) is not None
+    else:
+        has_keyword = any(keyword in lowered for keyword in _BUSINESS_KEYWORDS)
+
+    return has_keyword or _NUMERIC_COMPARISON.search(condition) is not None
+
+
+@functools.lru_cache(maxsize=2048)
+def _extract_tables_cached(sql: str) -> Tuple[str, ...]:
+    """Extract table names from SQL, memoized since queries repeat across files."""
+    tables = set()
+
+    # FROM clause
+    tables.update(m.group(1) for m in _FROM.finditer(sql))
+
+    # JOIN clauses
+    tables.update(m.group(1) for m in _JOIN.finditer(sql))
+
+    return tuple(tables)
 
 
 class AppCodeParser:
@@ -22,88 +148,94 @@ class AppCodeParser:
         Returns:
             List of extracted rules
         """
+        return list(self._iter_rules(file_path, content, language))
+
+    def parse_path(self, file_path: str, language: str) -> Iterator[Rule]:
+        """
+        Parse an application code file straight from disk.
+
+        The file is memory-mapped and scanned as bytes, so only the matched
+        SQL strings and conditions are ever decoded (Python files are also
+        decoded whole for the AST); rules are yielded as they are found.
+
+        Args:
+            file_path: Path to the file
+            language: Programming language (python, java, javascript)
+
+        Yields:
+            Extracted rules
+        """
+        with open(file_path, 'rb') as f:
+            # Empty files cannot be mapped
+            if not f.seek(0, 2):
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                if looks_binary(content[:BINARY_SNIFF_SIZE]):
+                    logger.debug("Skipping binary file: %s", file_path)
+                    return
+
+                yield from self._iter_rules(file_path, content, language)
+
+    def _iter_rules(self, file_path: str, content: Content, language: str) -> Iterator[Rule]:
+        """Dispatch to the parser for a language."""
         if language == "python":
-            return self._parse_python(file_path, content)
+            yield from self._parse_python(file_path, content)
         elif language == "java":
-            return self._parse_java(file_path, content)
+            yield from self._parse_java(file_path, content)
         elif language == "javascript":
-            return self._parse_javascript(file_path, content)
-        return []
+            yield from self._parse_javascript(file_path, content)
 
-    def _parse_python(self, file_path: str, content: str) -> List[Rule]:
+    def _parse_python(self, file_path: str, content: Content) -> Iterator[Rule]:
         """Parse Python code."""
-        rules = []
+        lines = LineIndex(content)
 
         # Extract SQL strings
-        rules.extend(self._extract_sql_strings_python(file_path, content))
+        yield from self._extract_sql_strings_python(file_path, content, lines)
 
         # Extract conditional logic
-        rules.extend(self._extract_conditionals_python(file_path, content))
+        yield from self._extract_conditionals_python(file_path, content, lines)
 
-        return rules
-
-    def _extract_sql_strings_python(self, file_path: str, content: str) -> List[Rule]:
+    def _extract_sql_strings_python(
+        self, file_path: str, content: Content, lines: LineIndex
+    ) -> Iterator[Rule]:
         """Extract SQL strings from Python code."""
-        rules = []
+        path_bytes = file_path.encode('utf-8', 'surrogatepass')
 
         # Match SQL in strings (single, double, or triple quotes)
-        sql_patterns = [
-            r'"""(.*?SELECT.*?)"""',
-            r"'''(.*?SELECT.*?)'''",
-            r'"(.*?SELECT.*?)"',
-            r"'(.*?SELECT.*?)'"
-        ]
-
-        for pattern in sql_patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE | re.DOTALL):
-                sql_content = match.group(1).strip()
-
-                # Skip if too short
-                if len(sql_content) < 10:
-                    continue
-
-                line_num = content[:match.start()].count('\n') + 1
-
-                # Check for WHERE clause (indicates filtering logic)
-                if re.search(r'WHERE', sql_content, re.IGNORECASE):
-                    rule_id = f"rule_py_{hash(file_path + sql_content) % 1000000}"
-
-                    rule = Rule(
-                        id=rule_id,
-                        rule_type=RuleType.VALIDATION,
-                        description="SQL query with filtering condition",
-                        normalized_expression=sql_content[:200],
-                        variables=self._extract_placeholders_python(sql_content),
-                        tables=self._extract_table_names(sql_content),
-                        columns=[],
-                        source=SourceLocation(
-                            file_path=file_path,
-                            start_line=line_num,
-                            end_line=line_num + sql_content.count('\n'),
-                            snippet=sql_content[:500]
-                        ),
-                        confidence=0.8
-                    )
-                    rules.append(rule)
-
-        return rules
-
-    def _extract_conditionals_python(self, file_path: str, content: str) -> List[Rule]:
+        for start, end, sql_content in self._iter_sql_strings(_PY_STRING, content):
+            rule_id = self._generate_rule_id("rule_py", path_bytes, sql_content)
+
+            yield Rule(
+                id=rule_id,
+                rule_type=RuleType.VALIDATION,
+                description="SQL query with filtering condition",
+                normalized_expression=sql_content[:200],
+                variables=self._extract_placeholders_python(sql_content),
+                tables=self._extract_table_names(sql_content),
+                columns=[],
+                source=SourceLocation(
+                    file_path=file_path,
+                    start_line=lines.line_at(start),
+                    end_line=lines.line_at(end),
+                    snippet=sql_content[:500]
+                ),
+                confidence=0.8
+            )
+
+    def _extract_conditionals_python(
+        self, file_path: str, content: Content, lines: LineIndex
+    ) -> Iterator[Rule]:
         """Extract conditional logic from Python code."""
-        rules = []
+        path_bytes = file_path.encode('utf-8', 'surrogatepass')
 
         # Match if statements with business logic indicators
-        if_pattern = r'if\s+(.+?):\s*\n'
-
-        for match in re.finditer(if_pattern, content):
-            condition = match.group(1).strip()
-            line_num = content[:match.start()].count('\n') + 1
-
+        for condition, start_line, end_line, snippet in self._iter_conditions_python(content, lines):
             # Filter for business logic (not technical checks like 'if data' or 'if result')
             if self._is_business_logic(condition):
-                rule_id = f"rule_py_cond_{hash(file_path + condition) % 1000000}"
+                rule_id = self._generate_rule_id("rule_py_cond", path_bytes, condition)
 
-                rule = Rule(
+                yield Rule(
                     id=rule_id,
                     rule_type=RuleType.CONDITIONAL,
                     description=f"Python conditional: {condition[:50]}",
@@ -113,65 +245,101 @@ class AppCodeParser:
                     columns=[],
                     source=SourceLocation(
                         file_path=file_path,
-                        start_line=line_num,
-                        end_line=line_num,
-                        snippet=match.group(0)
+                        start_line=start_line,
+                        end_line=end_line,
+                        snippet=snippet
                     ),
                     confidence=0.7,
                     metadata={"language": "python"}
                 )
-                rules.append(rule)
-
-        return rules
-
-    def _parse_java(self, file_path: str, content: str) -> List[Rule]:
-        """Parse Java code."""
-        rules = []
 
-        # Extract SQL strings from Java
-        sql_pattern = r'"(.*?SELECT.*?)"'
+    def _iter_conditions_python(self, content: Content, lines: LineIndex):
+        """
+        Yield the conditions of if/elif statements in Python code.
 
-        for match in re.finditer(sql_pattern, content, re.IGNORECASE | re.DOTALL):
-            sql_content = match.group(1).strip()
+        Conditions come from the AST, so 'if' inside strings, comments and
+        comprehensions is ignored and multi-line conditions are kept whole.
+        Files that do not parse (e.g. Python 2) fall back to a line regex.
 
-            if len(sql_content) < 10:
-                continue
-
-            line_num = content[:match.start()].count('\n') + 1
+        Args:
+            content: File content, as text or raw bytes
+            lines: Line index over content
 
-            if re.search(r'WHERE', sql_content, re.IGNORECASE):
-                rule_id = f"rule_java_{hash(file_path + sql_content) % 1000000}"
+        Yields:
+            Tuples of (condition, start line, end line, source snippet)
+        """
+        # No 'if' keyword anywhere, so nothing to parse for
+        if not _contains(content, "if"):
+            return
+
+        text = content if isinstance(content, str) else _decode(content[:])
+
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            logger.debug("Python source does not parse, scanning if statements with a regex")
+            for match in _pattern_for(_IF_PY, content).finditer(content):
+                line_num = lines.line_at(match.start())
+                yield _decode(match.group(1)).strip(), line_num, line_num, _decode(match.group(0))
+            return
+
+        source_lines = text.split('\n')
+        nodes = sorted(
+            (node for node in ast.walk(tree) if isinstance(node, ast.If)),
+            key=lambda node: (node.lineno, node.col_offset)
+        )
+        for node in nodes:
+            test = node.test
+            start_line, end_line = node.lineno, test.end_lineno
+            snippet = "\n".join(source_lines[start_line - 1:end_line]).strip()
+
+            # Condition text as written; AST column offsets count UTF-8 bytes
+            parts = [line.encode() for line in source_lines[test.lineno - 1:end_line]]
+            parts[-1] = parts[-1][:test.end_col_offset]
+            parts[0] = parts[0][test.col_offset:]
+            condition = " ".join(part.decode().strip() for part in parts)
+
+            yield condition, start_line, end_line, snippet
+
+    def _parse_java(self, file_path: str, content: Content) -> Iterator[Rule]:
+        """Parse Java code."""
+        lines = LineIndex(content)
+        path_bytes = file_path.encode('utf-8', 'surrogatepass')
 
-                rule = Rule(
-                    id=rule_id,
-                    rule_type=RuleType.VALIDATION,
-                    description="SQL query from Java code",
-                    normalized_expression=sql_content[:200],
-                    variables=[],
-                    tables=self._extract_table_names(sql_content),
-                    columns=[],
-                    source=SourceLocation(
-                        file_path=file_path,
-                        start_line=line_num,
-                        end_line=line_num + sql_content.count('\n'),
-                        snippet=sql_content[:500]
-                    ),
-                    confidence=0.75,
-                    metadata={"language": "java"}
-                )
-                rules.append(rule)
+        # Extract SQL strings from Java
+        for start, end, sql_content in self._iter_sql_strings(_JAVA_STRING, content):
+            rule_id = self._generate_rule_id("rule_java", path_bytes, sql_content)
+
+            yield Rule(
+                id=rule_id,
+                rule_type=RuleType.VALIDATION,
+                description="SQL query from Java code",
+                normalized_expression=sql_content[:200],
+                variables=[],
+                tables=self._extract_table_names(sql_content),
+                columns=[],
+                source=SourceLocation(
+                    file_path=file_path,
+                    start_line=lines.line_at(start),
+                    end_line=lines.line_at(end),
+                    snippet=sql_content[:500]
+                ),
+                confidence=0.75,
+                metadata={"language": "java"}
+            )
 
         # Extract if statements
-        if_pattern = r'if\s*\((.+?)\)\s*\{'
+        if not _contains(content, "if"):
+            return
 
-        for match in re.finditer(if_pattern, content):
-            condition = match.group(1).strip()
-            line_num = content[:match.start()].count('\n') + 1
+        for match in _pattern_for(_IF_JAVA, content).finditer(content):
+            condition = _decode(match.group(1)).strip()
+            line_num = lines.line_at(match.start())
 
             if self._is_business_logic(condition):
-                rule_id = f"rule_java_cond_{hash(file_path + condition) % 1000000}"
+                rule_id = self._generate_rule_id("rule_java_cond", path_bytes, condition)
 
-                rule = Rule(
+                yield Rule(
                     id=rule_id,
                     rule_type=RuleType.CONDITIONAL,
                     description=f"Java conditional: {condition[:50]}",
@@ -183,79 +351,96 @@ class AppCodeParser:
                         file_path=file_path,
                         start_line=line_num,
                         end_line=line_num,
-                        snippet=match.group(0)
+                        snippet=_decode(match.group(0))
                     ),
                     confidence=0.7,
                     metadata={"language": "java"}
                 )
-                rules.append(rule)
 
-        return rules
-
-    def _parse_javascript(self, file_path: str, content: str) -> List[Rule]:
+    def _parse_javascript(self, file_path: str, content: Content) -> Iterator[Rule]:
         """Parse JavaScript/TypeScript code."""
-        rules = []
+        lines = LineIndex(content)
+        path_bytes = file_path.encode('utf-8', 'surrogatepass')
 
         # Extract SQL strings (often in template literals)
-        sql_patterns = [
-            r'`(.*?SELECT.*?)`',
-            r'"(.*?SELECT.*?)"',
-            r"'(.*?SELECT.*?)'"
-        ]
-
-        for pattern in sql_patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE | re.DOTALL):
-                sql_content = match.group(1).strip()
-
-                if len(sql_content) < 10:
-                    continue
-
-                line_num = content[:match.start()].count('\n') + 1
-
-                if re.search(r'WHERE', sql_content, re.IGNORECASE):
-                    rule_id = f"rule_js_{hash(file_path + sql_content) % 1000000}"
-
-                    rule = Rule(
-                        id=rule_id,
-                        rule_type=RuleType.VALIDATION,
-                        description="SQL query from JavaScript code",
-                        normalized_expression=sql_content[:200],
-                        variables=[],
-                        tables=self._extract_table_names(sql_content),
-                        columns=[],
-                        source=SourceLocation(
-                            file_path=file_path,
-                            start_line=line_num,
-                            end_line=line_num + sql_content.count('\n'),
-                            snippet=sql_content[:500]
-                        ),
-                        confidence=0.75,
-                        metadata={"language": "javascript"}
-                    )
-                    rules.append(rule)
-
-        return rules
+        for start, end, sql_content in self._iter_sql_strings(_JS_STRING, content):
+            rule_id = self._generate_rule_id("rule_js", path_bytes, sql_content)
+
+            yield Rule(
+                id=rule_id,
+                rule_type=RuleType.VALIDATION,
+                description="SQL query from JavaScript code",
+                normalized_expression=sql_content[:200],
+                variables=[],
+                tables=self._extract_table_names(sql_content),
+                columns=[],
+                source=SourceLocation(
+                    file_path=file_path,
+                    start_line=lines.line_at(start),
+                    end_line=lines.line_at(end),
+                    snippet=sql_content[:500]
+                ),
+                confidence=0.75,
+                metadata={"language": "javascript"}
+            )
+
+    def _iter_sql_strings(self, string_pattern: re.Pattern, content: Content):
+        """
+        Yield string literals that hold a filtering SQL query.
 
-    def _is_business_logic(self, condition: str) -> bool:
-        """Determine if condition represents business logic."""
-        # Business logic indicators
-        business_keywords = [
-            'price', 'amount', 'total', 'discount', 'rate', 'fee',
-            'age', 'date', 'status', 'eligible', 'valid', 'approved',
-            'limit', 'threshold', 'minimum', 'maximum', 'balance'
-        ]
+        Each query text is yielded once per file; repeats of it (copy-pasted
+        queries) would only produce rules with the same ID.
+
+        Args:
+            string_pattern: Compiled string literal pattern for the language
+            content: File content, as text or raw bytes
+
+        Yields:
+            Tuples of (offset of the first SQL character, offset of the
+            last SQL character, stripped SQL text); offsets index content
+        """
+        # Most files hold no SQL at all; searching for SELECT, in any case
+        # as the per-string check below, is far cheaper than tokenizing
+        # every string literal to find that out
+        if not _pattern_for(_SELECT, content).search(content):
+            return
+
+        seen = set()
+        for match in _pattern_for(string_pattern, content).finditer(content):
+            if match.lastgroup is None:
+                continue
 
-        condition_lower = condition.lower()
+            body = match.group(match.lastgroup)
+            stripped = body.strip()
+            sql_content = _decode(stripped)
 
-        # Check for business keywords
-        if any(keyword in condition_lower for keyword in business_keywords):
-            return True
+            # Skip if too short
+            if len(sql_content) < 10:
+                continue
+
+            # A query repeated in the file was already yielded
+            if sql_content in seen:
+                continue
 
-        # Check for comparisons with numbers (often business rules)
-        if re.search(r'[<>=]+\s*\d+', condition):
-            return True
+            # Only queries with a WHERE clause carry filtering logic
+            if _SELECT.search(sql_content) and _WHERE.search(sql_content):
+                seen.add(sql_content)
+                start = match.start(match.lastgroup) + len(body) - len(body.lstrip())
+                yield start, start + len(stripped) - 1, sql_content
 
-        return False
+    def _generate_rule_id(self, prefix: str, path_bytes: bytes, content: str) -> str:
+        """
+        Generate a stable rule ID from the file path and matched text.
+
+        A 64-bit digest keeps collisions negligible across a repository.
+        """
+        digest = hashlib.blake2b(path_bytes, digest_size=8)
+        digest.update(content.encode('utf-8', 'surrogatepass'))
+        return f"{prefix}_{digest.hexdigest()}"
+
+    def _is_business_logic(self, condition: str) -> bool:
+        """Determine if condition represents business logic."""
+        return _is_business_logic_cached(condition)
 
     def _extract_placeholders_python(self, sql: str) -> List[str]:
         """Extract SQL placeholders from Python SQL string."""
@@ -263,39 +448,21 @@ class AppCodeParser:
         placeholders = []
 
         # Named placeholders
-        placeholders.extend(re.findall(r'%\((\w+)\)s', sql))
-        placeholders.extend(re.findall(r':(\w+)', sql))
+        placeholders.extend(_PY_NAMED_PH.findall(sql))
+        placeholders.extend(_PY_COLON_PH.findall(sql))
 
         return list(set(placeholders))
 
     def _extract_variables_python(self, code: str) -> List[str]:
         """Extract variable names from Python code."""
-        # Match identifiers
-        variables = re.findall(r'\b([a-z_][a-z0-9_]*)\b', code)
-
-        # Filter Python keywords
-        keywords = {'if', 'else', 'elif', 'for', 'while', 'in', 'is', 'not', 'and', 'or', 'true', 'false', 'none'}
-        return list(set([v for v in variables if v not in keywords]))
+        # Match identifiers, filtering Python keywords
+        return list({v for v in _PY_IDENT.findall(code) if v not in _PY_KEYWORDS})
 
     def _extract_variables_java(self, code: str) -> List[str]:
         """Extract variable names from Java code."""
-        # Match identifiers (camelCase typical in Java)
-        variables = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', code)
-
-        # Filter Java keywords
-        keywords = {'if', 'else', 'for', 'while', 'return', 'new', 'this', 'true', 'false', 'null'}
-        return list(set([v for v in variables if v.lower() not in keywords]))
+        # Match identifiers (camelCase typical in Java), filtering Java keywords
+        return list({v for v in _JAVA_IDENT.findall(code) if v.lower() not in _JAVA_KEYWORDS})
 
     def _extract_table_names(self, sql: str) -> List[str]:
         """Extract table names from SQL."""
-        tables = []
-
-        # FROM clause
-        from_matches = re.finditer(r'FROM\s+(\w+)', sql, re.IGNORECASE)
-        tables.extend([m.group(1) for m in from_matches])
-
-        # JOIN clauses
-        join_matches = re.finditer(r'JOIN\s+(\w+)', sql, re.IGNORECASE)
-        tables.extend([m.group(1) for m in join_matches])
-
-        return list(set(tables))
+        return list(_extract_tables_cached(sql))
@@ -1,10 +1,11 @@
 """Clustering and grouping of business rules."""
 
 import logging
+from collections import Counter
+from itertools import chain
 from typing import List, Dict
 import numpy as np
-from sklearn.cluster import KMeans, DBSCAN, AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.cluster import KMeans, MiniBatchKMeans, DBSCAN, AgglomerativeClustering
 
 from . import Rule, RuleGroup
 
@@ -24,6 +25,8 @@ class RuleClusterer:
         """
         self.config = config
         self.clustering_config = config.get("clustering", {})
+        # Rule type tallies of the rules passed to the last cluster_rules() call
+        self.counts = Counter()
 
     def cluster_rules(self, rules: List[Rule]) -> List[RuleGroup]:
         """
@@ -36,6 +39,7 @@ class RuleClusterer:
             List of rule groups
         """
         if len(rules) == 0:
+            self.counts = Counter()
             return []
 
         logger.info(f"Clustering {len(rules)} rules")
@@ -47,6 +51,10 @@ class RuleClusterer:
             logger.warning("No embeddings available, using metadata-based grouping")
             return self._cluster_by_metadata(rules)
 
+        # L2-normalize every embedding once; DBSCAN and group confidence
+        # both work on unit vectors
+        unit_embeddings = self._normalize(embeddings)
+
         # Perform clustering
         method = self.clustering_config.get("method", "kmeans")
 
@@ -55,28 +63,59 @@ class RuleClusterer:
         elif method == "hierarchical":
             labels = self._cluster_hierarchical(embeddings)
         elif method == "dbscan":
-            labels = self._cluster_dbscan(embeddings)
+            labels = self._cluster_dbscan(unit_embeddings)
         else:
             logger.warning(f"Unknown clustering method {method}, using kmeans")
             labels = self._cluster_kmeans(embeddings)
 
         # Create rule groups
-        groups = self._create_groups(rules, labels, embeddings)
+        groups = self._create_groups(rules, labels, embeddings, unit_embeddings)
 
         logger.info(f"Created {len(groups)} rule groups")
         return groups
 
     def _extract_embeddings(self, rules: List[Rule]) -> np.ndarray:
-        """Extract embeddings from rules."""
-        embeddings = []
+        """
+        Extract embeddings from rules, tallying rule types on the way.
 
-        for rule in rules:
-            if rule.embedding is not None:
-                embeddings.append(rule.embedding)
+        The matrix is float32 whatever precision the embeddings arrived in;
+        KMeans, DBSCAN and the confidence dot products all accept it and
+        move half the bytes of float64.
+
+        Args:
+            rules: List of rules
+
+        Returns:
+            (N, D) float32 embedding matrix, or None if any rule lacks one
+        """
+        self.counts = Counter()
+        if not rules:
+            return None
+
+        # Copy rows straight into a preallocated matrix instead of building
+        # a list of lists and converting it afterwards
+        first = rules[0].embedding
+        embeddings = None
+        if first is not None:
+            embeddings = np.empty((len(rules), len(first)), dtype=np.float32)
+
+        for i, rule in enumerate(rules):
+            self.counts[rule.rule_type] += 1
+            if embeddings is None:
+                continue
+            if rule.embedding is None:
+                embeddings = None
             else:
-                return None
+                embeddings[i] = rule.embedding
+
+        return embeddings
 
-        return np.array(embeddings)
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """Scale each embedding to unit length, leaving zero vectors as is."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
 
     def _cluster_kmeans(self, embeddings: np.ndarray) -> np.ndarray:
         """Cluster using K-means."""
@@ -85,9 +124,19 @@ class RuleClusterer:
             len(embeddings)
         )
 
-        logger.info(f"Clustering with K-means (k={n_clusters})")
+        # Full Lloyd iterations over every rule dominate on large corpora;
+        # past the threshold, fit on mini-batches instead
+        minibatch_threshold = self.clustering_config.get("minibatch_threshold", 1000)
+
+        if len(embeddings) > minibatch_threshold:
+            logger.info(f"Clustering with mini-batch K-means (k={n_clusters})")
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_clusters, batch_size=256, n_init=3, random_state=42
+            )
+        else:
+            logger.info(f"Clustering with K-means (k={n_clusters})")
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init="auto")
 
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         labels = kmeans.fit_predict(embeddings)
 
         return labels
@@ -106,15 +155,33 @@ class RuleClusterer:
 
         return labels
 
-    def _cluster_dbscan(self, embeddings: np.ndarray) -> np.ndarray:
-        """Cluster using DBSCAN."""
+    def _cluster_dbscan(self, unit_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Cluster using DBSCAN.
+
+        On unit vectors cosine distance is half the squared euclidean
+        distance, so the configured cosine eps becomes sqrt(2 * eps) and
+        neighbour queries can use a ball tree instead of brute force.
+
+        Args:
+            unit_embeddings: L2-normalized embedding matrix
+
+        Returns:
+            Cluster labels, -1 for noise
+        """
         eps = self.clustering_config.get("eps", 0.3)
         min_samples = self.clustering_config.get("min_samples", 2)
 
         logger.info(f"Clustering with DBSCAN (eps={eps}, min_samples={min_samples})")
 
-        clusterer = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine')
-        labels = clusterer.fit_predict(embeddings)
+        clusterer = DBSCAN(
+            eps=np.sqrt(2 * eps),
+            min_samples=min_samples,
+            metric='euclidean',
+            algorithm='ball_tree',
+            n_jobs=-1
+        )
+        labels = clusterer.fit_predict(unit_embeddings)
 
         return labels
 
@@ -147,38 +214,44 @@ class RuleClusterer:
         return groups
 
     def _create_groups(
-        self, rules: List[Rule], labels: np.ndarray, embeddings: np.ndarray
+        self,
+        rules: List[Rule],
+        labels: np.ndarray,
+        embeddings: np.ndarray,
+        unit_embeddings: np.ndarray
     ) -> List[RuleGroup]:
         """Create rule groups from clustering labels."""
-        groups_dict = {}
-
-        # Group rules by label
-        for rule, label in zip(rules, labels):
-            label = int(label)  # Convert to Python int
-
-            if label not in groups_dict:
-                groups_dict[label] = []
-
-            groups_dict[label].append(rule)
-
-        # Create RuleGroup objects
+        # Sort rules by label (stable, so each group keeps rule order) and
+        # reorder the embeddings once; every group is then a contiguous slice
+        labels = np.asarray(labels)
+        order = np.argsort(labels, kind="stable")
+        sorted_labels = labels[order]
+        sorted_embeddings = embeddings[order]
+        sorted_units = unit_embeddings[order]
+
+        unique_labels, starts = np.unique(sorted_labels, return_index=True)
+        ends = np.append(starts[1:], len(sorted_labels))
+
+        # Create RuleGroup objects, in order of each label's first rule
         groups = []
-        for label, group_rules in groups_dict.items():
+        for k in np.argsort(order[starts], kind="stable"):
+            label, start, end = int(unique_labels[k]), starts[k], ends[k]
+            group_rules = [rules[i] for i in order[start:end]]
+
             # Skip noise cluster from DBSCAN (-1)
             if label == -1:
                 logger.info(f"Skipping {len(group_rules)} rules in noise cluster")
                 continue
 
             # Calculate centroid
-            group_embeddings = np.array([r.embedding for r in group_rules])
-            centroid = np.mean(group_embeddings, axis=0)
+            centroid = sorted_embeddings[start:end].mean(axis=0)
 
             # Infer category and name
             category = self._infer_category(group_rules)
             name = self._infer_group_name(group_rules, category)
 
             # Calculate confidence based on intra-cluster similarity
-            confidence = self._calculate_group_confidence(group_embeddings, centroid)
+            confidence = self._calculate_group_confidence(sorted_units[start:end], centroid)
 
             group = RuleGroup(
                 id=f"group_{label}",
@@ -196,40 +269,32 @@ class RuleClusterer:
     def _infer_category(self, rules: List[Rule]) -> str:
         """Infer category from rules."""
         # Count domain concepts
-        concept_counts = {}
-
-        for rule in rules:
-            concepts = rule.metadata.get("domain_concepts", [])
-            for concept in concepts:
-                concept_counts[concept] = concept_counts.get(concept, 0) + 1
+        concept_counts = Counter(
+            chain.from_iterable(r.metadata.get("domain_concepts", ()) for r in rules)
+        )
 
-        if concept_counts:
+        top = concept_counts.most_common(1)
+        if top:
             # Return most common concept
-            return max(concept_counts.items(), key=lambda x: x[1])[0].title()
+            return top[0][0].title()
 
         # Fallback to rule type
         return rules[0].rule_type.value.title() if rules else "General"
 
     def _infer_group_name(self, rules: List[Rule], category: str) -> str:
         """Infer group name."""
-        # Get common tables
-        table_counts = {}
-        for rule in rules:
-            for table in rule.tables:
-                table_counts[table] = table_counts.get(table, 0) + 1
+        # Get most common table
+        top = Counter(chain.from_iterable(r.tables for r in rules)).most_common(1)
 
-        if table_counts:
-            common_table = max(table_counts.items(), key=lambda x: x[1])[0]
-            return f"{category} - {common_table}"
+        if top:
+            return f"{category} - {top[0][0]}"
 
         return f"{category} Rules"
 
     def _generate_group_description(self, rules: List[Rule]) -> str:
         """Generate description for group."""
         rule_types = set(r.rule_type.value for r in rules)
-        tables = set()
-        for r in rules:
-            tables.update(r.tables)
+        tables = set(chain.from_iterable(r.tables for r in rules))
 
         desc_parts = [
             f"Group of {len(rules)} rules",
@@ -242,15 +307,24 @@ class RuleClusterer:
         return ". ".join(desc_parts)
 
     def _calculate_group_confidence(
-        self, embeddings: np.ndarray, centroid: np.ndarray
+        self, unit_embeddings: np.ndarray, centroid: np.ndarray
     ) -> float:
-        """Calculate confidence score for group."""
-        if len(embeddings) == 0:
+        """
+        Calculate confidence score for group.
+
+        Args:
+            unit_embeddings: L2-normalized embeddings of the group's rules
+            centroid: Group centroid (not normalized)
+
+        Returns:
+            Average cosine similarity of the rules to the centroid
+        """
+        centroid_norm = np.linalg.norm(centroid)
+        if len(unit_embeddings) == 0 or centroid_norm == 0:
             return 0.0
 
-        # Calculate average cosine similarity to centroid
-        centroid_reshaped = centroid.reshape(1, -1)
-        similarities = cosine_similarity(embeddings, centroid_reshaped)
-        avg_similarity = np.mean(similarities)
+        # Average cosine similarity to centroid as a single matrix-vector product
+        avg_similarity = float(np.mean(unit_embeddings @ (centroid / centroid_norm)))
 
-        return float(avg_similarity)
+        # Rounding can push a single-rule group marginally above 1
+        return min(avg_similarity, 1.0)
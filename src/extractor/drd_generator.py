@@ -1,8 +1,12 @@
 """DMN-compliant DRD (Decision Requirements Diagram) generation."""
 
+import io
 import logging
-from typing import List, Dict, Set
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Dict, Set, Tuple, Union
 from datetime import datetime
+from itertools import chain
+from xml.sax.saxutils import escape
 from lxml import etree as ET
 import networkx as nx
 
@@ -11,6 +15,33 @@ from . import Rule, RuleGroup, RuleDependency, DecisionModel
 
 logger = logging.getLogger(__name__)
 
+# Fixed DMN namespaces, registered with lxml once per process
+_DMN_NAMESPACES = {
+    "dmn": "https://www.omg.org/spec/DMN/20191111/MODEL/",
+    "dmndi": "https://www.omg.org/spec/DMN/20191111/DMNDI/",
+    "dc": "http://www.omg.org/spec/DMN/20180521/DC/",
+    "di": "http://www.omg.org/spec/DMN/20180521/DI/",
+}
+for _prefix, _uri in _DMN_NAMESPACES.items():
+    ET.register_namespace(_prefix, _uri)
+
+# Extra entities for text placed inside a double-quoted attribute
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+# Report preamble; each group section below it starts with a blank line
+_MARKDOWN_HEADER = """# Business Rules Report
+
+Generated: {generated}
+
+## Summary
+
+- Total Rules: {rules}
+- Rule Groups: {groups}
+- Dependencies: {dependencies}
+
+## Rule Groups
+"""
+
 
 class DRDGenerator:
     """Generate DMN-compliant Decision Requirements Documents."""
@@ -25,15 +56,40 @@ class DRDGenerator:
         self.config = config
         self.dmn_config = config.get("dmn", {})
 
-        # DMN namespaces
+        # DMN namespaces; the configurable extension namespace is never
+        # registered globally, as every element is created with an nsmap
         self.namespaces = {
-            "dmn": "https://www.omg.org/spec/DMN/20191111/MODEL/",
-            "dmndi": "https://www.omg.org/spec/DMN/20191111/DMNDI/",
-            "dc": "http://www.omg.org/spec/DMN/20180521/DC/",
-            "di": "http://www.omg.org/spec/DMN/20180521/DI/",
+            **_DMN_NAMESPACES,
             "ext": self.dmn_config.get("namespace", "http://sql-rule-extractor/dmn")
         }
 
+        # Qualified tag names, built once rather than formatted per element
+        self.dmn_tags = {
+            name: ET.QName(self.namespaces["dmn"], name)
+            for name in (
+                "definitions", "decision", "description", "variable",
+                "literalExpression", "text", "decisionTable", "input", "output",
+                "rule", "inputEntry", "outputEntry", "informationRequirement",
+                "requiredDecision", "extensionElements", "inputData", "knowledgeSource"
+            )
+        }
+        self.ext_tags = {
+            name: ET.QName(self.namespaces["ext"], name)
+            for name in ("traceability", "source", "snippet")
+        }
+
+        # Namespaces used inside decisions and other top-level elements.
+        # Each is built as a standalone tree declaring these itself, and the
+        # declarations are stripped when it is written under <definitions>,
+        # which already declares them
+        self.element_nsmap = {
+            "dmn": self.namespaces["dmn"],
+            "ext": self.namespaces["ext"]
+        }
+        self._element_xmlns = ET.tostring(
+            ET.Element("probe", nsmap=self.element_nsmap), encoding="utf-8"
+        )[len(b"<probe"):-len(b"/>")]
+
     def generate_drd(self, decision_model: DecisionModel) -> str:
         """
         Generate DMN XML from decision model.
@@ -44,42 +100,41 @@ class DRDGenerator:
         Returns:
             DMN XML string
         """
-        logger.info("Generating DMN/DRD")
-
-        # Create root element
-        root = self._create_root()
+        buffer = io.BytesIO()
+        self.write_drd(decision_model, buffer)
+        return buffer.getvalue().decode("utf-8")
 
-        # Create decision graph
-        graph = self._build_decision_graph(decision_model)
-
-        # Add decisions (one per rule group)
-        for group in decision_model.groups:
-            self._add_decision(root, group, decision_model)
-
-        # Add input data elements
-        input_data_elements = self._identify_input_data(decision_model)
-        for input_data in input_data_elements:
-            self._add_input_data(root, input_data)
+    def write_drd(
+        self, decision_model: DecisionModel, output: Union[str, BinaryIO]
+    ) -> None:
+        """
+        Write DMN XML for a decision model incrementally.
 
-        # Add knowledge sources (files)
-        knowledge_sources = self._identify_knowledge_sources(decision_model)
-        for ks in knowledge_sources:
-            self._add_knowledge_source(root, ks)
+        Each decision, input data and knowledge source element is built as a
+        small standalone tree, serialized and dropped, so the whole document
+        is never held in memory at once.
 
-        # Convert to string
-        xml_str = self._to_xml_string(root)
+        Args:
+            decision_model: Complete decision model
+            output: Output file path or binary file object
+        """
+        logger.info("Generating DMN/DRD")
 
-        return xml_str
+        if isinstance(output, str):
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            with open(output, "wb") as f:
+                self._write_drd(decision_model, f)
+        else:
+            self._write_drd(decision_model, output)
 
-    def _create_root(self) -> ET.Element:
-        """Create root DMN element."""
-        # Register namespaces
-        for prefix, uri in self.namespaces.items():
-            ET.register_namespace(prefix, uri)
+    def _write_drd(self, decision_model: DecisionModel, out: BinaryIO) -> None:
+        """Write the DMN document to a binary file object."""
+        pretty_print = self.config.get("output", {}).get("pretty_print_xml", True)
 
-        # Create root
+        # Root element; its start and end tags are written around the
+        # streamed children
         root = ET.Element(
-            f"{{{self.namespaces['dmn']}}}definitions",
+            self.dmn_tags["definitions"],
             nsmap=self.namespaces,
             attrib={
                 "id": "sql_rule_extractor_drd",
@@ -90,17 +145,75 @@ class DRDGenerator:
             }
         )
 
-        return root
+        elements = self._iter_drd_elements(decision_model)
+        first = next(elements, None)
+        if first is None:
+            out.write(ET.tostring(
+                root, encoding="utf-8", xml_declaration=True, pretty_print=pretty_print
+            ))
+            return
+
+        root.text = ""
+        head = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        end_tag = head[head.rindex(b"</"):]
+        out.write(head[:-len(end_tag)])
+
+        for element in chain([first], elements):
+            if pretty_print:
+                ET.indent(element, space="  ", level=1)
+                out.write(b"\n  ")
+            out.write(
+                ET.tostring(element, encoding="utf-8").replace(self._element_xmlns, b"", 1)
+            )
 
-    def _add_decision(
-        self, root: ET.Element, group: RuleGroup, model: DecisionModel
-    ) -> None:
-        """Add a decision element for a rule group."""
+        if pretty_print:
+            out.write(b"\n")
+        out.write(end_tag)
+        if pretty_print:
+            out.write(b"\n")
+
+    def _iter_drd_elements(self, decision_model: DecisionModel) -> Iterator[ET.Element]:
+        """Yield the top-level elements of the DMN definitions in order."""
+        # Index dependencies by source group once, instead of scanning all
+        # of them for every decision
+        deps_by_source = {}
+        for dep in decision_model.dependencies:
+            deps_by_source.setdefault(dep.source_id, []).append(dep)
+
+        # Decisions (one per rule group)
+        for group in decision_model.groups:
+            yield self._create_decision(group, deps_by_source)
+
+        input_data_list, knowledge_sources = self._collect_model_facets(decision_model)
+
+        # Input data elements
+        for input_data in input_data_list:
+            yield self._create_input_data(input_data)
+
+        # Knowledge sources (files)
+        for ks in knowledge_sources:
+            yield self._create_knowledge_source(ks)
+
+    def _create_decision(
+        self,
+        group: RuleGroup,
+        deps_by_source: Dict[str, List[RuleDependency]]
+    ) -> ET.Element:
+        """
+        Create the decision element for a rule group.
+
+        Args:
+            group: Rule group the decision represents
+            deps_by_source: Dependencies keyed by source group ID
+
+        Returns:
+            Standalone decision element
+        """
         decision_id = f"{self.dmn_config.get('decision_prefix', 'Decision_')}{group.id}"
 
-        decision = ET.SubElement(
-            root,
-            f"{{{self.namespaces['dmn']}}}decision",
+        decision = ET.Element(
+            self.dmn_tags["decision"],
+            nsmap=self.element_nsmap,
             attrib={
                 "id": decision_id,
                 "name": group.name
@@ -108,13 +221,13 @@ class DRDGenerator:
         )
 
         # Add description
-        desc = ET.SubElement(decision, f"{{{self.namespaces['dmn']}}}description")
+        desc = ET.SubElement(decision, self.dmn_tags["description"])
         desc.text = group.description
 
         # Add variable
         variable = ET.SubElement(
             decision,
-            f"{{{self.namespaces['dmn']}}}variable",
+            self.dmn_tags["variable"],
             attrib={
                 "id": f"var_{decision_id}",
                 "name": group.name.replace(" ", "_").lower()
@@ -125,29 +238,30 @@ class DRDGenerator:
         self._add_decision_logic(decision, group)
 
         # Add information requirements (dependencies)
-        for dep in model.dependencies:
-            if dep.source_id == group.id:
-                info_req = ET.SubElement(
-                    decision,
-                    f"{{{self.namespaces['dmn']}}}informationRequirement"
-                )
-                required_decision = ET.SubElement(
-                    info_req,
-                    f"{{{self.namespaces['dmn']}}}requiredDecision",
-                    attrib={"href": f"#Decision_{dep.target_id}"}
-                )
+        for dep in deps_by_source.get(group.id, ()):
+            info_req = ET.SubElement(
+                decision,
+                self.dmn_tags["informationRequirement"]
+            )
+            required_decision = ET.SubElement(
+                info_req,
+                self.dmn_tags["requiredDecision"],
+                attrib={"href": f"#Decision_{dep.target_id}"}
+            )
 
         # Add traceability extension
         if self.dmn_config.get("include_extensions", True):
             self._add_traceability_extension(decision, group)
 
+        return decision
+
     def _add_decision_logic(self, decision: ET.Element, group: RuleGroup) -> None:
         """Add decision logic (decision table or literal expression)."""
         if len(group.rules) <= 3:
             # Use literal expression for simple decisions
             expr = ET.SubElement(
                 decision,
-                f"{{{self.namespaces['dmn']}}}literalExpression",
+                self.dmn_tags["literalExpression"],
                 attrib={"id": f"expr_{group.id}"}
             )
 
@@ -156,58 +270,33 @@ class DRDGenerator:
             for rule in group.rules:
                 text_parts.append(rule.normalized_expression)
 
-            text_elem = ET.SubElement(expr, f"{{{self.namespaces['dmn']}}}text")
+            text_elem = ET.SubElement(expr, self.dmn_tags["text"])
             text_elem.text = "\n".join(text_parts)
         else:
-            # Use decision table for complex decisions
-            table = ET.SubElement(
-                decision,
-                f"{{{self.namespaces['dmn']}}}decisionTable",
-                attrib={
-                    "id": f"table_{group.id}",
-                    "hitPolicy": "FIRST"
-                }
-            )
-
-            # Add input (simplified)
-            input_elem = ET.SubElement(
-                table,
-                f"{{{self.namespaces['dmn']}}}input",
-                attrib={"id": f"input_{group.id}"}
-            )
-
-            # Add output
-            output_elem = ET.SubElement(
-                table,
-                f"{{{self.namespaces['dmn']}}}output",
-                attrib={"id": f"output_{group.id}", "name": "result"}
+            # Use decision table for complex decisions. The table is built as
+            # one markup string and parsed in a single call, rather than
+            # creating five elements per rule through the Python API
+            group_id = escape(group.id, _ATTR_ENTITIES)
+            rows = "".join(
+                f'<dmn:rule id="rule_{group_id}_{i}">'
+                f'<dmn:inputEntry id="input_entry_{group_id}_{i}">'
+                f'<dmn:text>{escape(rule.normalized_expression[:100])}</dmn:text>'
+                f'</dmn:inputEntry>'
+                f'<dmn:outputEntry id="output_entry_{group_id}_{i}">'
+                f'<dmn:text>true</dmn:text>'
+                f'</dmn:outputEntry>'
+                f'</dmn:rule>'
+                for i, rule in enumerate(group.rules[:10])  # Limit to 10 for brevity
             )
 
-            # Add rules
-            for i, rule in enumerate(group.rules[:10]):  # Limit to 10 for brevity
-                rule_elem = ET.SubElement(
-                    table,
-                    f"{{{self.namespaces['dmn']}}}rule",
-                    attrib={"id": f"rule_{group.id}_{i}"}
-                )
-
-                # Input entry
-                input_entry = ET.SubElement(
-                    rule_elem,
-                    f"{{{self.namespaces['dmn']}}}inputEntry",
-                    attrib={"id": f"input_entry_{group.id}_{i}"}
-                )
-                input_text = ET.SubElement(input_entry, f"{{{self.namespaces['dmn']}}}text")
-                input_text.text = rule.normalized_expression[:100]
-
-                # Output entry
-                output_entry = ET.SubElement(
-                    rule_elem,
-                    f"{{{self.namespaces['dmn']}}}outputEntry",
-                    attrib={"id": f"output_entry_{group.id}_{i}"}
-                )
-                output_text = ET.SubElement(output_entry, f"{{{self.namespaces['dmn']}}}text")
-                output_text.text = "true"
+            decision.append(ET.fromstring(
+                f'<dmn:decisionTable xmlns:dmn="{self.namespaces["dmn"]}" '
+                f'id="table_{group_id}" hitPolicy="FIRST">'
+                f'<dmn:input id="input_{group_id}"/>'
+                f'<dmn:output id="output_{group_id}" name="result"/>'
+                f'{rows}'
+                f'</dmn:decisionTable>'
+            ))
 
     def _add_traceability_extension(
         self, decision: ET.Element, group: RuleGroup
@@ -215,19 +304,19 @@ class DRDGenerator:
         """Add custom extension elements for traceability."""
         ext_elements = ET.SubElement(
             decision,
-            f"{{{self.namespaces['dmn']}}}extensionElements"
+            self.dmn_tags["extensionElements"]
         )
 
         traceability = ET.SubElement(
             ext_elements,
-            f"{{{self.namespaces['ext']}}}traceability"
+            self.ext_tags["traceability"]
         )
 
         # Add source information for each rule
         for rule in group.rules:
             source_elem = ET.SubElement(
                 traceability,
-                f"{{{self.namespaces['ext']}}}source",
+                self.ext_tags["source"],
                 attrib={
                     "ruleId": rule.id,
                     "file": rule.source.file_path,
@@ -240,17 +329,19 @@ class DRDGenerator:
             # Add code snippet
             snippet_elem = ET.SubElement(
                 source_elem,
-                f"{{{self.namespaces['ext']}}}snippet"
+                self.ext_tags["snippet"]
             )
-            snippet_elem.text = rule.source.snippet
+            # CDATA keeps SQL readable and skips escaping <, > and &
+            if rule.source.snippet:
+                snippet_elem.text = ET.CDATA(rule.source.snippet)
 
-    def _add_input_data(self, root: ET.Element, input_data: Dict) -> None:
-        """Add input data element."""
+    def _create_input_data(self, input_data: Dict) -> ET.Element:
+        """Create input data element."""
         input_id = f"{self.dmn_config.get('input_data_prefix', 'InputData_')}{input_data['name']}"
 
-        input_elem = ET.SubElement(
-            root,
-            f"{{{self.namespaces['dmn']}}}inputData",
+        input_elem = ET.Element(
+            self.dmn_tags["inputData"],
+            nsmap=self.element_nsmap,
             attrib={
                 "id": input_id,
                 "name": input_data["name"]
@@ -260,20 +351,22 @@ class DRDGenerator:
         # Add variable
         variable = ET.SubElement(
             input_elem,
-            f"{{{self.namespaces['dmn']}}}variable",
+            self.dmn_tags["variable"],
             attrib={
                 "id": f"var_{input_id}",
                 "name": input_data["name"]
             }
         )
 
-    def _add_knowledge_source(self, root: ET.Element, ks: Dict) -> None:
-        """Add knowledge source element."""
+        return input_elem
+
+    def _create_knowledge_source(self, ks: Dict) -> ET.Element:
+        """Create knowledge source element."""
         ks_id = f"KnowledgeSource_{ks['id']}"
 
-        ks_elem = ET.SubElement(
-            root,
-            f"{{{self.namespaces['dmn']}}}knowledgeSource",
+        ks_elem = ET.Element(
+            self.dmn_tags["knowledgeSource"],
+            nsmap=self.element_nsmap,
             attrib={
                 "id": ks_id,
                 "name": ks["name"]
@@ -281,36 +374,45 @@ class DRDGenerator:
         )
 
         # Add description with file path
-        desc = ET.SubElement(ks_elem, f"{{{self.namespaces['dmn']}}}description")
+        desc = ET.SubElement(ks_elem, self.dmn_tags["description"])
         desc.text = f"Source file: {ks['file_path']}"
 
-    def _identify_input_data(self, model: DecisionModel) -> List[Dict]:
-        """Identify input data elements from rules."""
-        input_data_set = set()
+        return ks_elem
 
-        for group in model.groups:
-            for rule in group.rules:
-                # Add columns as input data
-                for column in rule.columns:
-                    input_data_set.add(column)
+    def _collect_model_facets(self, model: DecisionModel) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Identify input data and knowledge sources in one pass over the rules.
 
-        return [{"name": name, "id": name} for name in sorted(input_data_set)]
+        Args:
+            model: Decision model
 
-    def _identify_knowledge_sources(self, model: DecisionModel) -> List[Dict]:
-        """Identify knowledge sources (source files)."""
+        Returns:
+            Tuple of (input data from rule columns, knowledge sources from
+            source files), each sorted by name
+        """
+        columns = set()
         files = set()
 
         for group in model.groups:
             for rule in group.rules:
+                columns.update(rule.columns)
                 files.add(rule.source.file_path)
 
-        return [
+        input_data = [{"name": name, "id": name} for name in sorted(columns)]
+        knowledge_sources = [
             {"id": f"file_{i}", "name": f"File {i+1}", "file_path": fp}
             for i, fp in enumerate(sorted(files))
         ]
 
+        return input_data, knowledge_sources
+
     def _build_decision_graph(self, model: DecisionModel) -> nx.DiGraph:
-        """Build directed graph of decision dependencies."""
+        """
+        Build directed graph of decision dependencies.
+
+        Not used when writing the DRD itself; kept for callers that want to
+        analyse or lay out the decision structure.
+        """
         graph = nx.DiGraph()
 
         # Add nodes for each group
@@ -323,58 +425,39 @@ class DRDGenerator:
 
         return graph
 
-    def _to_xml_string(self, root: ET.Element) -> str:
-        """Convert element tree to formatted XML string."""
-        pretty_print = self.config.get("output", {}).get("pretty_print_xml", True)
-
-        xml_bytes = ET.tostring(
-            root,
-            encoding="utf-8",
-            xml_declaration=True,
-            pretty_print=pretty_print
-        )
-
-        return xml_bytes.decode("utf-8")
-
     def generate_markdown_report(self, model: DecisionModel) -> str:
         """Generate human-readable Markdown report."""
-        lines = []
-
-        lines.append("# Business Rules Report")
-        lines.append("")
-        lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append("")
-
-        # Summary
-        lines.append("## Summary")
-        lines.append("")
-        lines.append(f"- Total Rules: {len(model.rules)}")
-        lines.append(f"- Rule Groups: {len(model.groups)}")
-        lines.append(f"- Dependencies: {len(model.dependencies)}")
-        lines.append("")
+        buffer = io.StringIO()
+        write = buffer.write
 
-        # Groups
-        lines.append("## Rule Groups")
-        lines.append("")
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        write(_MARKDOWN_HEADER.format(
+            generated=generated,
+            rules=len(model.rules),
+            groups=len(model.groups),
+            dependencies=len(model.dependencies)
+        ))
 
         for group in model.groups:
-            lines.append(f"### {group.name}")
-            lines.append("")
-            lines.append(f"**Category:** {group.category}")
-            lines.append(f"**Confidence:** {group.confidence:.2f}")
-            lines.append(f"**Rules:** {len(group.rules)}")
-            lines.append("")
-            lines.append(group.description)
-            lines.append("")
-
-            # List rules
-            lines.append("#### Rules:")
-            for rule in group.rules[:5]:  # Show first 5
-                lines.append(f"- [{rule.id}]({rule.source.file_path}#L{rule.source.start_line}): {rule.description}")
-
+            # List rules, first 5 only
+            rule_lines = "".join(
+                f"- [{rule.id}]({rule.source.file_path}#L{rule.source.start_line}): {rule.description}\n"
+                for rule in group.rules[:5]
+            )
             if len(group.rules) > 5:
-                lines.append(f"- ... and {len(group.rules) - 5} more")
-
-            lines.append("")
+                rule_lines += f"- ... and {len(group.rules) - 5} more\n"
+
+            write(
+                f"\n### {group.name}\n"
+                f"\n"
+                f"**Category:** {group.category}\n"
+                f"**Confidence:** {group.confidence:.2f}\n"
+                f"**Rules:** {len(group.rules)}\n"
+                f"\n"
+                f"{group.description}\n"
+                f"\n"
+                f"#### Rules:\n"
+                f"{rule_lines}"
+            )
 
-        return "\n".join(lines)
+        return buffer.getvalue()
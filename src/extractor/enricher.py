@@ -1,14 +1,45 @@
 """Semantic enrichment of rules using LLM."""
 
+import functools
+import hashlib
+import json
 import logging
-from typing import List, Dict, Optional
+import os
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 
 from . import Rule
 
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency, fall back to substring search
+    ahocorasick = None
+
 
 logger = logging.getLogger(__name__)
 
+# Keywords that map a rule onto a business domain concept
+_DOMAIN_KEYWORDS = {
+    "pricing": ["price", "cost", "amount", "discount", "rate", "fee", "charge"],
+    "eligibility": ["eligible", "qualify", "valid", "approved", "authorized"],
+    "customer": ["customer", "client", "user", "account"],
+    "order": ["order", "purchase", "transaction", "sale"],
+    "inventory": ["inventory", "stock", "quantity", "available"],
+    "payment": ["payment", "paid", "balance", "due", "invoice"],
+    "date": ["date", "time", "period", "expiry", "deadline"],
+    "validation": ["check", "validate", "verify", "ensure", "must"],
+}
+
+# With pyahocorasick installed, every concept is found in one pass over the
+# rule text instead of one substring search per keyword
+_DOMAIN_AUTOMATON = None
+if ahocorasick is not None:
+    _DOMAIN_AUTOMATON = ahocorasick.Automaton()
+    for _concept, _keywords in _DOMAIN_KEYWORDS.items():
+        for _keyword in _keywords:
+            _DOMAIN_AUTOMATON.add_word(_keyword, _concept)
+    _DOMAIN_AUTOMATON.make_automaton()
+
 
 class LLMAdapter:
     """Base class for LLM adapters."""
@@ -17,6 +48,21 @@ class LLMAdapter:
         """Generate embedding for text."""
         raise NotImplementedError
 
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for many texts at once.
+
+        Adapters backed by a batching model override this; the default
+        embeds each text in turn.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            (len(texts), D) float32 array, one row per text
+        """
+        return np.array([self.generate_embedding(text) for text in texts], dtype=np.float32)
+
     def generate_description(self, rule: Rule) -> str:
         """Generate human-readable description for rule."""
         raise NotImplementedError
@@ -31,15 +77,34 @@ class StubLLMAdapter(LLMAdapter):
 
     def generate_embedding(self, text: str) -> List[float]:
         """Generate deterministic embedding based on text hash."""
-        # Use text hash to generate deterministic but varied embeddings
-        hash_val = hash(text)
-        np.random.seed(hash_val % (2**32))
+        return self.generate_embeddings([text])[0].tolist()
 
-        # Generate random unit vector
-        embedding = np.random.randn(self.embedding_dim)
-        embedding = embedding / np.linalg.norm(embedding)
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate deterministic embeddings for many texts at once.
+
+        Each row is drawn straight into one preallocated array and all rows
+        are normalized together, rather than building and normalizing a
+        separate vector per text.
 
-        return embedding.tolist()
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            (len(texts), D) float32 array of unit vectors
+        """
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+
+        for row, text in zip(embeddings, texts):
+            # Seed a private generator from a content digest: stable across
+            # processes (unlike hash()) and without touching global RNG state
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            rng = np.random.default_rng(int.from_bytes(digest, "little"))
+            rng.standard_normal(dtype=np.float32, out=row)
+
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        return embeddings
 
     def generate_description(self, rule: Rule) -> str:
         """Generate simple description."""
@@ -49,7 +114,13 @@ class StubLLMAdapter(LLMAdapter):
 class AnthropicLLMAdapter(LLMAdapter):
     """Anthropic Claude adapter."""
 
-    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-3-5-sonnet-20241022",
+        embedding_model: str = "all-MiniLM-L6-v2",
+        model_cache_dir: Optional[str] = None
+    ):
         """Initialize Anthropic adapter."""
         try:
             from langchain_anthropic import ChatAnthropic
@@ -59,16 +130,17 @@ class AnthropicLLMAdapter(LLMAdapter):
                 model=model,
                 temperature=0.1
             )
-            self.embedding_model = self._init_embedding_model()
+            self.embedding_model = self._init_embedding_model(embedding_model, model_cache_dir)
         except Exception as e:
             logger.error(f"Error initializing Anthropic client: {e}")
             raise
 
-    def _init_embedding_model(self):
+    def _init_embedding_model(self, model_name: str, model_cache_dir: Optional[str]):
         """Initialize embedding model."""
         try:
-            from sentence_transformers import SentenceTransformer
-            return SentenceTransformer('all-MiniLM-L6-v2')
+            if model_cache_dir:
+                model_cache_dir = os.path.expanduser(model_cache_dir)
+            return _load_embedding_model(model_name, model_cache_dir)
         except Exception as e:
             logger.warning(f"Could not load sentence transformer: {e}")
             return None
@@ -82,6 +154,17 @@ class AnthropicLLMAdapter(LLMAdapter):
             # Fallback to stub
             return StubLLMAdapter().generate_embedding(text)
 
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for texts in model-sized batches."""
+        if self.embedding_model:
+            return self.embedding_model.encode(
+                texts,
+                batch_size=64,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+        return super().generate_embeddings(texts)
+
     def generate_description(self, rule: Rule) -> str:
         """Generate description using Claude."""
         try:
@@ -102,6 +185,36 @@ Provide a 1-2 sentence business-friendly description of what this rule does."""
             return rule.description
 
 
+@functools.lru_cache(maxsize=4)
+def _load_embedding_model(model_name: str, cache_folder: Optional[str]):
+    """Load a sentence transformer once per process."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, cache_folder=cache_folder)
+
+
+def get_enricher(config: Dict) -> "RuleEnricher":
+    """
+    Get an enricher shared by every caller with the same LLM settings.
+
+    Building an enricher can load an embedding model, so repeated runs in
+    one process reuse the instance created for identical settings.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared RuleEnricher instance
+    """
+    relevant = {key: config[key] for key in ("llm", "enrichment") if key in config}
+    return _cached_enricher(json.dumps(relevant, sort_keys=True, default=str))
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_enricher(config_key: str) -> "RuleEnricher":
+    """Build an enricher from a serialized config subset."""
+    return RuleEnricher(json.loads(config_key))
+
+
 class RuleEnricher:
     """Enrich rules with semantic information."""
 
@@ -115,6 +228,11 @@ class RuleEnricher:
         self.config = config
         self.llm_adapter = self._create_llm_adapter()
 
+        # Embeddings by embedding text, so rules with identical text are
+        # only sent to the model once. Stored as tuples, and each rule gets
+        # its own list, so no two rules share a mutable vector
+        self._embedding_cache: Dict[str, Tuple[float, ...]] = {}
+
     def _create_llm_adapter(self) -> LLMAdapter:
         """Create appropriate LLM adapter based on config."""
         llm_config = self.config.get("llm", {})
@@ -124,7 +242,6 @@ class RuleEnricher:
             logger.info("Using stub LLM adapter")
             return StubLLMAdapter()
         elif provider == "anthropic":
-            import os
             api_key = os.getenv(llm_config.get("api_key_env", "ANTHROPIC_API_KEY"))
             if not api_key:
                 logger.warning("Anthropic API key not found, falling back to stub")
@@ -132,7 +249,12 @@ class RuleEnricher:
 
             model = llm_config.get("model", "claude-3-5-sonnet-20241022")
             logger.info(f"Using Anthropic adapter with model {model}")
-            return AnthropicLLMAdapter(api_key, model)
+            return AnthropicLLMAdapter(
+                api_key,
+                model,
+                embedding_model=llm_config.get("embedding_model", "all-MiniLM-L6-v2"),
+                model_cache_dir=llm_config.get("model_cache_dir")
+            )
         else:
             logger.warning(f"Unknown LLM provider {provider}, using stub")
             return StubLLMAdapter()
@@ -149,6 +271,8 @@ class RuleEnricher:
         """
         logger.info(f"Enriching {len(rules)} rules")
 
+        self._embed_rules(rules)
+
         enriched = []
         for i, rule in enumerate(rules):
             try:
@@ -163,6 +287,41 @@ class RuleEnricher:
 
         return enriched
 
+    def _embed_rules(self, rules: List[Rule]) -> None:
+        """
+        Fill in missing embeddings with one batched adapter call.
+
+        Only texts not already in the embedding cache are sent to the
+        adapter, each once. Rules left without an embedding (if the batch
+        fails) are embedded one at a time by enrich_rule().
+
+        Args:
+            rules: Rules to embed in place
+        """
+        pending = [
+            (rule, self._create_embedding_text(rule))
+            for rule in rules if rule.embedding is None
+        ]
+        if not pending:
+            return
+
+        new_texts = list(dict.fromkeys(
+            text for _, text in pending if text not in self._embedding_cache
+        ))
+
+        if new_texts:
+            try:
+                embeddings = self.llm_adapter.generate_embeddings(new_texts)
+            except Exception as e:
+                logger.error(f"Error generating embeddings in batch: {e}")
+                return
+
+            for text, embedding in zip(new_texts, embeddings):
+                self._embedding_cache[text] = tuple(embedding.tolist())
+
+        for rule, text in pending:
+            rule.embedding = list(self._embedding_cache[text])
+
     def enrich_rule(self, rule: Rule) -> Rule:
         """
         Enrich a single rule.
@@ -176,7 +335,11 @@ class RuleEnricher:
         # Generate embedding
         if rule.embedding is None:
             text_for_embedding = self._create_embedding_text(rule)
-            rule.embedding = self.llm_adapter.generate_embedding(text_for_embedding)
+            embedding = self._embedding_cache.get(text_for_embedding)
+            if embedding is None:
+                embedding = tuple(self.llm_adapter.generate_embedding(text_for_embedding))
+                self._embedding_cache[text_for_embedding] = embedding
+            rule.embedding = list(embedding)
 
         # Enhance description if enabled
         if self.config.get("enrichment", {}).get("enable_semantic_analysis", True):
@@ -201,24 +364,19 @@ class RuleEnricher:
 
     def _map_domain_concepts(self, rule: Rule) -> List[str]:
         """Map rule to domain concepts."""
-        concepts = []
-
         # Simple heuristic mapping based on keywords
         text = (rule.description + " " + rule.normalized_expression).lower()
 
-        domain_keywords = {
-            "pricing": ["price", "cost", "amount", "discount", "rate", "fee", "charge"],
-            "eligibility": ["eligible", "qualify", "valid", "approved", "authorized"],
-            "customer": ["customer", "client", "user", "account"],
-            "order": ["order", "purchase", "transaction", "sale"],
-            "inventory": ["inventory", "stock", "quantity", "available"],
-            "payment": ["payment", "paid", "balance", "due", "invoice"],
-            "date": ["date", "time", "period", "expiry", "deadline"],
-            "validation": ["check", "validate", "verify", "ensure", "must"],
-        }
-
-        for concept, keywords in domain_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                concepts.append(concept)
-
-        return concepts
+        if _DOMAIN_AUTOMATON is not None:
+            found = {concept for _, concept in _DOMAIN_AUTOMATON.iter(text)}
+        else:
+            # Plain substring tests; a regex alternation is slower here and
+            # reports only one keyword per position, so overlapping keywords
+            # ("valid" in "validate") would lose a concept
+            found = {
+                concept for concept, keywords in _DOMAIN_KEYWORDS.items()
+                if any(keyword in text for keyword in keywords)
+            }
+
+        # Keep concepts in declaration order
+        return [concept for concept in _DOMAIN_KEYWORDS if concept in found]
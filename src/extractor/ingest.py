@@ -1,17 +1,24 @@
 """Repository ingestion and file scanning."""
 
 import os
-from pathlib import Path
-from typing import List, Dict, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Callable, List, Dict, Iterator, Optional
 import logging
 
 from . import Rule
 from .sql_parser import SQLParser
 from .app_parser import AppCodeParser
+from ..utils.text import BINARY_SNIFF_SIZE, looks_binary
 
 
 logger = logging.getLogger(__name__)
 
+# Fewer files than this are parsed in process; starting worker processes
+# and sending each the config would cost more than the parsing it spreads
+_MIN_PARALLEL_FILES = 32
+
 
 class RepositoryIngestor:
     """Scan repository and coordinate parsing."""
@@ -43,72 +50,181 @@ class RepositoryIngestor:
             "*/__pycache__/*"
         ])
 
+        # Extension -> file type; the first type listing an extension wins
+        self._ext_to_type = {}
+        for file_type, extensions in self.file_extensions.items():
+            for ext in extensions:
+                self._ext_to_type.setdefault(ext, file_type)
+
+        # Path components that mark a path as ignored, parsed once from the
+        # glob-style patterns (e.g. "*/node_modules/*" -> "node_modules")
+        self._ignore_names = frozenset(
+            part
+            for pattern in self.ignore_patterns
+            for part in pattern.strip('*/').split('/')
+        ) - {''}
+
         self.max_file_size = config.get("parsing", {}).get("max_file_size_mb", 10) * 1024 * 1024
 
-    def ingest_repository(self, repo_path: str) -> List[Rule]:
+    def ingest_repository(self, repo_path: str, jobs: Optional[int] = 1) -> List[Rule]:
         """
         Scan repository and extract all rules.
 
         Args:
             repo_path: Path to repository root
+            jobs: Number of worker processes used to parse at least
+                _MIN_PARALLEL_FILES files, or None for one per CPU
 
         Returns:
             List of all extracted rules
         """
         logger.info(f"Ingesting repository: {repo_path}")
+        return self.ingest_files(list(self.iter_source_files(repo_path)), jobs=jobs)
+
+    def ingest_files(
+        self,
+        file_paths: List[str],
+        jobs: Optional[int] = 1,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> List[Rule]:
+        """
+        Extract rules from an already enumerated list of files.
 
+        Args:
+            file_paths: Files to parse, e.g. from iter_source_files()
+            jobs: Number of worker processes used to parse at least
+                _MIN_PARALLEL_FILES files, or None for one per CPU
+            progress_callback: Called with the number of files parsed so far
+                after each file
+
+        Returns:
+            List of all extracted rules
+        """
         all_rules = []
         files_processed = 0
 
-        # Walk the repository
-        for root, dirs, files in os.walk(repo_path):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(os.path.join(root, d))]
+        for rules in self._parse_files(file_paths, jobs):
+            all_rules.extend(rules)
+            files_processed += 1
 
-            for file in files:
-                file_path = os.path.join(root, file)
+            if progress_callback is not None:
+                progress_callback(files_processed)
 
-                # Check if should process
-                if self._should_ignore(file_path):
-                    continue
+            if files_processed % 10 == 0:
+                logger.info(f"Processed {files_processed} files, extracted {len(all_rules)} rules")
 
-                if not self._should_process_file(file_path):
-                    continue
+        logger.info(f"Ingestion complete. Processed {files_processed} files, extracted {len(all_rules)} rules")
+        return all_rules
+
+    def iter_source_files(self, repo_path: str) -> Iterator[str]:
+        """
+        Yield the files under a repository that would be parsed.
 
-                # Check file size
-                try:
-                    if os.path.getsize(file_path) > self.max_file_size:
-                        logger.warning(f"Skipping large file: {file_path}")
-                        continue
-                except OSError:
+        Applies the ignore patterns, file type and size filters without
+        reading any file contents.
+
+        Args:
+            repo_path: Path to repository root
+
+        Yields:
+            Paths of files to parse
+        """
+        for entry in self._scan_directory(repo_path):
+            file_path = entry.path
+
+            # Check if should process
+            if self._should_ignore(file_path):
+                continue
+
+            if not self._should_process_file(file_path):
+                continue
+
+            # Check file size (DirEntry caches the stat result)
+            try:
+                if entry.stat().st_size > self.max_file_size:
+                    logger.warning(f"Skipping large file: {file_path}")
                     continue
+            except OSError:
+                continue
 
-                # Parse the file
-                rules = self._parse_file(file_path)
-                all_rules.extend(rules)
-                files_processed += 1
+            yield file_path
 
-                if files_processed % 10 == 0:
-                    logger.info(f"Processed {files_processed} files, extracted {len(all_rules)} rules")
+    def _scan_directory(self, path: str) -> Iterator[os.DirEntry]:
+        """
+        Yield the non-directory entries under a directory.
 
-        logger.info(f"Ingestion complete. Processed {files_processed} files, extracted {len(all_rules)} rules")
-        return all_rules
+        Visits entries in the same order as os.walk: a directory's files
+        first, then each non-ignored subdirectory in turn. Symlinked
+        directories are not followed.
 
-    def _parse_file(self, file_path: str) -> List[Rule]:
-        """Parse a single file and extract rules."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+        Args:
+            path: Directory to scan
+
+        Yields:
+            Directory entries for files (and other non-directories)
+        """
+        subdirs = []
 
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        yield entry
+                    elif not entry.is_symlink() and not self._should_ignore(entry.path):
+                        subdirs.append(entry.path)
+        except OSError:
+            return
+
+        for subdir in subdirs:
+            yield from self._scan_directory(subdir)
+
+    def _parse_files(self, file_paths: List[str], jobs: Optional[int]) -> Iterator[List[Rule]]:
+        """Parse files in order, in worker processes if jobs > 1 and there are enough files."""
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+
+        if jobs <= 1 or len(file_paths) < _MIN_PARALLEL_FILES:
+            # A large SQL file can still spread its statements across workers
+            for file_path in file_paths:
+                yield self._parse_file(file_path, jobs)
+            return
+
+        jobs = min(jobs, len(file_paths))
+        chunksize = max(1, len(file_paths) // (4 * jobs))
+        logger.debug(f"Parsing {len(file_paths)} files with {jobs} worker processes")
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(self.config,)
+        ) as executor:
+            yield from executor.map(_parse_in_worker, file_paths, chunksize=chunksize)
+
+    def _parse_file(self, file_path: str, jobs: int = 1) -> List[Rule]:
+        """Parse a single file and extract rules (SQL statements across jobs workers)."""
+        try:
             # Determine file type and parse accordingly
             file_type = self._get_file_type(file_path)
 
             if file_type == "sql":
-                logger.debug(f"Parsing SQL file: {file_path}")
-                return self.sql_parser.parse_file(file_path, content)
+                logger.debug("Parsing SQL file: %s", file_path)
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    # Check the head before decoding the rest of the file
+                    head = f.read(BINARY_SNIFF_SIZE)
+                    if looks_binary(head):
+                        logger.debug("Skipping binary file: %s", file_path)
+                        return []
+                    content = head + f.read()
+                return self.sql_parser.parse_file(file_path, content, jobs=jobs)
             elif file_type in ["python", "java", "javascript"]:
-                logger.debug(f"Parsing {file_type} file: {file_path}")
-                return self.app_parser.parse_file(file_path, content, file_type)
+                # Scanned memory-mapped, without reading the file into a string
+                logger.debug("Parsing %s file: %s", file_type, file_path)
+                return list(self.app_parser.parse_path(file_path, file_type))
 
         except Exception as e:
             logger.error(f"Error parsing file {file_path}: {e}")
@@ -117,13 +233,7 @@ class RepositoryIngestor:
 
     def _get_file_type(self, file_path: str) -> Optional[str]:
         """Determine file type from extension."""
-        ext = Path(file_path).suffix.lower()
-
-        for file_type, extensions in self.file_extensions.items():
-            if ext in extensions:
-                return file_type
-
-        return None
+        return self._ext_to_type.get(os.path.splitext(file_path)[1].lower())
 
     def _should_process_file(self, file_path: str) -> bool:
         """Check if file should be processed."""
@@ -131,46 +241,34 @@ class RepositoryIngestor:
         return file_type is not None
 
     def _should_ignore(self, path: str) -> bool:
-        """Check if path matches ignore patterns."""
-        path_obj = Path(path)
-
-        for pattern in self.ignore_patterns:
-            # Simple glob-style matching
-            pattern_parts = pattern.strip('*/').split('/')
-
-            # Check if any part of the path matches the pattern
-            path_parts = path_obj.parts
-            for i in range(len(path_parts)):
-                if path_parts[i] in pattern_parts:
-                    return True
-
-        return False
+        """Check if any component of a path matches an ignore pattern."""
+        return not self._ignore_names.isdisjoint(path.split(os.sep))
 
     def get_statistics(self, rules: List[Rule]) -> Dict:
         """Generate statistics about extracted rules."""
-        stats = {
+        by_file = Counter(rule.source.file_path for rule in rules)
+
+        return {
             "total_rules": len(rules),
-            "by_type": {},
-            "by_file": {},
-            "unique_tables": set(),
-            "unique_columns": set(),
+            "by_type": dict(Counter(rule.rule_type.value for rule in rules)),
+            "by_file": dict(by_file),
+            "unique_tables": len(set(chain.from_iterable(rule.tables for rule in rules))),
+            "unique_columns": len(set(chain.from_iterable(rule.columns for rule in rules))),
+            "unique_files": len(by_file),
         }
 
-        for rule in rules:
-            # Count by type
-            rule_type = rule.rule_type.value
-            stats["by_type"][rule_type] = stats["by_type"].get(rule_type, 0) + 1
 
-            # Count by file
-            file_path = rule.source.file_path
-            stats["by_file"][file_path] = stats["by_file"].get(file_path, 0) + 1
+# Per-process ingestor used by worker processes, so parsers are built once
+# per worker rather than once per file
+_worker_ingestor: Optional[RepositoryIngestor] = None
+
 
-            # Collect tables and columns
-            stats["unique_tables"].update(rule.tables)
-            stats["unique_columns"].update(rule.columns)
+def _init_worker(config: Dict) -> None:
+    """Create the ingestor for a worker process."""
+    global _worker_ingestor
+    _worker_ingestor = RepositoryIngestor(config)
 
-        # Convert sets to counts
-        stats["unique_tables"] = len(stats["unique_tables"])
-        stats["unique_columns"] = len(stats["unique_columns"])
 
-        return stats
+def _parse_in_worker(file_path: str) -> List[Rule]:
+    """Parse a single file in a worker process."""
+    return _worker_ingestor._parse_file(file_path)
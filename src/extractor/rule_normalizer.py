@@ -1,7 +1,11 @@
 """Rule normalization and canonicalization."""
 
+import functools
+import os
 import re
-from typing import List, Dict
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 
 from . import Rule
@@ -9,20 +13,151 @@ from . import Rule
 
 logger = logging.getLogger(__name__)
 
+# Expression tokens that normalization rewrites: maximal runs of operator,
+# parenthesis and whitespace characters (other than a lone space, which is
+# already normal), and the logical keywords. No rewrite crosses a run
+# boundary, so each run is normalized on its own.
+_EXPRESSION_TOKEN = re.compile(
+    r'(?:[^\S ]|[=<>!()]| (?=[\s=<>!()]))[\s=<>!()]*|\b(?:AND|OR|NOT)\b',
+    re.IGNORECASE
+)
+_WHITESPACE = re.compile(r'\s+')
+_OPEN_PAREN = re.compile(r'\s*\(\s*')
+_CLOSE_PAREN = re.compile(r'\s*\)\s*')
+
+# Quote characters stripped from identifiers
+_QUOTES = '"\'`'
+
+# Fewer rules than this are normalized in process; worker start-up would
+# cost more than the work it spreads
+_MIN_PARALLEL_RULES = 500
+
+# Fields of a rule that normalization rewrites: expression, variables,
+# columns and tables
+RuleFields = Tuple[str, List[str], List[str], List[str]]
+
+
+def _normalize_token(match: re.Match) -> str:
+    """Rewrite one expression token (see _EXPRESSION_TOKEN)."""
+    return _canonical_token(match[0])
+
+
+@functools.lru_cache(maxsize=1024)
+def _canonical_token(token: str) -> str:
+    """
+    Get the normalized form of an expression token.
+
+    The same few keywords and operator runs recur across all rules, so
+    each distinct token is rewritten once and then looked up.
+    """
+    if token[0].isalpha():
+        return token.upper()
+    return _normalize_run(token)
+
+
+def _normalize_run(run: str) -> str:
+    """
+    Space out operators in a run of operator/parenthesis/whitespace characters.
+
+    Args:
+        run: Run matched by _EXPRESSION_TOKEN
+
+    Returns:
+        Run with operators padded by single spaces and no whitespace around
+        parentheses
+    """
+    # Use placeholders to protect multi-char operators
+    normalized = run.replace('==', '§EQ§')
+    normalized = normalized.replace('>=', '§GE§')
+    normalized = normalized.replace('<=', '§LE§')
+    normalized = normalized.replace('!=', '§NE§')
+
+    # Now replace single-char operators
+    normalized = normalized.replace('=', ' = ')
+    normalized = normalized.replace('>', ' > ')
+    normalized = normalized.replace('<', ' < ')
+
+    # Restore multi-char operators with proper spacing
+    normalized = normalized.replace('§EQ§', ' = ')
+    normalized = normalized.replace('§GE§', ' >= ')
+    normalized = normalized.replace('§LE§', ' <= ')
+    normalized = normalized.replace('§NE§', ' != ')
+
+    # Collapse spaces, then remove those around parentheses
+    normalized = _WHITESPACE.sub(' ', normalized)
+    normalized = _OPEN_PAREN.sub('(', normalized)
+    return _CLOSE_PAREN.sub(')', normalized)
+
 
 class RuleNormalizer:
     """Normalize and canonicalize extracted rules."""
 
-    def normalize_rules(self, rules: List[Rule]) -> List[Rule]:
+    def pipeline(
+        self,
+        rules: List[Rule],
+        min_confidence: float = 0.5,
+        jobs: Optional[int] = 1
+    ) -> List[Rule]:
+        """
+        Normalize, deduplicate and filter rules in a single pass.
+
+        Equivalent to normalize_rules, deduplicate_rules and
+        filter_low_quality_rules applied in turn, without building the
+        intermediate lists.
+
+        Args:
+            rules: List of raw extracted rules
+            min_confidence: Minimum confidence threshold
+            jobs: Number of worker processes to normalize rules with, or
+                None for one per CPU (see normalize_rules)
+
+        Returns:
+            Normalized, deduplicated list of high-quality rules
+        """
+        # Position in unique_rules of the representative for each fingerprint
+        seen = {}
+        unique_rules = []
+
+        for rule in self.normalize_rules(rules, jobs):
+            fingerprint = (
+                rule.normalized_expression,
+                rule.source.file_path,
+                rule.source.start_line
+            )
+
+            index = seen.setdefault(fingerprint, len(unique_rules))
+            if index == len(unique_rules):
+                unique_rules.append(rule)
+            elif rule.confidence > unique_rules[index].confidence:
+                unique_rules[index] = rule
+
+        # Filter last so rule order matches the separate three-step chain
+        filtered = [rule for rule in unique_rules if rule.confidence >= min_confidence]
+
+        logger.info(
+            f"Normalized {len(rules)} rules to {len(unique_rules)} unique, "
+            f"{len(filtered)} high-quality rules"
+        )
+        return filtered
+
+    def normalize_rules(self, rules: List[Rule], jobs: Optional[int] = 1) -> List[Rule]:
         """
         Normalize a list of rules.
 
         Args:
             rules: List of raw extracted rules
+            jobs: Number of worker processes to normalize at least
+                _MIN_PARALLEL_RULES rules with, or None for one per CPU;
+                1 normalizes in process
 
         Returns:
             List of normalized rules
         """
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if jobs > 1 and len(rules) >= _MIN_PARALLEL_RULES:
+            return self._normalize_rules_parallel(rules, jobs)
+
         normalized = []
 
         for rule in rules:
@@ -36,6 +171,28 @@ class RuleNormalizer:
 
         return normalized
 
+    def _normalize_rules_parallel(self, rules: List[Rule], jobs: int) -> List[Rule]:
+        """Normalize rules across worker processes, updating them in place."""
+        # Only the fields being rewritten travel to the workers and back, as
+        # plain tuples; pickling whole rules would cost more than normalizing
+        fields = [
+            (rule.normalized_expression, rule.variables, rule.columns, rule.tables)
+            for rule in rules
+        ]
+        chunksize = max(1, len(rules) // (4 * jobs))
+        logger.debug(f"Normalizing {len(rules)} rules with {jobs} worker processes")
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_normalize_one, fields, chunksize=chunksize)
+            for rule, result in zip(rules, results):
+                if isinstance(result, Exception):
+                    # Keep original rule if normalization fails
+                    logger.error(f"Error normalizing rule {rule.id}: {result}")
+                    continue
+                rule.normalized_expression, rule.variables, rule.columns, rule.tables = result
+
+        return rules
+
     def normalize_rule(self, rule: Rule) -> Rule:
         """
         Normalize a single rule.
@@ -46,70 +203,53 @@ class RuleNormalizer:
         Returns:
             Normalized rule
         """
-        # Normalize the expression
-        normalized_expr = self._normalize_expression(rule.normalized_expression)
-
-        # Standardize variable names
-        variables = self._standardize_identifiers(rule.variables)
-        columns = self._standardize_identifiers(rule.columns)
-        tables = self._standardize_identifiers(rule.tables)
-
         # Create updated rule
-        rule.normalized_expression = normalized_expr
-        rule.variables = variables
-        rule.columns = columns
-        rule.tables = tables
+        rule.normalized_expression, rule.variables, rule.columns, rule.tables = \
+            self._normalize_fields(
+                (rule.normalized_expression, rule.variables, rule.columns, rule.tables)
+            )
 
         return rule
 
-    def _normalize_expression(self, expression: str) -> str:
-        """Normalize a rule expression."""
-        # Use placeholders to protect multi-char operators
-        normalized = expression.replace('==', '§EQ§')
-        normalized = normalized.replace('>=', '§GE§')
-        normalized = normalized.replace('<=', '§LE§')
-        normalized = normalized.replace('!=', '§NE§')
-
-        # Now replace single-char operators
-        normalized = normalized.replace('=', ' = ')
-        normalized = normalized.replace('>', ' > ')
-        normalized = normalized.replace('<', ' < ')
-
-        # Restore multi-char operators with proper spacing
-        normalized = normalized.replace('§EQ§', ' = ')
-        normalized = normalized.replace('§GE§', ' >= ')
-        normalized = normalized.replace('§LE§', ' <= ')
-        normalized = normalized.replace('§NE§', ' != ')
-
-        # Now collapse multiple spaces
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-
-        # Standardize logical operators
-        normalized = re.sub(r'\bAND\b', 'AND', normalized, flags=re.IGNORECASE)
-        normalized = re.sub(r'\bOR\b', 'OR', normalized, flags=re.IGNORECASE)
-        normalized = re.sub(r'\bNOT\b', 'NOT', normalized, flags=re.IGNORECASE)
-
-        # Remove extra spaces around parentheses
-        normalized = re.sub(r'\s*\(\s*', '(', normalized)
-        normalized = re.sub(r'\s*\)\s*', ')', normalized)
+    def _normalize_fields(self, fields: RuleFields) -> RuleFields:
+        """
+        Normalize the rewritten fields of a rule.
 
-        return normalized
+        Args:
+            fields: Rule expression, variables, columns and tables
 
-    def _standardize_identifiers(self, identifiers: List[str]) -> List[str]:
-        """Standardize identifier names."""
-        standardized = []
+        Returns:
+            The same fields, normalized
+        """
+        expression, variables, columns, tables = fields
 
-        for identifier in identifiers:
-            # Convert to lowercase for consistency
-            std = identifier.lower().strip()
+        # Normalize the expression
+        normalized_expr = self._normalize_expression(expression)
 
-            # Remove quotes
-            std = std.strip('"\'`')
+        # Standardize variable names
+        return (
+            normalized_expr,
+            self._standardize_identifiers(variables),
+            self._standardize_identifiers(columns),
+            self._standardize_identifiers(tables)
+        )
 
-            if std:
-                standardized.append(std)
+    def _normalize_expression(self, expression: str) -> str:
+        """Normalize a rule expression."""
+        # One scan over the expression: runs of operators, parentheses and
+        # whitespace are rewritten as a unit, logical keywords upper-cased
+        return _EXPRESSION_TOKEN.sub(_normalize_token, expression).strip()
 
-        return list(set(standardized))
+    def _standardize_identifiers(self, identifiers: List[str]) -> List[str]:
+        """Standardize identifier names."""
+        # Lowercase for consistency and remove quotes, straight into a set.
+        # Names repeat across rules, so each is interned to share one copy
+        standardized = {
+            sys.intern(std) for identifier in identifiers
+            if (std := identifier.lower().strip().strip(_QUOTES))
+        }
+
+        return list(standardized)
 
     def deduplicate_rules(self, rules: List[Rule]) -> List[Rule]:
         """
@@ -121,22 +261,33 @@ class RuleNormalizer:
         Returns:
             Deduplicated list of rules
         """
+        # Position in unique_rules of the representative for each fingerprint.
+        # A dict rather than a set, since a later, more confident duplicate
+        # replaces the representative in place
         seen = {}
         unique_rules = []
 
         for rule in rules:
-            # Create a fingerprint based on normalized expression and location
+            # Create a fingerprint based on normalized expression and location.
+            # A tuple of the existing strings, not a packed digest: hashing it
+            # reuses each string's cached hash, and keys cannot collide
             fingerprint = (
                 rule.normalized_expression,
                 rule.source.file_path,
                 rule.source.start_line
             )
 
-            if fingerprint not in seen:
-                seen[fingerprint] = True
+            index = seen.setdefault(fingerprint, len(unique_rules))
+            if index == len(unique_rules):
                 unique_rules.append(rule)
+                continue
+
+            # Keep the most confident rule, in the position of the first seen
+            if rule.confidence > unique_rules[index].confidence:
+                logger.debug("Skipping duplicate rule: %s", unique_rules[index].id)
+                unique_rules[index] = rule
             else:
-                logger.debug(f"Skipping duplicate rule: {rule.id}")
+                logger.debug("Skipping duplicate rule: %s", rule.id)
 
         logger.info(f"Deduplicated {len(rules)} rules to {len(unique_rules)} unique rules")
         return unique_rules
@@ -171,3 +322,11 @@ class RuleNormalizer:
 
         logger.info(f"Filtered {len(rules)} rules to {len(filtered)} high-quality rules")
         return filtered
+
+
+def _normalize_one(fields: RuleFields) -> Union[RuleFields, Exception]:
+    """Normalize one rule's fields; top-level so workers can unpickle it."""
+    try:
+        return RuleNormalizer()._normalize_fields(fields)
+    except Exception as e:
+        return e
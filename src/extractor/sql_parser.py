@@ -1,16 +1,102 @@
 """SQL parsing and rule extraction from SQL code."""
 
+import functools
 import re
 import hashlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from typing import List, Optional, Dict, Any, Tuple
 import sqlglot
-from sqlglot import exp, parse_one, ParseError
+from sqlglot import Dialect, exp, parse_one, ParseError
 from sqlglot.optimizer import qualify
 import sqlparse
 from sqlparse.sql import Statement, Token
 from sqlparse.tokens import Keyword, DML
 
 from . import Rule, RuleType, SourceLocation
+from ..utils.text import LineIndex
+
+
+# Fallback patterns for statements sqlglot cannot parse, compiled once
+_CASE = re.compile(
+    r'CASE\s+(?:WHEN\s+(.+?)\s+THEN\s+(.+?)\s*)+(?:ELSE\s+(.+?)\s+)?END',
+    re.IGNORECASE | re.DOTALL
+)
+# Procedural IF statements (PL/pgSQL, PL/SQL)
+_IF_BLOCK = re.compile(
+    r'IF\s+(.+?)\s+THEN\s+(.*?)(?:ELSIF\s+(.+?)\s+THEN\s+(.*?))*(?:ELSE\s+(.*?))?END\s+IF',
+    re.IGNORECASE | re.DOTALL
+)
+_CREATE_TRIGGER = re.compile(r'CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER', re.IGNORECASE)
+_TRIGGER_NAME = re.compile(r'TRIGGER\s+(\w+)', re.IGNORECASE)
+_CHECK = re.compile(r'CHECK\s*\(([^)]+)\)', re.IGNORECASE)
+_FROM = re.compile(r'FROM\s+(\w+)', re.IGNORECASE)
+_JOIN = re.compile(r'JOIN\s+(\w+)', re.IGNORECASE)
+
+# Identifiers (simplistic), and the SQL keywords that are not variables
+_IDENT = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b')
+# Byte table blanking out everything that cannot be part of an identifier
+_IDENT_SEPARATORS = bytes(
+    c if chr(c).isascii() and (chr(c).isalnum() or c == ord('_')) else ord(' ')
+    for c in range(256)
+)
+_SQL_KEYWORDS = frozenset({
+    'if', 'then', 'else', 'case', 'when', 'end', 'and', 'or', 'not', 'select', 'from', 'where'
+})
+
+# Files with fewer statements are always parsed serially; below this,
+# starting worker processes costs more than it saves
+_MIN_PARALLEL_STATEMENTS = 64
+
+# Longer statements are parsed without caching, to bound cache memory
+_MAX_CACHED_STATEMENT = 16 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _get_dialect(dialect: str) -> Dialect:
+    """Resolve a dialect name to its sqlglot Dialect, memoized per name."""
+    # sqlglot resolves (and instantiates) a dialect passed by name on every
+    # parse and generate call; unknown names keep raising ValueError
+    return Dialect.get_or_raise(dialect)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_statement_cached(sql: str, dialect: str) -> Optional[exp.Expression]:
+    """
+    Parse a statement, memoized since boilerplate statements repeat.
+
+    The returned AST is shared between callers and must not be modified.
+    """
+    try:
+        return parse_one(sql, dialect=_get_dialect(dialect))
+    except (ParseError, Exception):
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def _path_digest(file_path: str) -> Any:
+    """
+    Start a rule id hash with a file's path, memoized per file.
+
+    The returned hasher is shared and must only be copied, never updated.
+    """
+    # Not a security boundary, so a fast 48-bit BLAKE2 digest (12 hex
+    # characters, as before) is enough. Each part is fed to the hasher
+    # separately rather than joined first; surrogatepass keeps paths with
+    # undecodable bytes (surrogate-escaped by os) hashable.
+    digest = hashlib.blake2b(file_path.encode('utf-8', 'surrogatepass'), digest_size=6)
+    digest.update(b":")
+    return digest
+
+
+@functools.lru_cache(maxsize=4096)
+def _generate_rule_id_cached(file_path: str, content: str) -> str:
+    """Hash a rule's file and content into its id, memoized."""
+    # Every rule of a file continues from a copy of the file's path state
+    digest = _path_digest(file_path).copy()
+    digest.update(content.encode('utf-8', 'surrogatepass'))
+    return f"rule_{digest.hexdigest()}"
 
 
 class SQLParser:
@@ -25,30 +111,64 @@ class SQLParser:
         """
         self.dialect = dialect
 
-    def parse_file(self, file_path: str, content: str) -> List[Rule]:
+    def parse_file(self, file_path: str, content: str, jobs: int = 1) -> List[Rule]:
         """
         Parse SQL file and extract all rules.
 
         Args:
             file_path: Path to the SQL file
             content: File content
+            jobs: Number of worker processes to spread the statements of a
+                large file across; 1 parses serially
 
         Returns:
-            List of extracted rules
+            List of extracted rules, in statement order
         """
-        rules = []
-
         # Split content into logical statements
         statements = self._split_statements(content)
 
-        for stmt_info in statements:
-            stmt_text, start_line, end_line = stmt_info
+        jobs = min(jobs, len(statements))
+        if jobs <= 1 or len(statements) < _MIN_PARALLEL_STATEMENTS:
+            rules = []
+            for stmt_text, start_line, _ in statements:
+                rules.extend(self._parse_statement_rules(file_path, stmt_text, start_line))
+            return rules
+
+        items = [
+            (self.dialect, file_path, stmt_text, start_line)
+            for stmt_text, start_line, _ in statements
+        ]
+        chunksize = max(1, len(items) // (4 * jobs))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(chain.from_iterable(
+                executor.map(_parse_statement_one, items, chunksize=chunksize)
+            ))
+
+    def _parse_statement_rules(self, file_path: str, stmt_text: str, start_line: int) -> List[Rule]:
+        """Extract all rules from one statement."""
+        rules = []
 
-            # Try different extraction methods
-            rules.extend(self._extract_from_case(file_path, stmt_text, start_line))
-            rules.extend(self._extract_from_where(file_path, stmt_text, start_line))
+        # Keywords each extractor needs, found with plain substring tests on
+        # one case-folded copy, so statements without them skip that
+        # extractor's parse or scan entirely
+        folded = stmt_text.casefold()
+        has_case = 'case' in folded
+        has_where = 'where' in folded
+
+        # Parse once with sqlglot; the AST-based extractors share it, and
+        # only CASE and WHERE nodes are read from it
+        parsed = self._parse_statement(stmt_text) if has_case or has_where else None
+
+        # Try different extraction methods
+        if has_case:
+            rules.extend(self._extract_from_case(file_path, parsed, stmt_text, start_line))
+        if has_where:
+            rules.extend(self._extract_from_where(file_path, parsed, stmt_text, start_line))
+        if 'if' in folded and 'then' in folded and 'end' in folded:
             rules.extend(self._extract_from_procedure(file_path, stmt_text, start_line))
+        if 'trigger' in folded:
             rules.extend(self._extract_from_trigger(file_path, stmt_text, start_line))
+        if 'check' in folded:
             rules.extend(self._extract_from_constraint(file_path, stmt_text, start_line))
 
         return rules
@@ -58,31 +178,52 @@ class SQLParser:
         statements = []
 
         try:
-            # Use sqlparse for basic statement splitting
-            parsed = sqlparse.parse(content)
+            # Use sqlparse for basic statement splitting. Only the splitter
+            # runs (statements are not grouped into token trees), and each
+            # statement is located in the content after the previous one
+            lines = LineIndex(content)
+            offset = 0
 
-            current_line = 1
-            for statement in parsed:
+            for statement in sqlparse.engine.FilterStack().run(content):
                 stmt_text = str(statement).strip()
                 if stmt_text:
-                    # Count lines in this statement
-                    line_count = stmt_text.count('\n') + 1
-                    statements.append((stmt_text, current_line, current_line + line_count - 1))
-                    current_line += stmt_text.count('\n') + 1
+                    start = content.find(stmt_text, offset)
+                    if start == -1:
+                        start = offset
+                    offset = start + len(stmt_text)
+                    statements.append((stmt_text, lines.line_at(start), lines.line_at(offset - 1)))
         except Exception as e:
             # Fallback: treat entire content as one statement
             statements.append((content, 1, content.count('\n') + 1))
 
         return statements
 
-    def _extract_from_case(self, file_path: str, sql: str, base_line: int) -> List[Rule]:
+    def _parse_statement(self, sql: str) -> Optional[exp.Expression]:
+        """
+        Parse a statement with sqlglot.
+
+        Args:
+            sql: Statement text
+
+        Returns:
+            Parsed expression (shared, read-only), or None if sqlglot
+            cannot parse it
+        """
+        if len(sql) > _MAX_CACHED_STATEMENT:
+            return _parse_statement_cached.__wrapped__(sql, self.dialect)
+        return _parse_statement_cached(sql, self.dialect)
+
+    def _extract_from_case(
+        self, file_path: str, parsed: Optional[exp.Expression], sql: str, base_line: int
+    ) -> List[Rule]:
         """Extract rules from CASE expressions."""
+        if parsed is None:
+            # Fallback to regex-based extraction
+            return self._extract_case_regex(file_path, sql, base_line)
+
         rules = []
 
         try:
-            # Parse with sqlglot
-            parsed = parse_one(sql, dialect=self.dialect)
-
             # Find all CASE expressions
             for case_expr in parsed.find_all(exp.Case):
                 case_rules = self._parse_case_expression(file_path, case_expr, sql, base_line)
@@ -99,7 +240,10 @@ class SQLParser:
         """Parse a CASE expression into rules."""
         rules = []
 
-        case_text = case_expr.sql(dialect=self.dialect)
+        case_text = case_expr.sql(dialect=_get_dialect(self.dialect))
+        # Every rule of this CASE points at the same source span
+        end_line = base_line + case_text.count('\n')
+        snippet = case_text[:500]
 
         # Extract WHEN conditions
         for i, if_clause in enumerate(case_expr.args.get("ifs", [])):
@@ -107,25 +251,25 @@ class SQLParser:
             result = if_clause.args.get("true")
 
             if condition and result:
-                rule_id = self._generate_rule_id(file_path, str(condition))
+                condition_sql = condition.sql()
+                rule_id = self._generate_rule_id(file_path, condition_sql)
 
                 # Extract variables from condition
-                variables = self._extract_variables(condition)
-                tables = self._extract_tables(condition)
+                variables, tables = self._extract_names(condition)
 
                 rule = Rule(
                     id=rule_id,
                     rule_type=RuleType.CONDITIONAL,
-                    description=f"CASE condition: {condition.sql()}",
-                    normalized_expression=f"IF {condition.sql()} THEN {result.sql()}",
+                    description=f"CASE condition: {condition_sql}",
+                    normalized_expression=f"IF {condition_sql} THEN {result.sql()}",
                     variables=variables,
                     tables=tables,
                     columns=variables,
                     source=SourceLocation(
                         file_path=file_path,
                         start_line=base_line,
-                        end_line=base_line + case_text.count('\n'),
-                        snippet=case_text[:500]
+                        end_line=end_line,
+                        snippet=snippet
                     ),
                     confidence=0.9
                 )
@@ -146,8 +290,8 @@ class SQLParser:
                 source=SourceLocation(
                     file_path=file_path,
                     start_line=base_line,
-                    end_line=base_line + case_text.count('\n'),
-                    snippet=case_text[:500]
+                    end_line=end_line,
+                    snippet=snippet
                 ),
                 confidence=0.9
             )
@@ -158,13 +302,17 @@ class SQLParser:
     def _extract_case_regex(self, file_path: str, sql: str, base_line: int) -> List[Rule]:
         """Fallback regex-based CASE extraction."""
         rules = []
+        folded = sql.casefold()
+        if 'case' not in folded or 'end' not in folded:
+            return rules
 
         # Find CASE expressions with regex
-        case_pattern = r'CASE\s+(?:WHEN\s+(.+?)\s+THEN\s+(.+?)\s*)+(?:ELSE\s+(.+?)\s+)?END'
-
-        for match in re.finditer(case_pattern, sql, re.IGNORECASE | re.DOTALL):
+        # Lines before each match, counted on from the previous match
+        line_offset = counted = 0
+        for match in _CASE.finditer(sql):
             case_text = match.group(0)
-            line_offset = sql[:match.start()].count('\n')
+            line_offset += sql.count('\n', counted, match.start())
+            counted = match.start()
 
             rule_id = self._generate_rule_id(file_path, case_text)
             rule = Rule(
@@ -187,34 +335,40 @@ class SQLParser:
 
         return rules
 
-    def _extract_from_where(self, file_path: str, sql: str, base_line: int) -> List[Rule]:
+    def _extract_from_where(
+        self, file_path: str, parsed: Optional[exp.Expression], sql: str, base_line: int
+    ) -> List[Rule]:
         """Extract rules from WHERE clauses."""
         rules = []
+        if parsed is None:
+            return rules
 
-        try:
-            parsed = parse_one(sql, dialect=self.dialect)
+        # Rules of all the statement's WHERE clauses share its source span
+        end_line = base_line + sql.count('\n')
+        snippet = sql[:500]
 
+        try:
             # Find WHERE clauses
             for where_expr in parsed.find_all(exp.Where):
                 condition = where_expr.this
+                condition_sql = condition.sql()
 
-                rule_id = self._generate_rule_id(file_path, str(condition))
-                variables = self._extract_variables(condition)
-                tables = self._extract_tables(condition)
+                rule_id = self._generate_rule_id(file_path, condition_sql)
+                variables, tables = self._extract_names(condition)
 
                 rule = Rule(
                     id=rule_id,
                     rule_type=RuleType.VALIDATION,
-                    description=f"WHERE condition: {condition.sql()}",
-                    normalized_expression=condition.sql(),
+                    description=f"WHERE condition: {condition_sql}",
+                    normalized_expression=condition_sql,
                     variables=variables,
                     tables=tables,
                     columns=variables,
                     source=SourceLocation(
                         file_path=file_path,
                         start_line=base_line,
-                        end_line=base_line + sql.count('\n'),
-                        snippet=sql[:500]
+                        end_line=end_line,
+                        snippet=snippet
                     ),
                     confidence=0.85
                 )
@@ -229,22 +383,24 @@ class SQLParser:
         rules = []
 
         # Look for procedural IF statements (PL/pgSQL, PL/SQL)
-        if_pattern = r'IF\s+(.+?)\s+THEN\s+(.*?)(?:ELSIF\s+(.+?)\s+THEN\s+(.*?))*(?:ELSE\s+(.*?))?END\s+IF'
-
-        for match in re.finditer(if_pattern, sql, re.IGNORECASE | re.DOTALL):
+        # Lines before each match, counted on from the previous match
+        line_offset = counted = 0
+        for match in _IF_BLOCK.finditer(sql):
             condition = match.group(1)
             then_clause = match.group(2)
-            line_offset = sql[:match.start()].count('\n')
+            line_offset += sql.count('\n', counted, match.start())
+            counted = match.start()
 
             rule_id = self._generate_rule_id(file_path, condition)
+            variables = self._extract_variables_regex(condition)
             rule = Rule(
                 id=rule_id,
                 rule_type=RuleType.CONDITIONAL,
                 description=f"Procedural IF: {condition}",
                 normalized_expression=f"IF {condition} THEN {then_clause[:100]}...",
-                variables=self._extract_variables_regex(condition),
+                variables=variables,
                 tables=[],
-                columns=self._extract_variables_regex(condition),
+                columns=variables,
                 source=SourceLocation(
                     file_path=file_path,
                     start_line=base_line + line_offset,
@@ -262,11 +418,11 @@ class SQLParser:
         rules = []
 
         # Check if this is a trigger definition
-        if re.search(r'CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER', sql, re.IGNORECASE):
+        if _CREATE_TRIGGER.search(sql):
             rule_id = self._generate_rule_id(file_path, sql)
 
             # Extract trigger name
-            trigger_match = re.search(r'TRIGGER\s+(\w+)', sql, re.IGNORECASE)
+            trigger_match = _TRIGGER_NAME.search(sql)
             trigger_name = trigger_match.group(1) if trigger_match else "unknown_trigger"
 
             rule = Rule(
@@ -294,21 +450,23 @@ class SQLParser:
         rules = []
 
         # Find CHECK constraints
-        check_pattern = r'CHECK\s*\(([^)]+)\)'
-
-        for match in re.finditer(check_pattern, sql, re.IGNORECASE):
+        # Lines before each match, counted on from the previous match
+        line_offset = counted = 0
+        for match in _CHECK.finditer(sql):
             constraint = match.group(1)
-            line_offset = sql[:match.start()].count('\n')
+            line_offset += sql.count('\n', counted, match.start())
+            counted = match.start()
 
             rule_id = self._generate_rule_id(file_path, constraint)
+            variables = self._extract_variables_regex(constraint)
             rule = Rule(
                 id=rule_id,
                 rule_type=RuleType.CONSTRAINT,
                 description=f"CHECK constraint: {constraint}",
                 normalized_expression=constraint,
-                variables=self._extract_variables_regex(constraint),
+                variables=variables,
                 tables=[],
-                columns=self._extract_variables_regex(constraint),
+                columns=variables,
                 source=SourceLocation(
                     file_path=file_path,
                     start_line=base_line + line_offset,
@@ -321,43 +479,44 @@ class SQLParser:
 
         return rules
 
-    def _extract_variables(self, expr: exp.Expression) -> List[str]:
-        """Extract variable/column names from expression."""
-        variables = []
-        for column in expr.find_all(exp.Column):
-            variables.append(column.name)
-        return list(set(variables))
-
-    def _extract_tables(self, expr: exp.Expression) -> List[str]:
-        """Extract table names from expression."""
-        tables = []
-        for table in expr.find_all(exp.Table):
-            tables.append(table.name)
-        return list(set(tables))
+    def _extract_names(self, expr: exp.Expression) -> Tuple[List[str], List[str]]:
+        """Extract the column and table names of an expression in one walk."""
+        # Names repeat heavily across a file's rules; interning shares one
+        # string per name (here and in the other extractors below)
+        columns, tables = set(), set()
+        for node in expr.walk():
+            if isinstance(node, exp.Column):
+                columns.add(sys.intern(node.name))
+            elif isinstance(node, exp.Table):
+                tables.add(sys.intern(node.name))
+        return list(columns), list(tables)
 
     def _extract_variables_regex(self, text: str) -> List[str]:
         """Extract variables using regex."""
-        # Match identifiers (simplistic)
-        variables = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', text)
+        if text.isascii():
+            # Blank out separators and split, in C, without the regex engine;
+            # tokens starting with a digit are numbers, not identifiers
+            tokens = text.encode('ascii').translate(_IDENT_SEPARATORS).decode('ascii').split()
+            variables = [t for t in tokens if not t[0].isdigit()]
+        else:
+            # Match identifiers
+            variables = _IDENT.findall(text)
+
         # Filter out SQL keywords
-        keywords = {'if', 'then', 'else', 'case', 'when', 'end', 'and', 'or', 'not', 'select', 'from', 'where'}
-        return list(set([v for v in variables if v.lower() not in keywords]))
+        return list({sys.intern(v) for v in variables if v.lower() not in _SQL_KEYWORDS})
 
     def _extract_table_names_regex(self, sql: str) -> List[str]:
         """Extract table names using regex."""
-        tables = []
-
-        # FROM clause
-        from_matches = re.finditer(r'FROM\s+(\w+)', sql, re.IGNORECASE)
-        tables.extend([m.group(1) for m in from_matches])
-
-        # JOIN clauses
-        join_matches = re.finditer(r'JOIN\s+(\w+)', sql, re.IGNORECASE)
-        tables.extend([m.group(1) for m in join_matches])
-
-        return list(set(tables))
+        # FROM clauses, then JOIN clauses
+        matches = chain(_FROM.finditer(sql), _JOIN.finditer(sql))
+        return list({sys.intern(m.group(1)) for m in matches})
 
     def _generate_rule_id(self, file_path: str, content: str) -> str:
         """Generate unique rule ID."""
-        hash_input = f"{file_path}:{content}"
-        return f"rule_{hashlib.md5(hash_input.encode()).hexdigest()[:12]}"
+        return _generate_rule_id_cached(file_path, content)
+
+
+def _parse_statement_one(item: Tuple[str, str, str, int]) -> List[Rule]:
+    """Parse one (dialect, file_path, statement, line) item; top-level so workers can unpickle it."""
+    dialect, file_path, stmt_text, start_line = item
+    return SQLParser(dialect)._parse_statement_rules(file_path, stmt_text, start_line)
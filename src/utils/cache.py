@@ -0,0 +1,184 @@
+"""On-disk cache of pipeline results, keyed by repository fingerprint."""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from pydantic import BaseModel
+
+from .. import __version__
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "~/.cache/sql-rule-extractor"
+
+# Config sections that influence what the cached stages produce
+_FINGERPRINT_SECTIONS = ("parsing", "extraction", "llm", "enrichment")
+
+# Version of the cached stage outputs; bump whenever the parsers,
+# normalizer, enricher or the Rule model change what a stage produces
+_CACHE_VERSION = 1
+
+
+class PipelineCache:
+    """
+    Persist intermediate pipeline results between runs.
+
+    Each repository gets its own SQLite file holding one row per pipeline
+    stage. A row is only returned when its fingerprint matches the one
+    computed for the current run; otherwise it is treated as a miss and
+    overwritten by the next store.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding cache files (defaults to
+                ~/.cache/sql-rule-extractor)
+        """
+        self.cache_dir = Path(os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR))
+
+    @staticmethod
+    def fingerprint(files: Iterable[str], config: Dict) -> str:
+        """
+        Compute a fingerprint for a set of source files and a configuration.
+
+        Only file metadata (path, mtime, size) is hashed, so no file
+        contents are read.
+
+        Args:
+            files: Paths of the files the pipeline would process
+            config: Configuration dictionary
+
+        Returns:
+            Hex digest identifying this input state
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}\0{_CACHE_VERSION}\n".encode())
+
+        relevant = {key: config.get(key) for key in _FINGERPRINT_SECTIONS}
+        digest.update(json.dumps(relevant, sort_keys=True, default=str).encode())
+
+        for file_path in sorted(files):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            digest.update(f"{file_path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+
+        return digest.hexdigest()
+
+    def load(self, repo_path: str, stage: str, fingerprint: str) -> Optional[Any]:
+        """
+        Load a cached stage result.
+
+        Args:
+            repo_path: Repository the result belongs to
+            stage: Pipeline stage name
+            fingerprint: Fingerprint of the current inputs
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        db_path = self._db_path(repo_path)
+        if not db_path.exists():
+            return None
+
+        try:
+            with closing(self._connect(db_path)) as conn:
+                row = conn.execute(
+                    "SELECT fingerprint, payload FROM stages WHERE stage = ?", (stage,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read cache {db_path}: {e}")
+            return None
+
+        if row is None or row[0] != fingerprint:
+            logger.debug("Cache miss for stage %s", stage)
+            return None
+
+        try:
+            value = pickle.loads(row[1])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry for stage {stage}: {e}")
+            return None
+
+        if not _matches_models(value):
+            logger.warning(f"Discarding cache entry for stage {stage} built by another version")
+            return None
+
+        logger.info(f"Loaded stage {stage} from cache {db_path}")
+        return value
+
+    def store(self, repo_path: str, stage: str, fingerprint: str, value: Any) -> None:
+        """
+        Store a stage result, replacing any previous entry.
+
+        Args:
+            repo_path: Repository the result belongs to
+            stage: Pipeline stage name
+            fingerprint: Fingerprint of the inputs that produced the value
+            value: Picklable value to cache
+        """
+        db_path = self._db_path(repo_path)
+
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with closing(self._connect(db_path)) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO stages (stage, fingerprint, payload) VALUES (?, ?, ?)",
+                    (stage, fingerprint, payload)
+                )
+        except (OSError, sqlite3.Error, pickle.PicklingError) as e:
+            logger.warning(f"Could not write cache {db_path}: {e}")
+
+    def _db_path(self, repo_path: str) -> Path:
+        """Get the cache file for a repository."""
+        repo_key = hashlib.sha256(os.path.abspath(repo_path).encode()).hexdigest()[:16]
+        return self.cache_dir / f"{repo_key}.sqlite"
+
+    def _connect(self, db_path: Path) -> sqlite3.Connection:
+        """Open a cache database, creating the schema if needed."""
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stages ("
+            "stage TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, payload BLOB NOT NULL)"
+        )
+        return conn
+
+
+def _matches_models(value: Any) -> bool:
+    """
+    Check unpickled models carry exactly the fields their classes define now.
+
+    Unpickling restores a model's attributes without validation, so a
+    model pickled before a field was added or removed would load silently.
+
+    Args:
+        value: Unpickled stage result
+
+    Returns:
+        True if every model in the value (and in its model-valued fields)
+        matches its current class
+    """
+    if isinstance(value, list):
+        return all(_matches_models(item) for item in value)
+    if not isinstance(value, BaseModel):
+        return True
+    if value.__dict__.keys() != type(value).model_fields.keys():
+        return False
+    return all(
+        _matches_models(field) for field in value.__dict__.values()
+        if isinstance(field, BaseModel)
+        or (isinstance(field, list) and field and isinstance(field[0], BaseModel))
+    )
@@ -1,29 +1,67 @@
 """File I/O utilities."""
 
+import base64
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict
+from types import GeneratorType
+from typing import Any, Dict, Iterable, Iterator, Sequence
+import numpy as np
 import yaml
 
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to stdlib json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional dependency, fall back to loading whole files
+    ijson = None
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml, use the pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+# Write buffer for streamed JSON output
+_STREAM_BUFFER_SIZE = 1 << 20
+
+# JSON files smaller than this are parsed whole even when ijson is
+# installed; orjson, or even stdlib json, parses them several times faster
+# and the whole document comfortably fits in memory
+_STREAM_MIN_BYTES = 16 * 1024 * 1024
+
+# Little-endian half precision, so exported blobs decode the same anywhere
+_EMBEDDING_DTYPE = np.dtype("<f2")
+
 
 def load_config(config_path: str) -> Dict:
     """
     Load configuration from YAML file.
 
+    Uses libyaml's C loader when PyYAML was built with it.
+
     Args:
         config_path: Path to config file
 
     Returns:
         Configuration dictionary
     """
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    with open(config_path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
 
 
 def save_json(data: Any, output_path: str, pretty: bool = True) -> None:
     """
     Save data as JSON.
 
+    Pydantic models may be passed directly (also nested inside lists and
+    dicts); they are serialized lazily instead of being converted up front.
+    Top-level lists (and generators) are written one item at a time, so the
+    whole document is never held in memory. Uses orjson when it is
+    installed.
+
     Args:
         data: Data to save
         output_path: Output file path
@@ -31,27 +69,205 @@ def save_json(data: Any, output_path: str, pretty: bool = True) -> None:
     """
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
+    if isinstance(data, (list, tuple, GeneratorType)):
+        _save_json_array(data, output_path, pretty)
+        return
+
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, default=_json_default, option=option))
+        return
+
     with open(output_path, 'w') as f:
         if pretty:
-            json.dump(data, f, indent=2, default=str)
+            json.dump(data, f, indent=2, default=_json_default)
         else:
-            json.dump(data, f, default=str)
+            json.dump(data, f, default=_json_default)
+
+
+def _save_json_array(items: Any, output_path: str, pretty: bool) -> None:
+    """Write a JSON array item by item, laid out as save_json would."""
+    if pretty:
+        first, separator = b'\n  ', b',\n  '
+    else:
+        first, separator = b'', b',' if orjson is not None else b', '
+
+    with open(output_path, 'wb', buffering=_STREAM_BUFFER_SIZE) as f:
+        f.write(b'[')
+        i = -1
+        for i, item in enumerate(items):
+            encoded = _dumps(item, pretty)
+            if pretty:
+                # Nest the item's own indentation one level deeper; JSON
+                # strings never contain raw newlines, so this is safe
+                encoded = encoded.replace(b'\n', b'\n  ')
+            f.write(separator if i else first)
+            f.write(encoded)
+        f.write(b'\n]' if pretty and i >= 0 else b']')
+
+
+def save_json_stream(sections: Dict[str, Any], output_path: str) -> None:
+    """
+    Save a JSON object section by section without building it in memory.
+
+    List values (and generators) are encoded and written one item at a
+    time through a large write buffer, so peak memory is bounded by the
+    largest single item rather than the whole document.
+
+    Args:
+        sections: Top-level keys and their values, written in order
+        output_path: Output file path
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'wb', buffering=_STREAM_BUFFER_SIZE) as f:
+        f.write(b'{')
+        for i, (key, value) in enumerate(sections.items()):
+            f.write(b',\n  ' if i else b'\n  ')
+            f.write(_dumps(key) + b': ')
+
+            if isinstance(value, (list, tuple, GeneratorType)):
+                f.write(b'[')
+                j = -1
+                for j, item in enumerate(value):
+                    f.write(b',\n    ' if j else b'\n    ')
+                    f.write(_dumps(item))
+                f.write(b'\n  ]' if j >= 0 else b']')
+            else:
+                f.write(_dumps(value))
+        f.write(b'\n}\n')
+
+
+def encode_embeddings(embeddings: Dict[str, Sequence[float]]) -> Dict[str, Any]:
+    """
+    Pack embedding vectors into a single base64-encoded float16 matrix.
+
+    Storing the vectors as one half-precision blob is far smaller than
+    writing every component as a JSON number.
+
+    Args:
+        embeddings: Vectors of equal length, keyed by the id they belong to
+
+    Returns:
+        Dictionary with the row ids, dtype, matrix shape and base64 data
+    """
+    ids = list(embeddings)
+    matrix = np.asarray([embeddings[i] for i in ids], dtype=_EMBEDDING_DTYPE)
+
+    return {
+        "ids": ids,
+        "dtype": "float16",
+        "shape": list(matrix.shape),
+        "data": base64.b64encode(matrix.tobytes()).decode("ascii"),
+    }
+
+
+def decode_embeddings(payload: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Unpack embeddings written by encode_embeddings.
+
+    Args:
+        payload: Dictionary produced by encode_embeddings
+
+    Returns:
+        Vectors keyed by id
+    """
+    matrix = np.frombuffer(
+        base64.b64decode(payload["data"]), dtype=_EMBEDDING_DTYPE
+    ).reshape(payload["shape"])
+
+    return dict(zip(payload["ids"], matrix))
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Encode a value as compact (or two-space indented) JSON bytes."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option)
+    return json.dumps(obj, default=_json_default, indent=2 if pretty else None).encode('utf-8')
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize objects the JSON encoders don't handle natively."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    return str(obj)
 
 
 def load_json(input_path: str) -> Any:
     """
     Load data from JSON file.
 
+    Uses orjson, on the raw file bytes, when it is installed.
+
     Args:
         input_path: Input file path
 
     Returns:
         Loaded data
     """
-    with open(input_path, 'r') as f:
+    if orjson is not None:
+        with open(input_path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(input_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
+def iter_json_array(input_path: str, key: str) -> Iterator[Any]:
+    """
+    Iterate the items of one top-level array in a JSON object file.
+
+    Files of at least _STREAM_MIN_BYTES are parsed one item at a time with
+    ijson, when it is installed, so only the current item is held in
+    memory; smaller files, or any file without ijson, are loaded with
+    load_json.
+
+    Args:
+        input_path: Input file path
+        key: Top-level key holding the array
+
+    Yields:
+        Array items in file order (none if the key is missing)
+    """
+    yield from iter_json_arrays(input_path, [key])[key]
+
+
+def iter_json_arrays(input_path: str, keys: Sequence[str]) -> Dict[str, Iterable[Any]]:
+    """
+    Get the items of several top-level arrays in a JSON object file.
+
+    Like iter_json_array, but a file that is not streamed is loaded once
+    for all keys instead of once per key.
+
+    Args:
+        input_path: Input file path
+        keys: Top-level keys holding the arrays
+
+    Returns:
+        Dictionary mapping each key to its array items in file order (an
+        ijson stream for large files, otherwise the loaded list; empty if
+        the key is missing)
+    """
+    if ijson is not None and os.path.getsize(input_path) >= _STREAM_MIN_BYTES:
+        return {key: _stream_json_array(input_path, key) for key in keys}
+
+    data = load_json(input_path)
+    return {key: data.get(key, []) for key in keys}
+
+
+def _stream_json_array(input_path: str, key: str) -> Iterator[Any]:
+    """Parse the items of one top-level array with ijson, one at a time."""
+    with open(input_path, 'rb') as f:
+        yield from ijson.items(f, f'{key}.item', use_float=True)
+
+
 def save_text(content: str, output_path: str) -> None:
     """
     Save text content to file.
@@ -0,0 +1,523 @@
+"""
+Layered (Sugiyama-style) graph layout rendered directly to SVG.
+
+Small, mostly acyclic graphs such as the DRD group graph are laid out in
+process instead of through Graphviz: cycles are broken by reversing DFS
+back edges, nodes are layered by longest path, long edges are routed
+through dummy nodes, crossings are reduced with median sweeps and nodes
+are then pulled toward their neighbours within each layer. Graphs of a
+handful of nodes can instead be drawn on a plain grid with straight edges.
+"""
+
+import math
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+Point = Tuple[float, float]
+
+# Layout metrics in SVG user units (points); text widths approximate Helvetica
+_NODE_FONT_SIZE = 10
+_EDGE_FONT_SIZE = 8
+_CHAR_WIDTH = 0.6        # Average glyph width as a fraction of the font size
+_LINE_HEIGHT = 1.3       # Line spacing as a multiple of the font size
+_NODE_PAD_X = 10.0
+_NODE_PAD_Y = 6.0
+_NODE_SEP = 36.0         # Gap between neighbouring nodes in a layer
+_RANK_SEP = 72.0         # Gap between layers
+_MARGIN = 36.0
+_PORT_SPREAD = 10.0      # Offset between parallel edges joining the same nodes
+_LOOP_SIZE = 24.0
+_ARROW_SIZE = 7.0
+_CROSSING_SWEEPS = 4
+_PLACEMENT_PASSES = 4
+
+_DEFAULT_FILL = '#f5f5f5'
+_NODE_STROKE = '#4a90e2'
+_EDGE_COLOR = '#666666'
+
+
+def label_size(lines: Sequence[str], font_size: float = _NODE_FONT_SIZE) -> Point:
+    """Estimate the (width, height) of a padded multi-line node label."""
+    longest = max((len(line) for line in lines), default=0)
+    return (
+        longest * font_size * _CHAR_WIDTH + 2 * _NODE_PAD_X,
+        max(len(lines), 1) * font_size * _LINE_HEIGHT + 2 * _NODE_PAD_Y
+    )
+
+
+def layered_layout(
+    sizes: Dict[str, Point],
+    edges: Sequence[Tuple[str, str]]
+) -> Tuple[Dict[str, Point], List[List[Point]]]:
+    """
+    Place nodes in layers so that edges point down wherever possible.
+
+    Args:
+        sizes: Node (width, height) by id, in a stable order
+        edges: Directed (source, target) pairs between ids in sizes
+
+    Returns:
+        Tuple of node centers by id and, for every edge in order, its
+        polyline from the source border to the target border
+    """
+    successors = defaultdict(list)
+    for source, target in edges:
+        if source != target and target not in successors[source]:
+            successors[source].append(target)
+
+    # Reversed back edges make the graph acyclic; layering uses the DAG
+    reversed_edges = _back_edges(list(sizes), successors)
+    dag = defaultdict(list)
+    for source in sizes:
+        for target in successors[source]:
+            u, v = (target, source) if (source, target) in reversed_edges else (source, target)
+            if v not in dag[u]:
+                dag[u].append(v)
+
+    layer = _longest_path_layers(list(sizes), dag)
+
+    # Split edges spanning several layers with dummy nodes, so every edge
+    # of the layered graph joins adjacent layers
+    chains: Dict[Tuple[str, str], List[str]] = {}
+    node_layer = dict(layer)
+    node_size = dict(sizes)
+    for u in sizes:
+        for v in dag[u]:
+            chain = [u]
+            for i in range(layer[u] + 1, layer[v]):
+                dummy = f"\0{u}\0{v}\0{i}"
+                node_layer[dummy] = i
+                node_size[dummy] = (0.0, 0.0)
+                chain.append(dummy)
+            chain.append(v)
+            chains[(u, v)] = chain
+
+    above = defaultdict(list)
+    below = defaultdict(list)
+    for chain in chains.values():
+        for upper, lower in zip(chain, chain[1:]):
+            below[upper].append(lower)
+            above[lower].append(upper)
+
+    layers: List[List[str]] = [[] for _ in range(max(node_layer.values(), default=-1) + 1)]
+    for node, i in node_layer.items():
+        layers[i].append(node)
+
+    layers = _reduce_crossings(layers, above, below)
+    centers = _place_nodes(layers, node_size, above, below)
+
+    # Route each edge along its chain, nudging parallel edges apart:
+    # downward routes to the right and upward (reversed) ones to the left,
+    # or centered around the straight line when all run the same way
+    pair_counts = defaultdict(lambda: [0, 0])
+    for source, target in edges:
+        pair_counts[frozenset((source, target))][(source, target) in reversed_edges] += 1
+    pair_seen = defaultdict(lambda: [0, 0])
+
+    routes = []
+    for source, target in edges:
+        pair = frozenset((source, target))
+        upward = (source, target) in reversed_edges
+        index = pair_seen[pair][upward]
+        pair_seen[pair][upward] += 1
+        if all(pair_counts[pair]):
+            offset = (index + 0.5) * _PORT_SPREAD * (-1 if upward else 1)
+        else:
+            offset = (index - (pair_counts[pair][upward] - 1) / 2) * _PORT_SPREAD
+
+        if source == target:
+            routes.append(_loop_route(centers[source], sizes[source], offset))
+            continue
+
+        if (source, target) in reversed_edges:
+            chain = chains[(target, source)][::-1]
+        else:
+            chain = chains[(source, target)]
+        points = [(centers[n][0] + offset, centers[n][1]) for n in chain]
+
+        # Clip the ends to the node borders facing the route
+        for end, nxt in ((0, 1), (-1, -2)):
+            x, y = points[end]
+            half_height = sizes[chain[end]][1] / 2
+            points[end] = (x, y + half_height if points[nxt][1] > y else y - half_height)
+        routes.append(points)
+
+    return {node: centers[node] for node in sizes}, routes
+
+
+def render_layered_svg(
+    nodes: Dict[str, Dict[str, Any]],
+    edges: Sequence[Dict[str, Any]]
+) -> str:
+    """
+    Lay out a directed graph in layers and render it as an SVG document.
+
+    Edge endpoints missing from nodes are drawn as plain nodes labelled
+    with their id, as Graphviz does.
+
+    Args:
+        nodes: Node attributes by id: "lines" (label lines) and "fillcolor"
+        edges: Edge attributes: "source", "target", "lines" (label lines),
+            "color" and "penwidth"
+
+    Returns:
+        SVG document text
+    """
+    nodes = dict(nodes)
+    for edge in edges:
+        for end in (edge['source'], edge['target']):
+            nodes.setdefault(end, {'lines': [end]})
+
+    sizes = {node_id: label_size(node['lines']) for node_id, node in nodes.items()}
+    centers, routes = layered_layout(sizes, [(e['source'], e['target']) for e in edges])
+
+    return _svg_document(nodes, edges, sizes, centers, routes)
+
+
+def grid_layout(sizes: Dict[str, Point]) -> Dict[str, Point]:
+    """Place nodes row by row on a near-square grid of equal cells."""
+    columns = max(1, math.ceil(math.sqrt(len(sizes))))
+    cell_width = max((w for w, _ in sizes.values()), default=0.0)
+    cell_height = max((h for _, h in sizes.values()), default=0.0)
+
+    return {
+        node: (
+            _MARGIN + cell_width / 2 + (i % columns) * (cell_width + _NODE_SEP),
+            _MARGIN + cell_height / 2 + (i // columns) * (cell_height + _RANK_SEP)
+        )
+        for i, node in enumerate(sizes)
+    }
+
+
+def render_grid_svg(
+    nodes: Dict[str, Dict[str, Any]],
+    edges: Sequence[Dict[str, Any]]
+) -> str:
+    """
+    Place a small graph on a grid and render it as an SVG document.
+
+    Edges are straight lines between node borders; edges with "dir" set
+    to "none" are drawn without an arrowhead.
+
+    Args:
+        nodes: Node attributes by id: "lines" (label lines) and "fillcolor"
+        edges: Edge attributes: "source", "target", "lines" (label lines),
+            and optionally "color", "penwidth" and "dir"
+
+    Returns:
+        SVG document text
+    """
+    nodes = dict(nodes)
+    for edge in edges:
+        for end in (edge['source'], edge['target']):
+            nodes.setdefault(end, {'lines': [end]})
+
+    sizes = {node_id: label_size(node['lines']) for node_id, node in nodes.items()}
+    centers = grid_layout(sizes)
+
+    routes = []
+    for edge in edges:
+        source, target = edge['source'], edge['target']
+        if source == target:
+            routes.append(_loop_route(centers[source], sizes[source], 0.0))
+        else:
+            routes.append([
+                _border_point(centers[source], sizes[source], centers[target]),
+                _border_point(centers[target], sizes[target], centers[source]),
+            ])
+
+    return _svg_document(nodes, edges, sizes, centers, routes)
+
+
+def _svg_document(
+    nodes: Dict[str, Dict[str, Any]],
+    edges: Sequence[Dict[str, Any]],
+    sizes: Dict[str, Point],
+    centers: Dict[str, Point],
+    routes: List[List[Point]]
+) -> str:
+    """Render placed nodes and routed edges as an SVG document."""
+    width = max((x + sizes[n][0] / 2 for n, (x, _) in centers.items()), default=0.0)
+    height = max((y + sizes[n][1] / 2 for n, (_, y) in centers.items()), default=0.0)
+    for route in routes:
+        width = max(width, *(x for x, _ in route))
+    width += _MARGIN
+    height += _MARGIN
+
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" height="{height:.0f}pt"'
+        f' viewBox="0 0 {width:.1f} {height:.1f}">',
+        '<rect width="100%" height="100%" fill="white"/>',
+        '<g font-family="Helvetica,Arial,sans-serif">',
+    ]
+
+    # Edges first so nodes are drawn on top of them
+    for edge, route in zip(edges, routes):
+        parts.append(_edge_svg(edge, route))
+
+    for node_id, node in nodes.items():
+        parts.append(_node_svg(node_id, node, centers[node_id], sizes[node_id]))
+
+    parts.append('</g>')
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+def _back_edges(order: List[str], successors: Dict[str, List[str]]) -> set:
+    """Find edges closing a cycle in a depth-first search."""
+    ON_STACK, DONE = 1, 2
+    state: Dict[str, int] = {}
+    back = set()
+
+    for root in order:
+        if root in state:
+            continue
+        state[root] = ON_STACK
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                child_state = state.get(child)
+                if child_state is None:
+                    state[child] = ON_STACK
+                    stack.append((child, iter(successors[child])))
+                    break
+                if child_state == ON_STACK:
+                    back.add((node, child))
+            else:
+                state[node] = DONE
+                stack.pop()
+
+    return back
+
+
+def _longest_path_layers(order: List[str], dag: Dict[str, List[str]]) -> Dict[str, int]:
+    """Assign each node the length of the longest path reaching it."""
+    indegree = {node: 0 for node in order}
+    for node in order:
+        for target in dag[node]:
+            indegree[target] += 1
+
+    layer = {node: 0 for node in order}
+    queue = deque(node for node in order if indegree[node] == 0)
+    while queue:
+        node = queue.popleft()
+        for target in dag[node]:
+            layer[target] = max(layer[target], layer[node] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+
+    return layer
+
+
+def _reduce_crossings(
+    layers: List[List[str]],
+    above: Dict[str, List[str]],
+    below: Dict[str, List[str]]
+) -> List[List[str]]:
+    """Reorder layers by neighbour medians, keeping the fewest crossings seen."""
+    best = [list(nodes) for nodes in layers]
+    best_crossings = _count_crossings(best, below)
+
+    for _ in range(_CROSSING_SWEEPS):
+        if best_crossings == 0:
+            break
+        for i in range(1, len(layers)):
+            layers[i] = _median_order(layers[i], layers[i - 1], above)
+        for i in range(len(layers) - 2, -1, -1):
+            layers[i] = _median_order(layers[i], layers[i + 1], below)
+
+        crossings = _count_crossings(layers, below)
+        if crossings < best_crossings:
+            best = [list(nodes) for nodes in layers]
+            best_crossings = crossings
+
+    return best
+
+
+def _median_order(nodes: List[str], fixed: List[str], neighbours: Dict[str, List[str]]) -> List[str]:
+    """Sort a layer by the median position of each node's neighbours in a fixed layer."""
+    position = {node: i for i, node in enumerate(fixed)}
+
+    def key(item: Tuple[int, str]) -> float:
+        index, node = item
+        ranks = sorted(position[n] for n in neighbours[node])
+        if not ranks:
+            return index
+        middle = len(ranks) // 2
+        return ranks[middle] if len(ranks) % 2 else (ranks[middle - 1] + ranks[middle]) / 2
+
+    return [node for _, node in sorted(enumerate(nodes), key=key)]
+
+
+def _count_crossings(layers: List[List[str]], below: Dict[str, List[str]]) -> int:
+    """Count crossing edge pairs between every two adjacent layers."""
+    crossings = 0
+    for upper, lower in zip(layers, layers[1:]):
+        position = {node: i for i, node in enumerate(lower)}
+        segments = [
+            (i, position[target]) for i, node in enumerate(upper) for target in below[node]
+        ]
+        for k, (a1, b1) in enumerate(segments):
+            for a2, b2 in segments[k + 1:]:
+                if (a1 - a2) * (b1 - b2) < 0:
+                    crossings += 1
+    return crossings
+
+
+def _place_nodes(
+    layers: List[List[str]],
+    sizes: Dict[str, Point],
+    above: Dict[str, List[str]],
+    below: Dict[str, List[str]]
+) -> Dict[str, Point]:
+    """Assign node centers, pulling nodes toward their neighbours in adjacent layers."""
+    x: Dict[str, float] = {}
+    for nodes in layers:
+        right = 0.0
+        for node in nodes:
+            x[node] = right + sizes[node][0] / 2
+            right += sizes[node][0] + _NODE_SEP
+
+    for _ in range(_PLACEMENT_PASSES):
+        for nodes in layers[1:]:
+            _align_layer(nodes, sizes, x, above)
+        for nodes in reversed(layers[:-1]):
+            _align_layer(nodes, sizes, x, below)
+
+    left = min((x[n] - sizes[n][0] / 2 for nodes in layers for n in nodes), default=0.0)
+
+    centers = {}
+    top = _MARGIN
+    for nodes in layers:
+        layer_height = max((sizes[n][1] for n in nodes), default=0.0)
+        for node in nodes:
+            centers[node] = (x[node] - left + _MARGIN, top + layer_height / 2)
+        top += layer_height + _RANK_SEP
+
+    return centers
+
+
+def _align_layer(
+    nodes: List[str],
+    sizes: Dict[str, Point],
+    x: Dict[str, float],
+    neighbours: Dict[str, List[str]]
+) -> None:
+    """Move a layer's nodes toward their neighbours' mean x, keeping order and spacing."""
+    desired = []
+    for node in nodes:
+        linked = neighbours[node]
+        desired.append(sum(x[n] for n in linked) / len(linked) if linked else x[node])
+
+    def gap(a: str, b: str) -> float:
+        separation = _NODE_SEP if sizes[a][0] and sizes[b][0] else _NODE_SEP / 2
+        return (sizes[a][0] + sizes[b][0]) / 2 + separation
+
+    # Pack once from each side; the mean of the two packings keeps the spacing
+    from_left = list(desired)
+    for k in range(1, len(nodes)):
+        from_left[k] = max(from_left[k], from_left[k - 1] + gap(nodes[k - 1], nodes[k]))
+    from_right = list(desired)
+    for k in range(len(nodes) - 2, -1, -1):
+        from_right[k] = min(from_right[k], from_right[k + 1] - gap(nodes[k], nodes[k + 1]))
+
+    for k, node in enumerate(nodes):
+        x[node] = (from_left[k] + from_right[k]) / 2
+
+
+def _border_point(center: Point, size: Point, toward: Point) -> Point:
+    """Find where the line from a node's center toward a point leaves its box."""
+    cx, cy = center
+    dx, dy = toward[0] - cx, toward[1] - cy
+    scale = min(
+        size[0] / 2 / abs(dx) if dx else math.inf,
+        size[1] / 2 / abs(dy) if dy else math.inf
+    )
+    if scale == math.inf:
+        return center
+    return cx + dx * scale, cy + dy * scale
+
+
+def _loop_route(center: Point, size: Point, offset: float) -> List[Point]:
+    """Route a self-loop out of and back into the right side of a node."""
+    cx, cy = center
+    right = cx + size[0] / 2
+    reach = _LOOP_SIZE + abs(offset)
+    return [
+        (right, cy - 6), (right + reach, cy - reach / 2),
+        (right + reach, cy + reach / 2), (right, cy + 6),
+    ]
+
+
+def _edge_svg(edge: Dict[str, Any], route: List[Point]) -> str:
+    """Render one edge as a polyline with an arrowhead and label."""
+    color = edge.get('color', _EDGE_COLOR)
+    penwidth = edge.get('penwidth', '1')
+
+    path = ' '.join(f"{x:.1f},{y:.1f}" for x, y in route)
+    parts = [
+        f'<g class="edge"><title>{escape(edge["source"])}&#45;&gt;{escape(edge["target"])}</title>',
+        f'<polyline points="{path}" fill="none" stroke={quoteattr(color)}'
+        f' stroke-width={quoteattr(str(penwidth))}/>',
+    ]
+
+    # Arrowhead along the last segment, its tip on the target border
+    if edge.get('dir') != 'none':
+        (x1, y1), (x2, y2) = route[-2], route[-1]
+        length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5 or 1.0
+        dx, dy = (x2 - x1) / length, (y2 - y1) / length
+        base_x, base_y = x2 - dx * _ARROW_SIZE, y2 - dy * _ARROW_SIZE
+        half = _ARROW_SIZE / 2
+        parts.append(
+            f'<polygon points="{x2:.1f},{y2:.1f} {base_x - dy * half:.1f},{base_y + dx * half:.1f}'
+            f' {base_x + dy * half:.1f},{base_y - dx * half:.1f}" fill={quoteattr(color)}'
+            f' stroke={quoteattr(color)}/>'
+        )
+
+    lines = edge.get('lines') or []
+    if lines:
+        # Label beside the middle of the route, on the outer side: right of
+        # downward routes, left of upward ones
+        middle = (len(route) - 1) // 2
+        (ax, ay), (bx, by) = route[middle], route[middle + 1]
+        side = 1 if by >= ay else -1
+        label_x = (ax + bx) / 2 + 4 * side
+        label_y = (ay + by) / 2 - (len(lines) - 2) * _EDGE_FONT_SIZE * _LINE_HEIGHT / 2
+        anchor = 'start' if side > 0 else 'end'
+        parts.append(_text_svg(lines, label_x, label_y, _EDGE_FONT_SIZE, anchor))
+
+    parts.append('</g>')
+    return ''.join(parts)
+
+
+def _node_svg(node_id: str, node: Dict[str, Any], center: Point, size: Point) -> str:
+    """Render one node as a rounded, filled box with its label lines."""
+    cx, cy = center
+    width, height = size
+    fill = node.get('fillcolor', _DEFAULT_FILL)
+    lines = node['lines']
+
+    first_baseline = cy - (len(lines) - 1) * _NODE_FONT_SIZE * _LINE_HEIGHT / 2 + _NODE_FONT_SIZE * 0.35
+    return (
+        f'<g class="node"><title>{escape(node_id)}</title>'
+        f'<rect x="{cx - width / 2:.1f}" y="{cy - height / 2:.1f}" width="{width:.1f}"'
+        f' height="{height:.1f}" rx="6" ry="6" fill={quoteattr(fill)}'
+        f' stroke="{_NODE_STROKE}" stroke-width="2"/>'
+        f'{_text_svg(lines, cx, first_baseline, _NODE_FONT_SIZE, "middle")}</g>'
+    )
+
+
+def _text_svg(lines: Sequence[str], x: float, y: float, font_size: float, anchor: str) -> str:
+    """Render label lines as one text element, one tspan per line."""
+    spans = ''.join(
+        f'<tspan x="{x:.1f}" dy="{0 if i == 0 else font_size * _LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (
+        f'<text x="{x:.1f}" y="{y:.1f}" font-size="{font_size}"'
+        f' text-anchor="{anchor}">{spans}</text>'
+    )
@@ -1,8 +1,15 @@
 """Logging configuration."""
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from typing import Optional
+from typing import List, Optional
+
+# Background listener writing queued records to the real handlers
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logging(
@@ -13,6 +20,9 @@ def setup_logging(
     """
     Configure logging for the application.
 
+    Log calls only enqueue their record; a background thread formats and
+    writes them, so console and file I/O never block the caller.
+
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path
@@ -40,14 +50,59 @@ def setup_logging(
         file_handler.setFormatter(logging.Formatter(log_format))
         handlers.append(file_handler)
 
-    # Configure root logger
-    logging.basicConfig(
-        level=numeric_level,
-        format=log_format,
-        handlers=handlers
-    )
+    # Configure root logger, unless already configured (as basicConfig).
+    # The queue handler only merges each message with its arguments (and
+    # any traceback) in the calling thread, so the record is safe to hand
+    # over; the real handlers apply the log format in the listener thread
+    global _listener
+    root = logging.getLogger()
+    if not root.handlers:
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+        root.setLevel(numeric_level)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
 
     # Reduce noise from third-party libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("anthropic").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _stop_listener() -> None:
+    """Flush queued records and stop the background listener, if any."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _use_direct_handlers() -> None:
+    """
+    Write directly to the real handlers in a forked child process.
+
+    The listener thread does not survive a fork, so records queued in a
+    worker process would otherwise never be written. The handler locks are
+    re-created too, since the fork may have happened while the listener
+    thread held one and the copy would then never be released.
+    """
+    if _listener is None:
+        return
+
+    root = logging.getLogger()
+    handlers: List[logging.Handler] = list(_listener.handlers)
+    for handler in handlers:
+        handler.createLock()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_use_direct_handlers)
@@ -1,107 +1,233 @@
 """SVG visualization for Decision Requirements Diagrams."""
 
-import json
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+from bisect import bisect_right
+from collections import defaultdict
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
 import networkx as nx
-import pygraphviz as pgv
+
+try:
+    import pygraphviz as pgv
+except ImportError:  # Optional dependency, only needed for Graphviz layouts
+    pgv = None
+
+from .cache import DEFAULT_CACHE_DIR
+from .io import iter_json_array, iter_json_arrays
+from .layered_svg import render_grid_svg, render_layered_svg
+
+
+logger = logging.getLogger(__name__)
+
+# Node fill colors for group categories and rule types
+_CATEGORY_COLORS = {
+    'Pricing': '#fff3e0',
+    'Validation': '#e8f5e9',
+    'Customer': '#f3e5f5',
+    'Order': '#e3f2fd',
+    'Inventory': '#fff9c4',
+    'Payment': '#ffebee',
+    'Eligibility': '#f1f8e9'
+}
+_RULE_TYPE_COLORS = {
+    'conditional': '#e3f2fd',
+    'validation': '#e8f5e9',
+    'calculation': '#fff3e0',
+    'constraint': '#ffebee',
+    'trigger': '#f3e5f5'
+}
+
+# Rule graphs with more rules than this are laid out with sfdp, whose
+# multilevel Barnes-Hut layout scales far better than fdp's all-pairs forces
+_SFDP_MIN_RULES = 100
+_SFDP_ARGS = '-Goverlap=prism -GsmoothType=graph_dist'
+
+# Rule graphs with at most this many rules are drawn on a grid in process,
+# which is quicker than starting a Graphviz layout
+_GRID_MAX_RULES = 6
+
+# Layouts computed in process rather than by Graphviz
+_IN_PROCESS_RENDERERS = {
+    'layered': render_layered_svg,
+    'grid': render_grid_svg,
+}
+
+# Graphviz attributes of the group graph and the rule dependency graph;
+# layout_args holds extra command line arguments per layout engine
+_GROUP_GRAPHVIZ_STYLE = {
+    'rankdir': 'TB',
+    'graph': {
+        'fontname': 'Helvetica',
+        'fontsize': '10',
+        'bgcolor': 'white',
+        'pad': '0.5',
+        'ranksep': '1.0',
+        'nodesep': '0.5'
+    },
+    'node': {
+        'fontname': 'Helvetica',
+        'fontsize': '10',
+        'shape': 'box',
+        'style': 'rounded,filled',
+        'fillcolor': '#e8f4f8',
+        'color': '#4a90e2',
+        'penwidth': '2'
+    },
+    'edge': {
+        'fontname': 'Helvetica',
+        'fontsize': '8',
+        'color': '#666666',
+        'penwidth': '1.5',
+        'arrowsize': '0.8'
+    },
+    'layout_args': {}
+}
+_RULE_GRAPHVIZ_STYLE = {
+    'rankdir': 'LR',
+    'graph': {
+        'fontname': 'Helvetica',
+        'fontsize': '10',
+        'bgcolor': 'white',
+        'pad': '0.5',
+        'ranksep': '1.5'
+    },
+    'node': {
+        'fontname': 'Helvetica',
+        'fontsize': '9',
+        'shape': 'ellipse',
+        'style': 'filled',
+        'fillcolor': '#f0f0f0'
+    },
+    'edge': {
+        'fontname': 'Helvetica',
+        'fontsize': '7',
+        'color': '#888888',
+        'arrowsize': '0.6'
+    },
+    'layout_args': {'sfdp': _SFDP_ARGS}
+}
+
+# Output paths with this suffix are written gzip-compressed (SVGZ), which
+# browsers and SVG viewers open directly
+_SVGZ_SUFFIX = '.svgz'
+_SVGZ_LEVEL = 6
+
+# Version of the rendered SVGs, part of every cache key; bump whenever the
+# drawing code (here, in layered_svg or the Graphviz styles) changes output
+_RENDERER_VERSION = 1
+
+# JSON files larger than this are identified by path, mtime and size
+# instead of by hashing their contents
+_HASH_MAX_BYTES = 50 * 1024 * 1024
+
+
+def _json_key(json_path: str) -> str:
+    """Identify the contents of a DRD JSON file for the SVG cache."""
+    stat = os.stat(json_path)
+    digest = hashlib.blake2b(digest_size=16)
+
+    if stat.st_size > _HASH_MAX_BYTES:
+        digest.update(
+            f"{os.path.abspath(json_path)}\0{stat.st_mtime_ns}\0{stat.st_size}".encode()
+        )
+    else:
+        with open(json_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _write_svg(output_path: str, svg: Union[str, bytes]) -> None:
+    """Write an SVG document, gzip-compressed when the path ends in .svgz."""
+    if isinstance(svg, str):
+        svg = svg.encode('utf-8')
+    if output_path.endswith(_SVGZ_SUFFIX):
+        # A zero mtime keeps the compressed bytes reproducible
+        svg = gzip.compress(svg, compresslevel=_SVGZ_LEVEL, mtime=0)
+    with open(output_path, 'wb') as f:
+        f.write(svg)
+
+
+def _require_pygraphviz() -> None:
+    """Fail with an install hint when a Graphviz layout is used without pygraphviz."""
+    if pgv is None:
+        raise ImportError(
+            "pygraphviz is required for Graphviz layouts "
+            "(pip install pygraphviz, which needs the graphviz system package)"
+        )
 
 
 class DRDVisualizer:
     """Generate SVG visualizations of DRD using Graphviz."""
 
-    def __init__(self):
-        """Initialize the visualizer."""
-        pass
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the visualizer.
+
+        Args:
+            cache_dir: Directory for caching rendered SVGs, keyed by the JSON
+                contents and render options; no caching if None
+        """
+        self.cache_dir = (
+            Path(os.path.expanduser(cache_dir)) / "svg" if cache_dir else None
+        )
 
     def generate_svg_from_json(
         self,
         json_path: str,
         output_path: str,
-        layout: str = "dot"
+        layout: str = "layered"
     ) -> None:
         """Generate SVG from JSON DRD data.
 
         Args:
             json_path: Path to JSON file containing DRD data
-            output_path: Path to save SVG file
-            layout: Graphviz layout engine (dot, neato, fdp, sfdp, circo, twopi)
+            output_path: Path to save SVG file (gzip-compressed if it ends
+                in .svgz)
+            layout: "layered" or "grid" to lay out and draw the graph in
+                process, or a Graphviz layout engine (dot, neato, fdp, sfdp,
+                circo, twopi)
         """
-        # Load JSON data
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-
-        # Create directed graph
-        G = pgv.AGraph(directed=True, strict=False, rankdir='TB')
-
-        # Set graph attributes for better visualization
-        G.graph_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '10',
-            'bgcolor': 'white',
-            'pad': '0.5',
-            'ranksep': '1.0',
-            'nodesep': '0.5'
-        })
-
-        G.node_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '10',
-            'shape': 'box',
-            'style': 'rounded,filled',
-            'fillcolor': '#e8f4f8',
-            'color': '#4a90e2',
-            'penwidth': '2'
-        })
-
-        G.edge_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '8',
-            'color': '#666666',
-            'penwidth': '1.5',
-            'arrowsize': '0.8'
-        })
-
-        # Add nodes for rule groups
-        groups = data.get('groups', [])
-        for group in groups:
+        cache_path = self._cache_path(json_path, output_path, "groups", layout)
+        if self._load_cached(cache_path, output_path):
+            print(f"✓ SVG visualization copied from cache to: {output_path}")
+            return
+
+        # Groups and dependencies are streamed from large JSON files one at
+        # a time; smaller files are loaded once for both
+        sections = iter_json_arrays(json_path, ['groups', 'dependencies'])
+
+        # Collect nodes for rule groups
+        nodes = {}
+        num_groups = 0
+        for num_groups, group in enumerate(sections['groups'], 1):
             group_id = group['id']
             group_name = group['name']
             category = group.get('category', 'Unknown')
             num_rules = len(group.get('rules', []))
             confidence = group.get('confidence', 0.0)
 
-            # Create node label with multiple lines
-            label = f"{group_name}\\n"
-            label += f"[{category}]\\n"
-            label += f"{num_rules} rules | {confidence:.0%} conf"
-
-            # Color by category
-            color_map = {
-                'Pricing': '#fff3e0',
-                'Validation': '#e8f5e9',
-                'Customer': '#f3e5f5',
-                'Order': '#e3f2fd',
-                'Inventory': '#fff9c4',
-                'Payment': '#ffebee',
-                'Eligibility': '#f1f8e9'
+            # Node label with multiple lines, colored by category
+            nodes[group_id] = {
+                'lines': [
+                    group_name,
+                    f"[{category}]",
+                    f"{num_rules} rules | {confidence:.0%} conf"
+                ],
+                'fillcolor': _CATEGORY_COLORS.get(category, '#f5f5f5')
             }
-            fillcolor = color_map.get(category, '#f5f5f5')
 
-            G.add_node(
-                group_id,
-                label=label,
-                fillcolor=fillcolor,
-                shape='box',
-                style='rounded,filled'
-            )
-
-        # Add edges for dependencies
-        dependencies = data.get('dependencies', [])
-        for dep in dependencies:
-            source_id = dep['source_id']
-            target_id = dep['target_id']
+        # Collect edges for dependencies
+        edges = []
+        for dep in sections['dependencies']:
             dep_type = dep.get('dependency_type', 'dataflow')
             strength = dep.get('strength', 1.0)
 
@@ -116,128 +242,214 @@ class DRDVisualizer:
                 penwidth = '1'
                 color = '#aaaaaa'
 
-            edge_label = f"{dep_type}\\n{strength:.2f}"
-
-            G.add_edge(
-                source_id,
-                target_id,
-                label=edge_label,
-                penwidth=penwidth,
-                color=color
-            )
+            edges.append({
+                'source': dep['source_id'],
+                'target': dep['target_id'],
+                'lines': [dep_type, f"{strength:.2f}"],
+                'penwidth': penwidth,
+                'color': color
+            })
 
-        # Layout and render
-        G.layout(prog=layout)
-        G.draw(output_path, format='svg')
+        # Layout and render; the layered layout runs in process, any other
+        # layout goes through Graphviz
+        self._render(nodes, edges, output_path, layout, _GROUP_GRAPHVIZ_STYLE)
+        self._store_cached(cache_path, output_path)
 
         print(f"✓ SVG visualization saved to: {output_path}")
-        print(f"  Groups: {len(groups)}")
-        print(f"  Dependencies: {len(dependencies)}")
+        print(f"  Groups: {num_groups}")
+        print(f"  Dependencies: {len(edges)}")
         print(f"  Layout: {layout}")
 
     def generate_rule_dependency_graph(
         self,
         json_path: str,
         output_path: str,
-        max_rules: int = 50
+        max_rules: int = 50,
+        layout: Optional[str] = None
     ) -> None:
         """Generate detailed rule-level dependency graph.
 
         Args:
             json_path: Path to JSON file containing DRD data
-            output_path: Path to save SVG file
+            output_path: Path to save SVG file (gzip-compressed if it ends
+                in .svgz)
             max_rules: Maximum number of rules to visualize
+            layout: "grid" or "layered" to draw the rules in process, or a
+                Graphviz layout engine; by default grid for graphs of up to
+                _GRID_MAX_RULES rules, fdp above that and sfdp for graphs
+                with more than _SFDP_MIN_RULES rules
         """
-        # Load JSON data
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-
-        # Create directed graph
-        G = pgv.AGraph(directed=True, strict=False, rankdir='LR')
-
-        # Set graph attributes
-        G.graph_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '10',
-            'bgcolor': 'white',
-            'pad': '0.5',
-            'ranksep': '1.5'
-        })
-
-        G.node_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '9',
-            'shape': 'ellipse',
-            'style': 'filled',
-            'fillcolor': '#f0f0f0'
-        })
-
-        G.edge_attr.update({
-            'fontname': 'Helvetica',
-            'fontsize': '7',
-            'color': '#888888',
-            'arrowsize': '0.6'
-        })
-
-        # Add nodes for rules (limit to max_rules)
-        rules = data.get('rules', [])[:max_rules]
-        for rule in rules:
-            rule_id = rule['id']
-            rule_type = rule.get('rule_type', 'unknown')
-            description = rule.get('description', '')[:50] + "..."
-
-            # Truncate description
-            label = f"{rule_id}\\n{description}"
-
-            # Color by rule type
-            type_colors = {
-                'conditional': '#e3f2fd',
-                'validation': '#e8f5e9',
-                'calculation': '#fff3e0',
-                'constraint': '#ffebee',
-                'trigger': '#f3e5f5'
-            }
-            fillcolor = type_colors.get(rule_type, '#f5f5f5')
+        cache_path = self._cache_path(json_path, output_path, "rules", max_rules, layout or "auto")
+        if self._load_cached(cache_path, output_path):
+            print(f"✓ Rule dependency graph copied from cache to: {output_path}")
+            return
+
+        # Collect nodes for rules (limit to max_rules). Rules are streamed
+        # from the JSON, and only the id, tables and columns of each are
+        # kept for the edge pass
+        nodes = {}
+        rules = []
+        with closing(iter_json_array(json_path, 'rules')) as items:
+            for rule in islice(items, max_rules):
+                rule_id = rule['id']
+                rule_type = rule.get('rule_type', 'unknown')
+                description = rule.get('description', '')[:50] + "..."
+
+                # Node label with the truncated description, colored by type
+                nodes[rule_id] = {
+                    'lines': [rule_id, description],
+                    'fillcolor': _RULE_TYPE_COLORS.get(rule_type, '#f5f5f5')
+                }
+
+                rules.append((
+                    rule_id,
+                    frozenset(rule.get('tables', [])),
+                    frozenset(rule.get('columns', []))
+                ))
+
+        # Index rule positions by table and column, so each rule is only
+        # paired with the later rules it shares something with instead of
+        # being intersected with every other rule
+        table_index = defaultdict(list)
+        column_index = defaultdict(list)
+        for i, (_, tables, columns) in enumerate(rules):
+            for table in tables:
+                table_index[table].append(i)
+            for column in columns:
+                column_index[column].append(i)
+
+        # Collect edges based on shared tables/columns
+        edges = []
+        for i, (rule1_id, tables1, columns1) in enumerate(rules):
+            related = set()
+            for index, names in ((table_index, tables1), (column_index, columns1)):
+                for name in names:
+                    positions = index[name]
+                    related.update(positions[bisect_right(positions, i):])
+
+            for j in sorted(related):
+                rule2_id, tables2, _ = rules[j]
+                shared_tables = tables1 & tables2
 
-            G.add_node(
-                rule_id,
-                label=label,
-                fillcolor=fillcolor,
-                shape='box',
-                style='rounded,filled'
-            )
+                lines = []
+                if shared_tables:
+                    lines.append(f"Tables: {', '.join(list(shared_tables)[:2])}")
+
+                edges.append({
+                    'source': rule1_id,
+                    'target': rule2_id,
+                    'lines': lines,
+                    'dir': 'none'  # Undirected for shared resources
+                })
+
+        # Layout and render; a handful of rules is drawn on a grid in
+        # process, larger graphs are force-directed by default
+        if layout is None:
+            if len(rules) <= _GRID_MAX_RULES:
+                layout = 'grid'
+            else:
+                layout = 'sfdp' if len(rules) > _SFDP_MIN_RULES else 'fdp'
+        self._render(nodes, edges, output_path, layout, _RULE_GRAPHVIZ_STYLE)
+        self._store_cached(cache_path, output_path)
+
+        print(f"✓ Rule dependency graph saved to: {output_path}")
+        print(f"  Rules: {len(rules)}")
+        print(f"  (showing first {max_rules} rules)")
+        print(f"  Layout: {layout}")
 
-        # Add edges based on shared tables/columns
-        for i, rule1 in enumerate(rules):
-            tables1 = set(rule1.get('tables', []))
-            columns1 = set(rule1.get('columns', []))
+    def _render(
+        self,
+        nodes: Dict[str, Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        output_path: str,
+        layout: str,
+        style: Dict[str, Any]
+    ) -> None:
+        """
+        Lay out and draw a graph, in process or with Graphviz.
 
-            for rule2 in rules[i+1:]:
-                tables2 = set(rule2.get('tables', []))
-                columns2 = set(rule2.get('columns', []))
+        Args:
+            nodes: Node attributes by id: "lines" (label lines) and "fillcolor"
+            edges: Edge attributes: "source", "target", "lines" (label
+                lines) and any further Graphviz edge attributes
+            output_path: Path to save SVG file
+            layout: An in-process layout (layered, grid) or a Graphviz engine
+            style: Graphviz attributes of the graph, one of the *_GRAPHVIZ_STYLE dicts
+        """
+        render_svg = _IN_PROCESS_RENDERERS.get(layout)
+        if render_svg is not None:
+            _write_svg(output_path, render_svg(nodes, edges))
+            return
 
-                shared_tables = tables1 & tables2
-                shared_columns = columns1 & columns2
+        _require_pygraphviz()
 
-                if shared_tables or shared_columns:
-                    label = ""
-                    if shared_tables:
-                        label = f"Tables: {', '.join(list(shared_tables)[:2])}"
+        G = pgv.AGraph(directed=True, strict=False, rankdir=style['rankdir'])
+        G.graph_attr.update(style['graph'])
+        G.node_attr.update(style['node'])
+        G.edge_attr.update(style['edge'])
 
-                    G.add_edge(
-                        rule1['id'],
-                        rule2['id'],
-                        label=label,
-                        dir='none'  # Undirected for shared resources
-                    )
+        for node_id, node in nodes.items():
+            G.add_node(
+                node_id,
+                label='\\n'.join(node['lines']),
+                fillcolor=node['fillcolor'],
+                shape='box',
+                style='rounded,filled'
+            )
 
-        # Layout and render
-        G.layout(prog='fdp')  # Force-directed layout for rule graphs
-        G.draw(output_path, format='svg')
+        for edge in edges:
+            attrs = {k: v for k, v in edge.items() if k not in ('source', 'target', 'lines')}
+            G.add_edge(
+                edge['source'],
+                edge['target'],
+                label='\\n'.join(edge['lines']),
+                **attrs
+            )
 
-        print(f"✓ Rule dependency graph saved to: {output_path}")
-        print(f"  Rules: {len(rules)}")
-        print(f"  (showing first {max_rules} rules)")
+        layout_args = style['layout_args'].get(layout)
+        if layout_args:
+            G.layout(prog=layout, args=layout_args)
+        else:
+            G.layout(prog=layout)
+
+        if output_path.endswith(_SVGZ_SUFFIX):
+            _write_svg(output_path, G.draw(format='svg'))
+        else:
+            G.draw(output_path, format='svg')
+
+    def _cache_path(self, json_path: str, output_path: str, *options) -> Optional[Path]:
+        """Get the cache file for a JSON file rendered with the given options."""
+        if self.cache_dir is None:
+            return None
+        name = "_".join(str(option) for option in options)
+        suffix = _SVGZ_SUFFIX if output_path.endswith(_SVGZ_SUFFIX) else '.svg'
+        return self.cache_dir / f"{_json_key(json_path)}_v{_RENDERER_VERSION}_{name}{suffix}"
+
+    def _load_cached(self, cache_path: Optional[Path], output_path: str) -> bool:
+        """Copy a cached SVG to output_path; returns False on a miss."""
+        if cache_path is None or not cache_path.exists():
+            return False
+
+        try:
+            shutil.copyfile(cache_path, output_path)
+        except OSError as e:
+            logger.warning(f"Could not copy cached SVG {cache_path}: {e}")
+            return False
+
+        return True
+
+    def _store_cached(self, cache_path: Optional[Path], output_path: str) -> None:
+        """Store a rendered SVG, replacing the cache file atomically."""
+        if cache_path is None:
+            return
+
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write SVG cache {cache_path}: {e}")
 
 
 def main():
@@ -255,7 +467,7 @@ def main():
     parser.add_argument(
         '--out',
         required=True,
-        help='Output SVG file path'
+        help='Output SVG file path; a .svgz path is written gzip-compressed'
     )
     parser.add_argument(
         '--type',
@@ -265,9 +477,10 @@ def main():
     )
     parser.add_argument(
         '--layout',
-        choices=['dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi'],
-        default='dot',
-        help='Graphviz layout engine (default: dot)'
+        choices=['layered', 'grid', 'dot', 'neato', 'fdp', 'sfdp', 'circo', 'twopi'],
+        help='Layout engine: layered or grid (in process) or a Graphviz '
+             'engine (default: layered for groups; for rules grid up to '
+             f'{_GRID_MAX_RULES} rules, fdp, or sfdp above {_SFDP_MIN_RULES} rules)'
     )
     parser.add_argument(
         '--max-rules',
@@ -275,22 +488,33 @@ def main():
         default=50,
         help='Maximum rules to show in rule graph (default: 50)'
     )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'Directory for cached SVGs (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always re-render instead of reusing a cached SVG'
+    )
 
     args = parser.parse_args()
 
-    visualizer = DRDVisualizer()
+    visualizer = DRDVisualizer(cache_dir=None if args.no_cache else args.cache_dir)
 
     if args.type == 'groups':
         visualizer.generate_svg_from_json(
             args.json,
             args.out,
-            layout=args.layout
+            layout=args.layout or 'layered'
         )
     else:
         visualizer.generate_rule_dependency_graph(
             args.json,
             args.out,
-            max_rules=args.max_rules
+            max_rules=args.max_rules,
+            layout=args.layout
         )
 
 
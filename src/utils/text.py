@@ -0,0 +1,60 @@
+"""Text position helpers."""
+
+from bisect import bisect_left
+from typing import List, Union
+
+# Leading bytes (or characters) inspected when deciding if a file is binary
+BINARY_SNIFF_SIZE = 4096
+
+
+class LineIndex:
+    """
+    Map offsets in a text to 1-based line numbers.
+
+    Newline offsets are collected once, so each lookup is a binary search
+    instead of a recount of every newline before the offset. Bytes-like
+    texts (including mmap objects) are indexed by byte offset.
+    """
+
+    def __init__(self, text: Union[str, bytes]):
+        """
+        Initialize index.
+
+        Args:
+            text: Text that offsets refer to; str, bytes or mmap
+        """
+        self._newlines: List[int] = []
+        newline = '\n' if isinstance(text, str) else b'\n'
+
+        offset = text.find(newline)
+        while offset != -1:
+            self._newlines.append(offset)
+            offset = text.find(newline, offset + 1)
+
+    def line_at(self, offset: int) -> int:
+        """
+        Get the line containing a character offset.
+
+        Args:
+            offset: Character (or byte) offset into the text
+
+        Returns:
+            1-based line number
+        """
+        return bisect_left(self._newlines, offset) + 1
+
+
+def looks_binary(head: Union[str, bytes]) -> bool:
+    """
+    Check whether the start of a file looks like binary data.
+
+    Source text never contains NUL, while most binary formats have one in
+    their first few kilobytes.
+
+    Args:
+        head: First BINARY_SNIFF_SIZE bytes or characters of the file
+
+    Returns:
+        True if the file should be skipped as binary
+    """
+    return ('\x00' if isinstance(head, str) else b'\x00') in head
@@ -1,34 +1,88 @@
 """Traceability validation - verify DRD links back to source code."""
 
+import functools
+import os
 import sys
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
 from lxml import etree as ET
 
 logger = logging.getLogger(__name__)
 
+# Leading characters of expected and actual snippets that are compared
+_SNIPPET_COMPARE_CHARS = 200
+
+
+@functools.lru_cache(maxsize=256)
+def _load_lines(path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    Read a source file's lines, memoized across traceability links.
+
+    Many rules point into the same file, so it is read once rather than
+    once per link. The modification time is part of the key, so an
+    edited file is read again.
+    """
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return tuple(f)
+
+
+def _leading_text(lines: Sequence[str], limit: int) -> str:
+    """
+    Get the first limit characters of the stripped text of some lines.
+
+    Equal to "".join(lines).strip()[:limit], but stops joining once limit
+    characters are certain, so long line ranges are not copied in full.
+    """
+    parts = []
+    length = 0   # Characters up to and including the last non-blank one
+    trailing = 0  # Blank characters after it
+
+    for line in lines:
+        if not parts:
+            line = line.lstrip()
+            if not line:
+                continue
+        parts.append(line)
+
+        content = len(line.rstrip())
+        if content:
+            length += trailing + content
+            trailing = len(line) - content
+        else:
+            trailing += len(line)
+
+        if length >= limit:
+            break
+
+    return "".join(parts).strip()[:limit]
+
 
 class TraceabilityValidator:
     """Validate traceability links in DMN/DRD."""
 
-    def __init__(self, drd_path: str, repo_path: str):
+    def __init__(self, drd_path: str, repo_path: str, max_workers: Optional[int] = None):
         """
         Initialize validator.
 
         Args:
             drd_path: Path to DMN XML file
             repo_path: Path to source repository
+            max_workers: Threads reading source files (defaults to four
+                per CPU, at most 32)
         """
         self.drd_path = drd_path
         self.repo_path = Path(repo_path)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
 
-        # Parse DMN
-        self.tree = ET.parse(drd_path)
-        self.root = self.tree.getroot()
-
-        # Extract namespace
+        # Extract namespace; the DMN itself is streamed by validate()
         self.ns = self._extract_namespaces()
+        self._snippet_xp = ET.XPath("ext:snippet", namespaces=self.ns)
+
+        # Result of the first validate() call, reused by generate_report()
+        self._validation_result = None
 
     def _extract_namespaces(self) -> Dict[str, str]:
         """Extract namespaces from DMN."""
@@ -44,37 +98,63 @@ class TraceabilityValidator:
         Returns:
             Tuple of (success, list of errors)
         """
+        if self._validation_result is not None:
+            return self._validation_result
+
+        self._validation_result = self._validate_sources()
+        return self._validation_result
+
+    def _validate_sources(self) -> Tuple[bool, List[str]]:
+        """Stream the DMN and check every traceability source in it."""
         logger.info("Validating traceability links")
 
         errors = []
         validated_count = 0
 
-        # Find all traceability source elements
-        sources = self.root.findall(".//ext:source", self.ns)
-
-        if not sources:
+        # Stream traceability source elements, so only one is held in
+        # memory at a time rather than the whole DMN tree
+        sources = ET.iterparse(
+            self.drd_path, events=("end",), tag=f"{{{self.ns['ext']}}}source"
+        )
+
+        # Each distinct source file is read once on a worker thread, so reads
+        # overlap each other and the parsing; links are then checked against
+        # the file contents in document order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            reads: Dict[str, Future] = {}
+            links = []
+
+            for _, source in sources:
+                rule_id = source.get("ruleId")
+                file_path = source.get("file")
+                start_line = int(source.get("startLine"))
+                end_line = int(source.get("endLine"))
+
+                snippet_elems = self._snippet_xp(source)
+                expected_snippet = snippet_elems[0].text if snippet_elems else None
+
+                if file_path not in reads:
+                    reads[file_path] = executor.submit(self._read_source, file_path)
+                links.append((rule_id, file_path, start_line, end_line, expected_snippet))
+
+                # Free this element and everything parsed before it
+                source.clear()
+                for node in chain((source,), source.iterancestors()):
+                    while node.getprevious() is not None:
+                        del node.getparent()[0]
+
+            for link in links:
+                # Validate this link
+                is_valid, error = self._validate_link(*link, reads[link[1]])
+                if not is_valid:
+                    errors.append(error)
+                else:
+                    validated_count += 1
+
+        if not links:
             errors.append("No traceability sources found in DMN")
             return False, errors
 
-        for source in sources:
-            rule_id = source.get("ruleId")
-            file_path = source.get("file")
-            start_line = int(source.get("startLine"))
-            end_line = int(source.get("endLine"))
-
-            snippet_elem = source.find("ext:snippet", self.ns)
-            expected_snippet = snippet_elem.text if snippet_elem is not None else None
-
-            # Validate this link
-            is_valid, error = self._validate_link(
-                rule_id, file_path, start_line, end_line, expected_snippet
-            )
-
-            if not is_valid:
-                errors.append(error)
-            else:
-                validated_count += 1
-
         success = len(errors) == 0
 
         if success:
@@ -84,25 +164,33 @@ class TraceabilityValidator:
 
         return success, errors
 
+    def _read_source(self, file_path: str) -> Optional[Tuple[str, ...]]:
+        """Read the lines of a source file, or None if it does not exist."""
+        full_path = self.repo_path / file_path
+
+        try:
+            mtime_ns = full_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        return _load_lines(str(full_path), mtime_ns)
+
     def _validate_link(
         self,
         rule_id: str,
         file_path: str,
         start_line: int,
         end_line: int,
-        expected_snippet: str
+        expected_snippet: str,
+        source_read: Future
     ) -> Tuple[bool, str]:
-        """Validate a single traceability link."""
-        # Check if file exists
-        full_path = self.repo_path / file_path
-
-        if not full_path.exists():
-            return False, f"Rule {rule_id}: File not found: {file_path}"
-
-        # Read file and extract lines
+        """Validate a single traceability link against its source file's read."""
         try:
-            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            lines = source_read.result()
+
+            # Check if file exists
+            if lines is None:
+                return False, f"Rule {rule_id}: File not found: {file_path}"
 
             # Check line numbers are valid
             if start_line < 1 or start_line > len(lines):
@@ -111,13 +199,15 @@ class TraceabilityValidator:
             if end_line < start_line or end_line > len(lines):
                 return False, f"Rule {rule_id}: Invalid end line {end_line} in {file_path}"
 
-            # Extract actual snippet (with some tolerance)
-            actual_snippet = "".join(lines[start_line-1:end_line]).strip()
-
             # Compare snippets (allow for truncation)
             if expected_snippet:
-                expected_clean = expected_snippet.strip()[:200]
-                actual_clean = actual_snippet[:200]
+                expected_clean = expected_snippet.strip()[:_SNIPPET_COMPARE_CHARS]
+
+                # Extract actual snippet (with some tolerance); only its
+                # leading characters are compared, so only those are joined
+                actual_clean = _leading_text(
+                    lines[start_line-1:end_line], _SNIPPET_COMPARE_CHARS
+                )
 
                 # Allow fuzzy match
                 if expected_clean not in actual_clean and actual_clean not in expected_clean:
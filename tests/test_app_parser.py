@@ -0,0 +1,172 @@
+"""Tests for application code parser."""
+
+import tempfile
+from pathlib import Path
+
+from src.extractor.app_parser import AppCodeParser
+from src.extractor import RuleType
+
+
+class TestAppCodeParser:
+    """Test application code parsing functionality."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.parser = AppCodeParser()
+
+    def get_sql_rules(self, content, language):
+        """Helper to parse content and keep only embedded SQL rules."""
+        rules = self.parser.parse_file("test_file", content, language)
+        return [r for r in rules if r.rule_type == RuleType.VALIDATION]
+
+    def test_python_sql_strings(self):
+        """Test each Python SQL string literal yields one rule."""
+        code = '''"""Module docstring mentioning SQL."""
+
+def get_orders(customer_id):
+    query = """
+        SELECT order_id FROM orders
+        WHERE customer_id = %(customer_id)s
+    """
+    other = "SELECT name FROM customers WHERE status = 'active'"
+    no_filter = 'SELECT * FROM products'
+    return query, other, no_filter
+'''
+
+        rules = self.get_sql_rules(code, "python")
+
+        assert len(rules) == 2
+        assert all(r.normalized_expression.startswith("SELECT") for r in rules)
+        assert rules[0].tables == ["orders"]
+        assert rules[0].variables == ["customer_id"]
+        assert rules[1].tables == ["customers"]
+
+        # Line numbers point at the SQL itself, not the opening quotes
+        assert (rules[0].source.start_line, rules[0].source.end_line) == (5, 6)
+        assert (rules[1].source.start_line, rules[1].source.end_line) == (8, 8)
+
+    def test_apostrophe_in_comment(self):
+        """Test a stray quote outside a string does not swallow code."""
+        code = '''# don't match across lines
+query = "SELECT id FROM accounts WHERE balance > 0"
+'''
+
+        rules = self.get_sql_rules(code, "python")
+
+        assert len(rules) == 1
+        assert rules[0].normalized_expression == "SELECT id FROM accounts WHERE balance > 0"
+
+    def test_mixed_case_select(self):
+        """Test a file whose only SQL spells SELECT in mixed case is still scanned."""
+        code = 'q = "sElect id FROM orders WHERE total > 100"\n'
+
+        assert len(self.get_sql_rules(code, "python")) == 1
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "orders.py"
+            path.write_text(code)
+            rules = list(self.parser.parse_path(str(path), "python"))
+
+        assert [r.tables for r in rules] == [["orders"]]
+
+    def test_javascript_template_literal(self):
+        """Test SQL in JavaScript template literals."""
+        code = '''const q = `
+  SELECT * FROM invoices
+  WHERE amount > ${limit}
+`;
+'''
+
+        rules = self.get_sql_rules(code, "javascript")
+
+        assert len(rules) == 1
+        assert rules[0].tables == ["invoices"]
+
+    def test_java_sql_string(self):
+        """Test SQL in Java string literals."""
+        code = '''class Repo {
+    char quote = '"';
+    String q = "SELECT id FROM users WHERE age >= 18";
+}
+'''
+
+        rules = self.get_sql_rules(code, "java")
+
+        assert len(rules) == 1
+        assert rules[0].normalized_expression == "SELECT id FROM users WHERE age >= 18"
+
+    def test_parse_path_matches_parse_file(self):
+        """Test parsing a file from disk matches parsing its decoded text."""
+        code = '''def price_for(total):
+    # caf\u00e9 pricing
+    if total > 100:
+        return 0.9
+    return "SELECT rate FROM discounts WHERE tier = 'gold'"
+'''
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "pricing.py"
+            path.write_bytes(code.replace("\n", "\r\n").encode("utf-8"))
+            empty = Path(tmpdir) / "empty.py"
+            empty.write_text("")
+
+            rules = list(self.parser.parse_path(str(path), "python"))
+            assert list(self.parser.parse_path(str(empty), "python")) == []
+
+        expected = self.parser.parse_file(str(path), code, "python")
+
+        assert len(rules) == 2
+        assert [r.model_dump() for r in rules] == [r.model_dump() for r in expected]
+
+    def test_repeated_sql_in_file(self):
+        """Test repeated SQL in a file yields one rule, while each conditional keeps its own."""
+        code = '''a = "SELECT id FROM accounts WHERE balance > 0"
+b = "SELECT id FROM accounts WHERE balance > 0"
+if balance > 0:
+    pass
+if balance > 0:
+    pass
+'''
+
+        rules = self.parser.parse_file("test_file", code, "python")
+
+        assert [r.source.start_line for r in rules] == [1, 3, 5]
+        assert [r.rule_type for r in rules] == [
+            RuleType.VALIDATION, RuleType.CONDITIONAL, RuleType.CONDITIONAL
+        ]
+        assert rules[0].id.startswith("rule_py_") and len(rules[0].id) == len("rule_py_") + 16
+
+    def test_python_conditionals_from_ast(self):
+        """Test Python conditions come from real if statements only."""
+        code = '''# if total > 100: ignored comment
+note = """
+if amount > 5:
+"""
+if (total > 100 and
+        status == "active"):
+    pass
+elif discount >= 10:
+    pass
+'''
+
+        rules = self.parser.parse_file("test_file", code, "python")
+        conditions = [r for r in rules if r.rule_type == RuleType.CONDITIONAL]
+
+        assert [r.normalized_expression for r in conditions] == [
+            'IF total > 100 and status == "active"',
+            "IF discount >= 10",
+        ]
+        assert (conditions[0].source.start_line, conditions[0].source.end_line) == (5, 6)
+        assert conditions[1].source.snippet == "elif discount >= 10:"
+
+    def test_python_conditionals_without_valid_syntax(self):
+        """Test unparseable Python falls back to scanning if lines."""
+        code = '''print "legacy"
+if total > 100:
+    pass
+'''
+
+        rules = self.parser.parse_file("test_file", code, "python")
+
+        assert [r.normalized_expression for r in rules] == ["IF total > 100"]
+        assert rules[0].source.start_line == 2
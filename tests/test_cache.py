@@ -0,0 +1,113 @@
+"""Tests for the pipeline cache."""
+
+import os
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from src.utils import cache as cache_module
+from src.utils.cache import PipelineCache
+from src.extractor import Rule, RuleType, SourceLocation
+
+
+class TestPipelineCache:
+    """Test pipeline result caching."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmpdir.name) / "repo"
+        self.repo.mkdir()
+        self.sql_file = self.repo / "schema.sql"
+        self.sql_file.write_text("SELECT * FROM orders WHERE total > 100;")
+
+        self.cache = PipelineCache(str(Path(self.tmpdir.name) / "cache"))
+        self.config = {"parsing": {"sql_dialects": ["postgres"]}}
+
+    def teardown_method(self):
+        """Clean up temporary files."""
+        self.tmpdir.cleanup()
+
+    def create_rule(self, rule_id):
+        """Helper to create test rule."""
+        return Rule(
+            id=rule_id,
+            rule_type=RuleType.VALIDATION,
+            description="Test rule",
+            normalized_expression="total > 100",
+            source=SourceLocation(
+                file_path=str(self.sql_file),
+                start_line=1,
+                end_line=1,
+                snippet="total > 100"
+            ),
+            embedding=[0.1, 0.2]
+        )
+
+    def test_store_and_load(self):
+        """Test a stored stage is returned for the same fingerprint."""
+        fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+        self.cache.store(str(self.repo), "rules", fingerprint, [self.create_rule("r1")])
+
+        loaded = self.cache.load(str(self.repo), "rules", fingerprint)
+
+        assert loaded is not None
+        assert len(loaded) == 1
+        assert loaded[0].id == "r1"
+        assert loaded[0].embedding == [0.1, 0.2]
+
+    def test_miss_without_entry(self):
+        """Test loading from an empty cache is a miss."""
+        fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+
+        assert self.cache.load(str(self.repo), "rules", fingerprint) is None
+
+    def test_fingerprint_mismatch_is_miss(self):
+        """Test a stale entry is not returned once sources change."""
+        fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+        self.cache.store(str(self.repo), "rules", fingerprint, [self.create_rule("r1")])
+
+        # Modify the source file
+        self.sql_file.write_text("SELECT * FROM orders WHERE total > 200 AND status = 'open';")
+        stat = self.sql_file.stat()
+        os.utime(self.sql_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        new_fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+
+        assert new_fingerprint != fingerprint
+        assert self.cache.load(str(self.repo), "rules", new_fingerprint) is None
+
+    def test_fingerprint_depends_on_config(self):
+        """Test parsing configuration is part of the fingerprint."""
+        files = [str(self.sql_file)]
+        other_config = {"parsing": {"sql_dialects": ["mysql"]}}
+
+        assert PipelineCache.fingerprint(files, self.config) != \
+            PipelineCache.fingerprint(files, other_config)
+
+    def test_fingerprint_depends_on_cache_version(self, monkeypatch):
+        """Test entries written by another pipeline version are not reused."""
+        files = [str(self.sql_file)]
+        fingerprint = PipelineCache.fingerprint(files, self.config)
+
+        monkeypatch.setattr(cache_module, "_CACHE_VERSION", cache_module._CACHE_VERSION + 1)
+
+        assert PipelineCache.fingerprint(files, self.config) != fingerprint
+
+    def test_stale_model_is_miss(self):
+        """Test rules pickled with fields the model no longer has are discarded."""
+        fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+        rule = self.create_rule("r1")
+        rule.__dict__["retired_field"] = 1
+        self.cache.store(str(self.repo), "rules", fingerprint, [rule])
+
+        assert self.cache.load(str(self.repo), "rules", fingerprint) is None
+
+    def test_unreadable_entry_is_miss(self):
+        """Test a payload that cannot be unpickled is treated as a miss."""
+        fingerprint = PipelineCache.fingerprint([str(self.sql_file)], self.config)
+        self.cache.store(str(self.repo), "rules", fingerprint, [self.create_rule("r1")])
+        with closing(self.cache._connect(self.cache._db_path(str(self.repo)))) as conn, conn:
+            conn.execute("UPDATE stages SET payload = ?", (b"not a pickle",))
+
+        assert self.cache.load(str(self.repo), "rules", fingerprint) is None
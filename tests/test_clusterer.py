@@ -18,13 +18,18 @@ class TestRuleClusterer:
             }
         }
         self.clusterer = RuleClusterer(self.config)
+        self.rng = np.random.default_rng(0)
+
+    @staticmethod
+    def quantize(vector):
+        """Helper to quantize a unit-variance vector to int8, clipping past 4 sigma."""
+        return np.clip(np.rint(vector * 127 / 4), -128, 127).astype(np.int8)
 
     def create_rule(self, rule_id, description, embedding=None):
         """Helper to create test rule."""
         if embedding is None:
-            # Generate random embedding
-            np.random.seed(hash(rule_id) % 2**32)
-            embedding = np.random.randn(384).tolist()
+            # Generate random int8-quantized embedding
+            embedding = self.quantize(self.rng.standard_normal(384)).tolist()
 
         return Rule(
             id=rule_id,
@@ -62,6 +67,33 @@ class TestRuleClusterer:
         total_rules = sum(len(g.rules) for g in groups)
         assert total_rules == len(rules)
 
+    def test_cluster_with_minibatch_kmeans(self):
+        """Test mini-batch K-means is used past the size threshold."""
+        self.config["clustering"]["minibatch_threshold"] = 3
+        clusterer = RuleClusterer(self.config)
+        rules = [self.create_rule(f"r{i}", f"pricing rule {i}") for i in range(6)]
+
+        groups = clusterer.cluster_rules(rules)
+
+        assert 0 < len(groups) <= self.config["clustering"]["n_clusters"]
+        assert sum(len(g.rules) for g in groups) == len(rules)
+
+    def test_cluster_with_dbscan(self):
+        """Test DBSCAN separates directions regardless of magnitude."""
+        self.config["clustering"] = {"method": "dbscan", "eps": 0.1, "min_samples": 2}
+        clusterer = RuleClusterer(self.config)
+        rules = [
+            self.create_rule("r1", "pricing rule 1", [1.0, 0.0, 0.0]),
+            self.create_rule("r2", "pricing rule 2", [5.0, 0.1, 0.0]),
+            self.create_rule("r3", "eligibility rule 1", [0.0, 0.0, 2.0]),
+            self.create_rule("r4", "eligibility rule 2", [0.0, 0.1, 0.5]),
+            self.create_rule("r5", "outlier", [0.0, 1.0, 0.0]),
+        ]
+
+        groups = clusterer.cluster_rules(rules)
+
+        assert [[r.id for r in g.rules] for g in groups] == [["r1", "r2"], ["r3", "r4"]]
+
     def test_cluster_without_embeddings(self):
         """Test clustering fallback without embeddings."""
         rules = [
@@ -100,6 +132,9 @@ class TestRuleClusterer:
         # Should use metadata-based grouping
         assert len(groups) > 0
 
+        # Rule types are tallied even without embeddings
+        assert self.clusterer.counts == {RuleType.CONDITIONAL: 1, RuleType.VALIDATION: 1}
+
     def test_empty_rules(self):
         """Test clustering with empty rule list."""
         groups = self.clusterer.cluster_rules([])
@@ -134,6 +169,61 @@ class TestRuleClusterer:
         assert 0 <= group.confidence <= 1
         assert len(group.rules) > 0
 
+    def test_group_tables_follow_copied_rules(self):
+        """Test a group copied with other rules reports their tables and columns."""
+        orders = self.create_rule("r1", "pricing rule").model_copy(
+            update={"tables": ["orders"], "columns": ["total"]}
+        )
+        invoices = self.create_rule("r2", "pricing rule").model_copy(
+            update={"tables": ["invoices"], "columns": ["due"]}
+        )
+        group = self.clusterer.cluster_rules([orders])[0]
+
+        assert group.tables == {"orders"}
+
+        copied = group.model_copy(update={"rules": [invoices]})
+
+        assert copied.tables == {"invoices"}
+        assert copied.columns == {"due"}
+
+    def test_embeddings_are_float32(self):
+        """Test embeddings are clustered as a float32 matrix."""
+        rules = [
+            self.create_rule("r1", "pricing rule", np.arange(4, dtype=np.float64).tolist()),
+            self.create_rule("r2", "pricing rule", [0.5, 0.25, 0.0, 1.0]),
+        ]
+
+        embeddings = self.clusterer._extract_embeddings(rules)
+
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (2, 4)
+        np.testing.assert_array_equal(embeddings[0], [0.0, 1.0, 2.0, 3.0])
+
+    def test_int8_quantized_embeddings(self):
+        """Test int8-quantized embeddings group like the float vectors they come from."""
+        centers = self.rng.standard_normal((2, 384))
+        vectors = [centers[i % 2] + 0.1 * self.rng.standard_normal(384) for i in range(6)]
+
+        def partition(embeddings):
+            rules = [
+                self.create_rule(f"r{i}", f"pricing rule {i}", embedding)
+                for i, embedding in enumerate(embeddings)
+            ]
+            groups = self.clusterer.cluster_rules(rules)
+            return sorted(sorted(r.id for r in g.rules) for g in groups)
+
+        quantized = [self.quantize(v) for v in vectors]
+
+        # int8 values are exact in the float32 matrix the clusterer builds
+        matrix = self.clusterer._extract_embeddings([
+            self.create_rule("r0", "pricing rule", quantized[0].tolist())
+        ])
+        np.testing.assert_array_equal(matrix[0], quantized[0])
+
+        assert partition(q.tolist() for q in quantized) == \
+            partition(v.tolist() for v in vectors) == \
+            [["r0", "r2", "r4"], ["r1", "r3", "r5"]]
+
     def test_infer_category(self):
         """Test category inference from domain concepts."""
         rules = [
@@ -0,0 +1,118 @@
+"""Tests for rule enricher."""
+
+import numpy as np
+
+from src.extractor import Rule, RuleType, SourceLocation
+from src.extractor import enricher as enricher_module
+from src.extractor.enricher import RuleEnricher, StubLLMAdapter
+
+
+class TestStubLLMAdapter:
+    """Test stub embedding generation."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.adapter = StubLLMAdapter()
+
+    def test_embedding_is_deterministic_unit_vector(self):
+        """Test the same text always maps to the same unit vector."""
+        first = self.adapter.generate_embedding("total > 100")
+        second = StubLLMAdapter().generate_embedding("total > 100")
+        other = self.adapter.generate_embedding("status = 'active'")
+
+        assert len(first) == self.adapter.embedding_dim
+        assert first == second
+        assert first != other
+        assert abs(np.linalg.norm(first) - 1.0) < 1e-6
+
+    def test_embedding_leaves_global_random_state(self):
+        """Test generating embeddings does not reseed numpy's global RNG."""
+        np.random.seed(123)
+        expected = np.random.rand()
+
+        np.random.seed(123)
+        self.adapter.generate_embedding("total > 100")
+
+        assert np.random.rand() == expected
+
+
+class TestRuleEnricher:
+    """Test rule enrichment."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.enricher = RuleEnricher({"llm": {"provider": "stub"}})
+
+    def create_rule(self, rule_id, expression, embedding=None):
+        """Helper to create test rule."""
+        return Rule(
+            id=rule_id,
+            rule_type=RuleType.CONDITIONAL,
+            description="Discount rule",
+            normalized_expression=expression,
+            embedding=embedding,
+            source=SourceLocation(
+                file_path="test.sql",
+                start_line=1,
+                end_line=1,
+                snippet=expression
+            )
+        )
+
+    def test_batch_embeddings_match_single(self):
+        """Test batched embeddings equal per-rule embeddings."""
+        rules = [
+            self.create_rule("r1", "total > 100"),
+            self.create_rule("r2", "price < 5", embedding=[1.0, 0.0]),
+            self.create_rule("r3", "status = 'active'"),
+        ]
+
+        enriched = self.enricher.enrich_rules(rules)
+
+        assert enriched[1].embedding == [1.0, 0.0]
+        for rule in (enriched[0], enriched[2]):
+            expected = self.enricher.llm_adapter.generate_embedding(
+                self.enricher._create_embedding_text(rule)
+            )
+            np.testing.assert_allclose(rule.embedding, expected)
+        assert "pricing" in enriched[1].metadata["domain_concepts"]
+
+    def test_identical_texts_embedded_once(self):
+        """Test rules with the same embedding text share one model call."""
+        batches = []
+        generate_embeddings = self.enricher.llm_adapter.generate_embeddings
+
+        def record(texts):
+            batches.append(list(texts))
+            return generate_embeddings(texts)
+
+        self.enricher.llm_adapter.generate_embeddings = record
+
+        first = self.enricher.enrich_rules([
+            self.create_rule("r1", "total > 100"),
+            self.create_rule("r2", "total > 100"),
+            self.create_rule("r3", "status = 'active'"),
+        ])
+        second = self.enricher.enrich_rules([self.create_rule("r4", "total > 100")])
+
+        assert len(batches) == 1
+        assert len(batches[0]) == 2
+        assert first[0].embedding == first[1].embedding == second[0].embedding
+
+        # Each rule owns its vector
+        first[0].embedding[0] += 1.0
+        assert first[1].embedding == second[0].embedding != first[0].embedding
+
+        single = self.enricher.enrich_rule(self.create_rule("r5", "total > 100"))
+        assert single.embedding == second[0].embedding
+        assert single.embedding is not second[0].embedding
+
+    def test_domain_concepts_overlapping_keywords(self, monkeypatch):
+        """Test keywords inside other keywords map to every concept."""
+        rule = self.create_rule("r1", "must validate discount_rate")
+        expected = ["pricing", "eligibility", "date", "validation"]
+
+        assert self.enricher._map_domain_concepts(rule) == expected
+
+        monkeypatch.setattr(enricher_module, "_DOMAIN_AUTOMATON", None)
+        assert self.enricher._map_domain_concepts(rule) == expected
@@ -6,6 +6,7 @@ from pathlib import Path
 import tempfile
 from lxml import etree as ET
 
+from src.extractor import ingest as ingest_module
 from src.extractor.ingest import RepositoryIngestor
 from src.extractor.rule_normalizer import RuleNormalizer
 from src.extractor.enricher import RuleEnricher
@@ -14,103 +15,110 @@ from src.extractor.drd_generator import DRDGenerator
 from src.extractor import DecisionModel, RuleDependency
 
 
+SAMPLE_REPO = Path(__file__).parent.parent / "sample_repos" / "sample_sql_app"
+
+
+def make_config():
+    """Build the pipeline configuration used by these tests."""
+    return {
+        "llm": {
+            "provider": "stub"
+        },
+        "clustering": {
+            "method": "kmeans",
+            "n_clusters": 3
+        },
+        "parsing": {
+            "sql_dialects": ["postgres"],
+            "max_file_size_mb": 10,
+            "file_extensions": {
+                "sql": [".sql"],
+                "python": [".py"]
+            },
+            "ignore_patterns": []
+        },
+        "output": {
+            "include_snippets": True,
+            "pretty_print_xml": True
+        },
+        "dmn": {
+            "namespace": "http://test/dmn",
+            "exporter": "Test",
+            "exporter_version": "1.0",
+            "include_extensions": True,
+            "decision_prefix": "Decision_",
+            "input_data_prefix": "InputData_"
+        },
+        "enrichment": {
+            "enable_domain_mapping": True,
+            "enable_semantic_analysis": False
+        },
+        "logging": {
+            "level": "INFO"
+        }
+    }
+
+
+@pytest.fixture(scope="module")
+def sample_rules():
+    """
+    Run the pipeline over the sample repository once for the whole module.
+
+    Returns:
+        Tuple of (ingested rules, enriched rules, groups, decision model, DMN XML)
+    """
+    if not SAMPLE_REPO.exists():
+        pytest.skip("Sample repository not found")
+
+    config = make_config()
+    ingested = RepositoryIngestor(config).ingest_repository(str(SAMPLE_REPO))
+
+    # Later steps update rules in place, so they work on copies
+    normalizer = RuleNormalizer()
+    rules = normalizer.normalize_rules([r.model_copy(deep=True) for r in ingested])
+    rules = normalizer.deduplicate_rules(rules)
+    rules = RuleEnricher(config).enrich_rules(rules)
+    groups = RuleClusterer(config).cluster_rules(rules)
+
+    decision_model = DecisionModel(
+        rules=rules,
+        groups=groups,
+        dependencies=[]
+    )
+    dmn_xml = DRDGenerator(config).generate_drd(decision_model)
+
+    return ingested, rules, groups, decision_model, dmn_xml
+
+
 class TestEndToEnd:
     """End-to-end integration tests."""
 
     def setup_method(self):
         """Setup test configuration."""
-        self.config = {
-            "llm": {
-                "provider": "stub"
-            },
-            "clustering": {
-                "method": "kmeans",
-                "n_clusters": 3
-            },
-            "parsing": {
-                "sql_dialects": ["postgres"],
-                "max_file_size_mb": 10,
-                "file_extensions": {
-                    "sql": [".sql"],
-                    "python": [".py"]
-                },
-                "ignore_patterns": []
-            },
-            "output": {
-                "include_snippets": True,
-                "pretty_print_xml": True
-            },
-            "dmn": {
-                "namespace": "http://test/dmn",
-                "exporter": "Test",
-                "exporter_version": "1.0",
-                "include_extensions": True,
-                "decision_prefix": "Decision_",
-                "input_data_prefix": "InputData_"
-            },
-            "enrichment": {
-                "enable_domain_mapping": True,
-                "enable_semantic_analysis": False
-            },
-            "logging": {
-                "level": "INFO"
-            }
-        }
+        self.config = make_config()
 
-    def test_full_pipeline_sample_repo(self):
+    def test_full_pipeline_sample_repo(self, sample_rules):
         """Test full pipeline on sample repository."""
-        # Get sample repo path
-        sample_repo = Path(__file__).parent.parent / "sample_repos" / "sample_sql_app"
-
-        if not sample_repo.exists():
-            pytest.skip("Sample repository not found")
-
-        # Step 1: Ingest
-        ingestor = RepositoryIngestor(self.config)
-        rules = ingestor.ingest_repository(str(sample_repo))
+        ingested, rules, groups, decision_model, dmn_xml = sample_rules
 
         # Should extract rules from sample repo
-        assert len(rules) > 0, "No rules extracted from sample repository"
+        assert len(ingested) > 0, "No rules extracted from sample repository"
 
         # Should have different rule types
-        rule_types = set(r.rule_type for r in rules)
+        rule_types = set(r.rule_type for r in ingested)
         assert len(rule_types) > 0
 
-        # Step 2: Normalize
-        normalizer = RuleNormalizer()
-        rules = normalizer.normalize_rules(rules)
-        rules = normalizer.deduplicate_rules(rules)
-
+        # Normalization keeps rules
         assert len(rules) > 0
 
-        # Step 3: Enrich
-        enricher = RuleEnricher(self.config)
-        rules = enricher.enrich_rules(rules)
-
         # All rules should have embeddings
         assert all(r.embedding is not None for r in rules)
 
-        # Step 4: Cluster
-        clusterer = RuleClusterer(self.config)
-        groups = clusterer.cluster_rules(rules)
-
         assert len(groups) > 0
         # All rules should be in groups
         total_rules = sum(len(g.rules) for g in groups)
         assert total_rules == len(rules)
 
-        # Step 5: Build decision model
-        dependencies = []
-        decision_model = DecisionModel(
-            rules=rules,
-            groups=groups,
-            dependencies=dependencies
-        )
-
-        # Step 6: Generate DRD
-        generator = DRDGenerator(self.config)
-        dmn_xml = generator.generate_drd(decision_model)
-
         # Should generate valid XML
         assert dmn_xml is not None
         assert len(dmn_xml) > 0
@@ -126,7 +134,8 @@ class TestEndToEnd:
         decisions = root.findall(".//dmn:decision", ns)
         assert len(decisions) > 0, "No decision elements found in DMN"
 
-        # Step 7: Generate markdown report
+        # Generate markdown report
+        generator = DRDGenerator(self.config)
         markdown = generator.generate_markdown_report(decision_model)
         assert markdown is not None
         assert "Business Rules Report" in markdown
@@ -163,35 +172,23 @@ class TestEndToEnd:
             rule_texts = [r.normalized_expression.lower() for r in rules]
             assert any('1000' in text for text in rule_texts)
 
-    def test_traceability_in_dmn(self):
-        """Test that DMN includes traceability information."""
-        sample_repo = Path(__file__).parent.parent / "sample_repos" / "sample_sql_app"
-
-        if not sample_repo.exists():
-            pytest.skip("Sample repository not found")
-
-        # Run pipeline
-        ingestor = RepositoryIngestor(self.config)
-        rules = ingestor.ingest_repository(str(sample_repo))
-
-        normalizer = RuleNormalizer()
-        rules = normalizer.normalize_rules(rules)
-        rules = normalizer.deduplicate_rules(rules)[:10]  # Limit for speed
-
-        enricher = RuleEnricher(self.config)
-        rules = enricher.enrich_rules(rules)
+    def test_binary_files_skipped(self):
+        """Test files with NUL bytes in their head are not parsed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sql = "SELECT id FROM orders WHERE total > 1000;\n"
+            (Path(tmpdir) / "dump.sql").write_bytes(b"\x00\x01" + sql.encode())
+            (Path(tmpdir) / "blob.py").write_bytes(b'q = "SELECT id FROM t WHERE x > 1"\x00\n')
+            (Path(tmpdir) / "query.sql").write_text(sql)
 
-        clusterer = RuleClusterer(self.config)
-        groups = clusterer.cluster_rules(rules)
+            ingestor = RepositoryIngestor(self.config)
+            rules = ingestor.ingest_repository(tmpdir)
 
-        decision_model = DecisionModel(
-            rules=rules,
-            groups=groups,
-            dependencies=[]
-        )
+        assert rules
+        assert {Path(r.source.file_path).name for r in rules} == {"query.sql"}
 
-        generator = DRDGenerator(self.config)
-        dmn_xml = generator.generate_drd(decision_model)
+    def test_traceability_in_dmn(self, sample_rules):
+        """Test that DMN includes traceability information."""
+        dmn_xml = sample_rules[-1]
 
         # Parse XML and check for traceability
         root = ET.fromstring(dmn_xml.encode('utf-8'))
@@ -215,17 +212,11 @@ class TestEndToEnd:
         assert source.get("startLine") is not None
         assert source.get("endLine") is not None
 
-    def test_statistics_generation(self):
+    def test_statistics_generation(self, sample_rules):
         """Test that statistics are correctly generated."""
-        sample_repo = Path(__file__).parent.parent / "sample_repos" / "sample_sql_app"
+        rules = sample_rules[0]
 
-        if not sample_repo.exists():
-            pytest.skip("Sample repository not found")
-
-        ingestor = RepositoryIngestor(self.config)
-        rules = ingestor.ingest_repository(str(sample_repo))
-
-        stats = ingestor.get_statistics(rules)
+        stats = RepositoryIngestor(self.config).get_statistics(rules)
 
         # Check statistics structure
         assert "total_rules" in stats
@@ -233,12 +224,104 @@ class TestEndToEnd:
         assert "by_file" in stats
         assert "unique_tables" in stats
         assert "unique_columns" in stats
+        assert "unique_files" in stats
 
         # Verify counts
         assert stats["total_rules"] == len(rules)
+        assert stats["unique_files"] == len(stats["by_file"])
         assert stats["unique_tables"] >= 0
         assert stats["unique_columns"] >= 0
 
+    def test_parallel_ingestion_matches_serial(self, sample_rules, monkeypatch):
+        """Test that parsing with worker processes yields the same rules."""
+        serial = sample_rules[0]
+
+        ingestor = RepositoryIngestor(self.config)
+
+        # The sample repository is below the file count that starts a pool
+        def no_pool(*args, **kwargs):
+            raise AssertionError("worker pool started for a small repository")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(ingest_module, "ProcessPoolExecutor", no_pool)
+            in_process = ingestor.ingest_repository(str(SAMPLE_REPO), jobs=2)
+        assert [r.id for r in in_process] == [r.id for r in serial]
+
+        monkeypatch.setattr(ingest_module, "_MIN_PARALLEL_FILES", 2)
+        parallel = ingestor.ingest_repository(str(SAMPLE_REPO), jobs=2)
+        per_cpu = ingestor.ingest_repository(str(SAMPLE_REPO), jobs=None)
+
+        assert [r.id for r in parallel] == [r.id for r in serial]
+        assert [r.id for r in per_cpu] == [r.id for r in serial]
+
+    def test_ingest_files_reports_progress(self, sample_rules):
+        """Test that ingest_files reports each parsed file."""
+        ingestor = RepositoryIngestor(self.config)
+        files = list(ingestor.iter_source_files(str(SAMPLE_REPO)))
+        reported = []
+
+        rules = ingestor.ingest_files(files, progress_callback=reported.append)
+
+        assert reported == list(range(1, len(files) + 1))
+        assert [r.id for r in rules] == [r.id for r in sample_rules[0]]
+
+    def test_write_drd_to_file(self):
+        """Test streaming DMN to a file matches the in-memory document."""
+        from src.extractor import Rule, RuleGroup, RuleType, SourceLocation
+
+        rules = [
+            Rule(
+                id=f"rule_{i}",
+                rule_type=RuleType.CONDITIONAL,
+                description="Test rule",
+                normalized_expression=f"total > {i * 100}",
+                variables=["total"],
+                columns=["total"],
+                source=SourceLocation(
+                    file_path="test.sql",
+                    start_line=i + 1,
+                    end_line=i + 1,
+                    snippet=f"total > {i * 100}"
+                )
+            )
+            for i in range(5)
+        ]
+        groups = [
+            RuleGroup(id="g1", name="Small", description="d", rules=rules[:2], category="Test", confidence=0.9),
+            RuleGroup(id="g2", name="Large", description="d", rules=rules[2:], category="Test", confidence=0.8),
+        ]
+        model = DecisionModel(
+            rules=rules,
+            groups=groups,
+            dependencies=[RuleDependency(source_id="g2", target_id="g1", dependency_type="data")]
+        )
+
+        generator = DRDGenerator(self.config)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dmn_path = Path(tmpdir) / "out" / "drd.xml"
+            generator.write_drd(model, str(dmn_path))
+            written = dmn_path.read_text(encoding="utf-8")
+
+        assert written == generator.generate_drd(model)
+
+        # Namespaces are declared once, on <definitions>
+        assert written.count("xmlns:dmn=") == 1
+        assert written.count("xmlns:ext=") == 1
+
+        root = ET.fromstring(written.encode("utf-8"))
+        ns = {"dmn": "https://www.omg.org/spec/DMN/20191111/MODEL/"}
+        assert len(root.findall("dmn:decision", ns)) == 2
+        assert root.find("dmn:decision[@id='Decision_g2']/dmn:informationRequirement/dmn:requiredDecision", ns) \
+            .get("href") == "#Decision_g1"
+        assert len(root.findall("dmn:inputData", ns)) == 1
+        assert len(root.findall("dmn:knowledgeSource", ns)) == 1
+
+        # Snippets are written as CDATA and read back as plain text
+        assert "<![CDATA[total > 100]]>" in written
+        snippets = root.findall(".//{http://test/dmn}snippet")
+        assert [s.text for s in snippets] == [r.source.snippet for r in rules]
+
     def test_dmn_validation(self):
         """Test that generated DMN is well-formed XML."""
         # Create minimal decision model
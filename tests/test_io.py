@@ -0,0 +1,128 @@
+"""Tests for I/O utilities."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.utils import io as io_module
+from src.utils.io import (
+    decode_embeddings, encode_embeddings, iter_json_array, iter_json_arrays, load_json,
+    save_json, save_json_stream
+)
+
+
+class TestIO:
+    """Test JSON export helpers."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.tmpdir.name) / "data.json"
+
+    def teardown_method(self):
+        """Clean up temporary files."""
+        self.tmpdir.cleanup()
+
+    def test_embeddings_round_trip(self):
+        """Test packed embeddings decode to the original vectors."""
+        embeddings = {
+            "r1": [0.1, 0.2, 0.3],
+            "r2": [-1.5, 0.0, 2.25],
+        }
+
+        payload = encode_embeddings(embeddings)
+        decoded = decode_embeddings(json.loads(json.dumps(payload)))
+
+        assert payload["shape"] == [2, 3]
+        assert list(decoded) == ["r1", "r2"]
+        for rule_id, vector in embeddings.items():
+            np.testing.assert_allclose(decoded[rule_id], vector, atol=1e-3)
+
+    def test_encode_no_embeddings(self):
+        """Test encoding an empty set of embeddings."""
+        payload = encode_embeddings({})
+
+        assert payload["ids"] == []
+        assert decode_embeddings(payload) == {}
+
+    def test_save_json_stream_generators(self):
+        """Test generator sections are written as JSON arrays."""
+        save_json_stream(
+            {
+                "items": ({"n": n} for n in range(3)),
+                "empty": (x for x in []),
+                "summary": {"total": 3},
+            },
+            str(self.output_path)
+        )
+
+        data = json.loads(self.output_path.read_text())
+
+        assert data == {
+            "items": [{"n": 0}, {"n": 1}, {"n": 2}],
+            "empty": [],
+            "summary": {"total": 3},
+        }
+
+    def test_save_and_load_json_round_trip(self, monkeypatch):
+        """Test JSON written by save_json loads back, with and without orjson."""
+        data = {"rules": [{"id": "r1", "expression": "total > 100", "note": "caf\u00e9"}], "count": 1}
+
+        save_json(data, str(self.output_path))
+        assert load_json(str(self.output_path)) == data
+
+        monkeypatch.setattr(io_module, "orjson", None)
+        save_json(data, str(self.output_path), pretty=False)
+        assert load_json(str(self.output_path)) == data
+
+    def test_save_json_list_streamed(self, monkeypatch):
+        """Test top-level lists are written exactly as json.dumps lays them out."""
+        items = [{"id": "r1", "tags": ["a", "b"], "note": "line\nbreak"}, [], 3]
+
+        for backend in (io_module.orjson, None):
+            monkeypatch.setattr(io_module, "orjson", backend)
+
+            save_json(items, str(self.output_path))
+            assert self.output_path.read_text() == json.dumps(items, indent=2)
+
+            save_json((item for item in items), str(self.output_path), pretty=False)
+            assert json.loads(self.output_path.read_text()) == items
+
+            save_json([], str(self.output_path))
+            assert self.output_path.read_text() == "[]"
+
+    def test_iter_json_array(self, monkeypatch):
+        """Test array items stream out of one key, with and without ijson."""
+        save_json_stream(
+            {"groups": [{"id": "g1", "confidence": 0.5}, {"id": "g2"}], "rules": []},
+            str(self.output_path)
+        )
+
+        # Stream even this small file through ijson, then load it whole
+        for backend, min_bytes in ((io_module.ijson, 0), (io_module.ijson, 1 << 20), (None, 0)):
+            monkeypatch.setattr(io_module, "ijson", backend)
+            monkeypatch.setattr(io_module, "_STREAM_MIN_BYTES", min_bytes)
+
+            groups = list(iter_json_array(str(self.output_path), "groups"))
+            assert groups == [{"id": "g1", "confidence": 0.5}, {"id": "g2"}]
+            assert isinstance(groups[0]["confidence"], float)
+            assert list(iter_json_array(str(self.output_path), "rules")) == []
+            assert list(iter_json_array(str(self.output_path), "missing")) == []
+
+            arrays = iter_json_arrays(str(self.output_path), ["groups", "missing"])
+            assert list(arrays["groups"]) == groups
+            assert list(arrays["missing"]) == []
+
+    def test_iter_json_arrays_loads_once(self, monkeypatch):
+        """Test a file that is not streamed is loaded once for all keys."""
+        save_json_stream({"groups": [{"id": "g1"}], "dependencies": []}, str(self.output_path))
+
+        loads = []
+        load_json = io_module.load_json
+        monkeypatch.setattr(io_module, "load_json", lambda path: loads.append(path) or load_json(path))
+
+        arrays = iter_json_arrays(str(self.output_path), ["groups", "dependencies"])
+        assert arrays == {"groups": [{"id": "g1"}], "dependencies": []}
+        assert len(loads) == 1
@@ -0,0 +1,119 @@
+"""Tests for the in-process layered SVG layout."""
+
+import xml.etree.ElementTree as ET
+
+from src.utils.layered_svg import (
+    grid_layout, label_size, layered_layout, render_grid_svg, render_layered_svg
+)
+
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class TestLayeredLayout:
+    """Test layered node placement and edge routing."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.sizes = {name: label_size([name]) for name in ("a", "b", "c", "d")}
+
+    def test_edges_point_down_in_a_dag(self):
+        """Test DAG edges run from upper to lower layers without overlaps."""
+        edges = [("a", "b"), ("b", "c"), ("a", "c"), ("a", "d")]
+
+        centers, routes = layered_layout(self.sizes, edges)
+
+        for (source, target), route in zip(edges, routes):
+            assert centers[source][1] < centers[target][1]
+            assert route[0][1] == centers[source][1] + self.sizes[source][1] / 2
+            assert route[-1][1] == centers[target][1] - self.sizes[target][1] / 2
+
+        # The edge skipping a layer bends through a dummy point
+        assert len(routes[2]) == 3
+
+        # Nodes sharing a layer keep apart
+        (bx, _), (dx, _) = centers["b"], centers["d"]
+        assert abs(bx - dx) >= (self.sizes["b"][0] + self.sizes["d"][0]) / 2
+
+    def test_cycles_and_antiparallel_edges(self):
+        """Test cycles are laid out and opposite edges do not overlap."""
+        edges = [("a", "b"), ("b", "a"), ("b", "c"), ("c", "a"), ("c", "c")]
+
+        centers, routes = layered_layout(self.sizes, edges)
+
+        assert set(centers) == set(self.sizes)
+        assert len(routes) == len(edges)
+        assert routes[0][0][0] != routes[1][0][0]
+        # The reversed edge still ends at its own target
+        assert routes[1][-1][1] == centers["a"][1] + self.sizes["a"][1] / 2
+
+
+class TestRenderLayeredSvg:
+    """Test SVG rendering of layered graphs."""
+
+    def test_render_well_formed_svg(self):
+        """Test the document parses and holds every node, edge and label."""
+        nodes = {
+            "g1": {"lines": ["Pricing <&> rules", "[Pricing]"], "fillcolor": "#fff3e0"},
+            "g2": {"lines": ["Orders"], "fillcolor": "#e3f2fd"},
+        }
+        edges = [
+            {"source": "g1", "target": "g2", "lines": ["dataflow", "0.80"],
+             "penwidth": "3", "color": "#4a90e2"},
+            {"source": "g2", "target": "g3", "lines": ["dataflow", "0.20"],
+             "penwidth": "1", "color": "#aaaaaa"},
+        ]
+
+        root = ET.fromstring(render_layered_svg(nodes, edges).encode("utf-8"))
+
+        assert root.tag == f"{SVG}svg"
+        groups = root.iter(f"{SVG}g")
+        titles = [g.find(f"{SVG}title").text for g in groups if g.get("class") == "node"]
+        assert titles == ["g1", "g2", "g3"]
+        assert len(list(root.iter(f"{SVG}polyline"))) == 2
+
+        texts = ["".join(t.itertext()) for t in root.iter(f"{SVG}text")]
+        assert "Pricing <&> rules[Pricing]" in texts
+        assert "dataflow0.80" in texts
+
+
+class TestGridSvg:
+    """Test the grid layout used for graphs of a few nodes."""
+
+    def test_grid_cells_do_not_overlap(self):
+        """Test nodes fill a near-square grid row by row, apart from each other."""
+        sizes = {name: label_size([name * (i + 1)]) for i, name in enumerate("abcde")}
+
+        centers = grid_layout(sizes)
+
+        assert len({y for _, y in centers.values()}) == 2
+        assert [centers[n][1] for n in "abc"] == [centers["a"][1]] * 3
+        for a in sizes:
+            for b in sizes:
+                if a < b:
+                    (ax, ay), (bx, by) = centers[a], centers[b]
+                    assert abs(ax - bx) >= (sizes[a][0] + sizes[b][0]) / 2 or \
+                        abs(ay - by) >= (sizes[a][1] + sizes[b][1]) / 2
+
+    def test_render_undirected_edges(self):
+        """Test straight edges join node borders, with no arrowhead when undirected."""
+        nodes = {
+            "r1": {"lines": ["r1", "Total over 100..."], "fillcolor": "#e3f2fd"},
+            "r2": {"lines": ["r2", "Active status..."], "fillcolor": "#e8f5e9"},
+        }
+        edges = [{"source": "r1", "target": "r2", "lines": ["Tables: orders"], "dir": "none"}]
+
+        root = ET.fromstring(render_grid_svg(nodes, edges).encode("utf-8"))
+
+        rects = [r for r in root.iter(f"{SVG}rect") if r.get("x") is not None]
+        (x1, y1), (x2, y2) = [
+            tuple(map(float, point.split(",")))
+            for point in next(root.iter(f"{SVG}polyline")).get("points").split()
+        ]
+        right_of_r1 = float(rects[0].get("x")) + float(rects[0].get("width"))
+
+        assert len(rects) == 2
+        assert (x1, x2) == (right_of_r1, float(rects[1].get("x")))
+        assert y1 == y2
+        assert list(root.iter(f"{SVG}polygon")) == []
+        assert "Tables: orders" in ["".join(t.itertext()) for t in root.iter(f"{SVG}text")]
@@ -108,6 +108,31 @@ class TestRuleNormalizer:
         # Should remove duplicate
         assert len(unique_rules) == 2
 
+    def test_deduplicate_keeps_most_confident(self):
+        """Test deduplication keeps the highest-confidence duplicate."""
+        rules = [
+            Rule(
+                id=f"test_{i}",
+                rule_type=RuleType.CONDITIONAL,
+                description="Test",
+                normalized_expression="total > 100",
+                variables=[],
+                confidence=confidence,
+                source=SourceLocation(
+                    file_path="test.sql",
+                    start_line=1,
+                    end_line=1,
+                    snippet="test"
+                )
+            )
+            for i, confidence in enumerate([0.6, 0.9, 0.7])
+        ]
+
+        unique_rules = self.normalizer.deduplicate_rules(rules)
+
+        assert len(unique_rules) == 1
+        assert unique_rules[0].id == "test_1"
+
     def test_filter_low_quality_rules(self):
         """Test filtering low-quality rules."""
         rules = [
@@ -147,6 +172,43 @@ class TestRuleNormalizer:
         assert len(filtered) == 1
         assert filtered[0].confidence >= 0.5
 
+    def test_pipeline_matches_separate_steps(self):
+        """Test the fused pipeline matches normalize, dedupe and filter."""
+        def make_rules():
+            return [
+                Rule(
+                    id=f"test_{i}",
+                    rule_type=RuleType.CONDITIONAL,
+                    description="Test",
+                    normalized_expression=expression,
+                    variables=["TOTAL"],
+                    confidence=confidence,
+                    source=SourceLocation(
+                        file_path="test.sql",
+                        start_line=line,
+                        end_line=line,
+                        snippet="test"
+                    )
+                )
+                for i, (expression, line, confidence) in enumerate([
+                    ("total>100", 1, 0.4),
+                    ("total  > 100", 1, 0.8),
+                    ("total > 200", 2, 0.3),
+                    ("status = 'open'", 3, 0.9),
+                ])
+            ]
+
+        expected = self.normalizer.filter_low_quality_rules(
+            self.normalizer.deduplicate_rules(
+                self.normalizer.normalize_rules(make_rules())
+            )
+        )
+        fused = self.normalizer.pipeline(make_rules())
+
+        assert [r.id for r in fused] == [r.id for r in expected] == ["test_1", "test_3"]
+        assert fused[0].normalized_expression == "total > 100"
+        assert fused[0].variables == ["total"]
+
     def test_normalize_comparison_operators(self):
         """Test normalization of comparison operators."""
         rule = Rule(
@@ -168,3 +230,43 @@ class TestRuleNormalizer:
         # Should normalize == to = and add spaces
         assert " = " in normalized.normalized_expression
         assert " >= " in normalized.normalized_expression
+
+    def test_normalize_expression_exact(self):
+        """Test operators, parentheses and keywords are rewritten together."""
+        cases = {
+            "  (total>=100 and\n\tstatus!='x' )or NOT flag<>1 ": "(total >= 100 AND status != 'x')OR NOT flag < > 1",
+            "notes = 'android'": "notes = 'android'",
+            "a ==b": "a = b",
+            "": "",
+        }
+
+        for expression, expected in cases.items():
+            assert self.normalizer._normalize_expression(expression) == expected
+
+    def test_normalize_rules_in_workers(self):
+        """Test normalizing with worker processes matches normalizing in process."""
+        def make_rules():
+            return [
+                Rule(
+                    id=f"test_{i}",
+                    rule_type=RuleType.CONDITIONAL,
+                    description="Test",
+                    normalized_expression=f"total>{i} and `Status`='open'",
+                    variables=["TOTAL", '"Status"'],
+                    tables=["Orders"],
+                    source=SourceLocation(
+                        file_path="test.sql",
+                        start_line=i + 1,
+                        end_line=i + 1,
+                        snippet="test"
+                    )
+                )
+                for i in range(600)
+            ]
+
+        serial = self.normalizer.normalize_rules(make_rules())
+        parallel = self.normalizer.normalize_rules(make_rules(), jobs=2)
+
+        assert [r.model_dump() for r in parallel] == [r.model_dump() for r in serial]
+        assert parallel[0].normalized_expression == "total > 0 AND `Status` = 'open'"
+        assert parallel[0].tables == ["orders"]
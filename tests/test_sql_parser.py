@@ -127,6 +127,15 @@ class TestSQLParser:
         # Same content should generate same IDs
         assert rules1[0].id == rules2[0].id
 
+    def test_rule_id_undecodable_path(self):
+        """Test paths with surrogate-escaped bytes still produce rules."""
+        sql = "SELECT * FROM orders WHERE total > 100"
+
+        rules = self.parser.parse_file("caf\udce9.sql", sql)
+
+        assert len(rules) == 1
+        assert rules[0].id != self.parser.parse_file("test.sql", sql)[0].id
+
     def test_source_location_tracking(self):
         """Test that source locations are correctly tracked."""
         sql = """
@@ -157,3 +166,111 @@ class TestSQLParser:
         # Should not crash, may return empty or partial results
         rules = self.parser.parse_file("test.sql", sql)
         assert isinstance(rules, list)
+
+    def test_extract_variables_regex(self):
+        """Test identifiers are split out and keywords and numbers dropped."""
+        variables = self.parser._extract_variables_regex(
+            "NEW.total_amount >= 100 AND (status = 'active' OR 2x)"
+        )
+
+        assert sorted(variables) == ["NEW", "active", "status", "total_amount"]
+
+        # Identifiers run into non-ASCII word characters are not matched
+        assert sorted(self.parser._extract_variables_regex("prix_€ > café")) == ["prix_"]
+
+    def test_repeated_statements_parse_once(self):
+        """Test identical statements reuse one parsed AST."""
+        sql = "SELECT id FROM orders WHERE total > 100"
+
+        first = self.parser._parse_statement(sql)
+
+        assert first is not None
+        assert SQLParser(dialect="postgres")._parse_statement(sql) is first
+        assert self.parser._parse_statement("SELECT * FROM WHERE INVALID SYNTAX") is None
+        assert [r.id for r in self.parser.parse_file("a.sql", sql)] == \
+            [r.id for r in self.parser.parse_file("a.sql", sql)]
+
+    def test_statements_without_case_or_where_skip_parsing(self):
+        """Test only statements with CASE or WHERE are parsed with sqlglot."""
+        parsed = []
+        parse_statement = self.parser._parse_statement
+
+        def record(sql):
+            parsed.append(sql)
+            return parse_statement(sql)
+
+        self.parser._parse_statement = record
+
+        rules = self.parser.parse_file("a.sql", """
+INSERT INTO audit_log (event) VALUES ('login');
+UPDATE accounts SET locked = TRUE WHERE failures > 3;
+""")
+
+        assert parsed == ["UPDATE accounts SET locked = TRUE WHERE failures > 3;"]
+        assert [r.normalized_expression for r in rules] == ["failures > 3"]
+
+    def test_repeated_names_share_one_string(self):
+        """Test column names repeated across rules are interned."""
+        rules = self.parser.parse_file("a.sql", """
+SELECT id FROM orders WHERE order_total > 100;
+SELECT id FROM invoices WHERE order_total < 5;
+""")
+
+        assert len(rules) == 2
+        assert rules[0].variables == rules[1].variables == ["order_total"]
+        assert rules[0].variables[0] is rules[1].variables[0]
+
+    def test_statement_lines_after_blank_lines(self):
+        """Test statement line numbers count the blank lines between them."""
+        sql = """-- header
+
+SELECT id FROM orders WHERE total > 100;
+
+
+ALTER TABLE orders
+  ADD CONSTRAINT positive CHECK (total >= 0);
+"""
+
+        statements = self.parser._split_statements(sql)
+
+        assert [(start, end) for _, start, end in statements] == [(1, 3), (6, 7)]
+
+        checks = [r for r in self.parser.parse_file("test.sql", sql) if r.rule_type == RuleType.CONSTRAINT]
+        assert checks[0].source.start_line == 7
+
+    def test_regex_matches_keep_their_lines(self):
+        """Test each IF block and CHECK is located on its own line of the statement."""
+        sql = """BEGIN
+  IF a > 1 THEN x := 1; END IF;
+
+  IF b > 2 THEN
+    x := 2;
+  END IF;
+  IF c > 3 THEN x := 3; END IF;
+END"""
+
+        rules = self.parser._extract_from_procedure("test.sql", sql, 10)
+
+        assert [r.source.start_line for r in rules] == [11, 13, 16]
+        assert [r.source.end_line for r in rules] == [11, 15, 16]
+
+        checks = self.parser._extract_from_constraint("test.sql", """CREATE TABLE t (
+  a INT CHECK (a > 0),
+  b INT,
+  c INT CHECK (c > a)
+)""", 1)
+
+        assert [r.source.start_line for r in checks] == [2, 4]
+        assert checks[1].variables == checks[1].columns
+
+    def test_parse_statements_in_workers(self):
+        """Test parsing a large file with worker processes keeps statement order."""
+        sql = "\n".join(
+            f"SELECT id FROM orders WHERE total > {i};" for i in range(70)
+        )
+
+        serial = self.parser.parse_file("test.sql", sql)
+        parallel = self.parser.parse_file("test.sql", sql, jobs=2)
+
+        assert len(serial) == 70
+        assert [r.model_dump() for r in parallel] == [r.model_dump() for r in serial]
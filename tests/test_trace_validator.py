@@ -0,0 +1,126 @@
+"""Tests for traceability validation."""
+
+import tempfile
+from pathlib import Path
+
+from src.utils.trace_validator import TraceabilityValidator, _leading_text
+
+
+DMN = """<?xml version="1.0" encoding="UTF-8"?>
+<dmn:definitions xmlns:dmn="https://www.omg.org/spec/DMN/20191111/MODEL/"
+                 xmlns:ext="http://sql-rule-extractor/dmn">
+  <dmn:decision id="d1">
+    <dmn:extensionElements>
+      <ext:traceability>
+        {sources}
+      </ext:traceability>
+    </dmn:extensionElements>
+  </dmn:decision>
+</dmn:definitions>
+"""
+
+SOURCE = """<ext:source ruleId="{rule_id}" file="{file}" startLine="{start}" endLine="{end}">
+          <ext:snippet><![CDATA[{snippet}]]></ext:snippet>
+        </ext:source>"""
+
+
+class TestTraceabilityValidator:
+    """Test validation of DMN traceability links."""
+
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmpdir.name)
+        (self.repo / "rules.sql").write_text(
+            "-- header\n"
+            "SELECT * FROM orders\n"
+            "WHERE total > 100;\n"
+        )
+
+    def teardown_method(self):
+        """Clean up temporary files."""
+        self.tmpdir.cleanup()
+
+    def validate(self, *sources, max_workers=None):
+        """Helper to write a DMN with the given sources and validate it."""
+        drd_path = self.repo / "drd.xml"
+        drd_path.write_text(DMN.format(sources="\n".join(
+            SOURCE.format(rule_id=f"r{i}", **source) for i, source in enumerate(sources)
+        )))
+        return TraceabilityValidator(str(drd_path), str(self.repo), max_workers).validate()
+
+    def test_valid_and_broken_links(self):
+        """Test each link is checked for file, line range and snippet."""
+        success, errors = self.validate(
+            {"file": "rules.sql", "start": 2, "end": 3,
+             "snippet": "SELECT * FROM orders\nWHERE total > 100;"},
+            {"file": "rules.sql", "start": 2, "end": 3, "snippet": "DELETE FROM orders"},
+            {"file": "missing.sql", "start": 1, "end": 1, "snippet": "x"},
+            {"file": "rules.sql", "start": 9, "end": 9, "snippet": "x"},
+        )
+
+        assert not success
+        assert [e.split(":")[0] for e in errors] == ["Rule r1", "Rule r2", "Rule r3"]
+        assert "Snippet mismatch" in errors[0]
+        assert "File not found" in errors[1]
+        assert "Invalid start line" in errors[2]
+
+    def test_errors_keep_document_order_across_workers(self):
+        """Test errors are reported in DMN order however many threads check links."""
+        sources = [
+            {"file": "rules.sql" if i % 3 else "missing.sql", "start": 2, "end": 3,
+             "snippet": "SELECT * FROM orders"}
+            for i in range(30)
+        ]
+
+        serial = self.validate(*sources, max_workers=1)
+
+        assert serial[1] == [f"Rule r{i}: File not found: missing.sql" for i in range(0, 30, 3)]
+        assert self.validate(*sources, max_workers=8) == serial
+
+    def test_each_file_read_once(self):
+        """Test links sharing a source file trigger a single read of it."""
+        (self.repo / "other.sql").write_text("SELECT 1;\n")
+        drd_path = self.repo / "drd.xml"
+        drd_path.write_text(DMN.format(sources="\n".join(
+            SOURCE.format(rule_id=f"r{i}", file=file, start=1, end=1, snippet="")
+            for i, file in enumerate(["rules.sql", "other.sql", "missing.sql"] * 10)
+        )))
+        validator = TraceabilityValidator(str(drd_path), str(self.repo))
+        read_source = validator._read_source
+        reads = []
+
+        def record(file_path):
+            reads.append(file_path)
+            return read_source(file_path)
+
+        validator._read_source = record
+        success, errors = validator.validate()
+
+        assert sorted(reads) == ["missing.sql", "other.sql", "rules.sql"]
+        assert errors == [f"Rule r{i}: File not found: missing.sql" for i in range(2, 30, 3)]
+
+    def test_report_reuses_validation(self):
+        """Test generate_report reuses the result of an earlier validate call."""
+        drd_path = self.repo / "drd.xml"
+        drd_path.write_text(DMN.format(sources=SOURCE.format(
+            rule_id="r0", file="rules.sql", start=2, end=2, snippet="SELECT * FROM orders"
+        )))
+        validator = TraceabilityValidator(str(drd_path), str(self.repo))
+
+        assert validator.validate() == (True, [])
+
+        drd_path.unlink()
+        assert validator.validate() == (True, [])
+        assert "validated successfully" in validator.generate_report()
+
+    def test_no_sources(self):
+        """Test a DMN without traceability sources fails validation."""
+        assert self.validate() == (False, ["No traceability sources found in DMN"])
+
+    def test_leading_text_matches_full_join(self):
+        """Test the bounded join equals stripping and truncating the full text."""
+        lines = ["\n", "   \n", "  SELECT a,\t\n", "\n", "  b FROM t  \n", "   \n"]
+
+        for limit in range(0, 30):
+            assert _leading_text(lines, limit) == "".join(lines).strip()[:limit]
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Verification script to test SQL Rule Extractor installation."""
 
+import importlib.util
 import sys
 from pathlib import Path
 
@@ -40,16 +41,12 @@ def check_dependencies():
     missing = []
 
     for package in required_packages:
-        try:
-            # Special cases for package names
-            if package == "sklearn":
-                __import__("sklearn")
-            elif package == "yaml":
-                __import__("yaml")
-            else:
-                __import__(package)
+        # Only locate each package rather than import it, which would run
+        # its (for numpy, sklearn and langchain, slow) top-level code; the
+        # module import check below still imports what the project uses
+        if importlib.util.find_spec(package) is not None:
             print(f"  ✓ {package}")
-        except ImportError:
+        else:
             print(f"  ✗ {package}")
             missing.append(package)
 